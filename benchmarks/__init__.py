@@ -0,0 +1,7 @@
+"""Benchmarks of peperoncino processings.
+
+```
+python -m benchmarks --rows 10000 100000 --save baseline.json
+python -m benchmarks --rows 10000 100000 --compare baseline.json
+```
+"""
@@ -0,0 +1,101 @@
+from typing import Callable, Dict, List
+import pandas as pd
+
+import peperoncino as pp
+
+
+class _SeparatedIdentity(pp.SeparatedProcessing):
+    def sep_process(self, df: pd.DataFrame) -> pd.DataFrame:
+        return df
+
+
+class _MergedIdentity(pp.MergedProcessing):
+    def simul_process(self, df: pd.DataFrame) -> pd.DataFrame:
+        return df
+
+
+def _features(dfs: List[pd.DataFrame], n: int) -> List[str]:
+    return [c for c in dfs[0].columns if c.startswith("x")][:n]
+
+
+def _query(dfs: List[pd.DataFrame]) -> pp.BaseProcessing:
+    return pp.Query("x0 > 0 and k0 < 50")
+
+
+def _assign(dfs: List[pd.DataFrame]) -> pp.BaseProcessing:
+    xs = _features(dfs, 4)
+    return pp.Assign(**{f"a{i}": f"{x} * 2 + 1" for i, x in enumerate(xs)})
+
+
+def _combinations(dfs: List[pd.DataFrame]) -> pp.BaseProcessing:
+    return pp.Combinations(_features(dfs, 10), ["+", "-", "*", "/"])
+
+
+def _target_encoding(dfs: List[pd.DataFrame]) -> pp.BaseProcessing:
+    return pp.TargetEncoding(["k0", "s0"], "y")
+
+
+def _stats_encoding(dfs: List[pd.DataFrame]) -> pp.BaseProcessing:
+    return pp.StatsEncoding(["k0", "k1"], "y", ["mean", "std", "min", "max"])
+
+
+def _as_category(dfs: List[pd.DataFrame]) -> pp.BaseProcessing:
+    return pp.AsCategory(["k0", "s0"])
+
+
+def _drop_duplicates(dfs: List[pd.DataFrame]) -> pp.BaseProcessing:
+    return pp.DropDuplicates(["k0", "k1"])
+
+
+def _separated(dfs: List[pd.DataFrame]) -> pp.BaseProcessing:
+    return _SeparatedIdentity()
+
+
+def _merged(dfs: List[pd.DataFrame]) -> pp.BaseProcessing:
+    return _MergedIdentity()
+
+
+PIPELINE_YAML = """
+processing:
+    -   name: Query
+        query: "x0 > -1"
+    -   name: Assign
+        x0_2: "x0 * 2"
+        x1_2: "x1 * 2"
+    -   name: AsCategory
+        cols:
+            - s0
+    -   name: TargetEncoding
+        cols:
+            - k0
+        target: y
+    -   name: StatsEncoding
+        cols:
+            - k1
+        target: y
+        ops:
+            - mean
+            - max
+    -   name: DropColumns
+        cols:
+            - x1
+"""
+
+
+def _pipeline(dfs: List[pd.DataFrame]) -> pp.BaseProcessing:
+    return pp.from_yaml(PIPELINE_YAML)
+
+
+# case name -> function building a processing for dataframes
+CASES: Dict[str, Callable[[List[pd.DataFrame]], pp.BaseProcessing]] = {
+    "Query": _query,
+    "Assign": _assign,
+    "Combinations": _combinations,
+    "TargetEncoding": _target_encoding,
+    "StatsEncoding": _stats_encoding,
+    "AsCategory": _as_category,
+    "DropDuplicates": _drop_duplicates,
+    "SeparatedProcessing": _separated,
+    "MergedProcessing": _merged,
+    "Pipeline(yaml)": _pipeline,
+}
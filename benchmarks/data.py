@@ -0,0 +1,45 @@
+from typing import List
+import numpy as np
+import pandas as pd
+
+
+def make_frames(
+    n_rows: int, n_cols: int = 10, cardinality: int = 100, seed: int = 0
+) -> List[pd.DataFrame]:
+    """Generate synthetic train and test dataframes.
+    The test dataframe has a quarter of rows of the train dataframe.
+
+    - `k0`, `k1`: int keys with `cardinality` unique values
+    - `s0`: string keys with `cardinality` unique values
+    - `x0`, ..., `x{n_cols - 1}`: float features
+    - `y`: float target (only in the train dataframe)
+
+    Parameters
+    ----------
+    n_rows : int
+    n_cols : int
+        The number of float features.
+    cardinality : int
+        The number of unique values of keys.
+    seed : int
+
+    Returns
+    -------
+    List[pd.DataFrame]
+    """
+    rng = np.random.default_rng(seed)
+    labels = np.array([f"s{i}" for i in range(cardinality)], dtype=object)
+
+    dfs = []
+    for n in (n_rows, max(n_rows // 4, 1)):
+        columns = {
+            "k0": rng.integers(0, cardinality, n),
+            "k1": rng.integers(0, cardinality, n),
+            "s0": labels[rng.integers(0, cardinality, n)],
+        }
+        for i in range(n_cols):
+            columns[f"x{i}"] = rng.standard_normal(n)
+        dfs.append(pd.DataFrame(columns))
+
+    dfs[0]["y"] = rng.random(n_rows)
+    return dfs
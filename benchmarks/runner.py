@@ -0,0 +1,208 @@
+from typing import Any, Dict, List, Optional, Sequence
+import argparse
+import gc
+import json
+import logging
+import platform
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+import peperoncino as pp
+from benchmarks.cases import CASES
+from benchmarks.data import make_frames
+
+
+def measure(case: str, dfs: List[pd.DataFrame], repeat: int = 3) -> Dict[str, float]:
+    """Measure the time and the peak memory of a case.
+
+    The time is the minimum of `repeat` runs, and the peak memory is
+    traced by `tracemalloc` in another run, since tracing slows runs down.
+
+    Parameters
+    ----------
+    case : str
+    dfs : List[pd.DataFrame]
+    repeat : int
+
+    Returns
+    -------
+    Dict[str, float]
+        `time` in seconds and `peak_memory` in bytes.
+    """
+    build = CASES[case]
+
+    times = []
+    for _ in range(repeat):
+        proc = build(dfs)
+        gc.collect()
+        start = time.perf_counter()
+        proc.process(list(dfs))
+        times.append(time.perf_counter() - start)
+
+    proc = build(dfs)
+    gc.collect()
+    tracemalloc.start()
+    try:
+        proc.process(list(dfs))
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    return {"time": min(times), "peak_memory": peak}
+
+
+def run(
+    rows: Sequence[int],
+    cols: int = 10,
+    cardinality: int = 100,
+    cases: Optional[Sequence[str]] = None,
+    repeat: int = 3,
+    verbose: bool = False,
+) -> Dict[str, Any]:
+    """Run benchmarks of cases for each number of rows.
+
+    Parameters
+    ----------
+    rows : Sequence[int]
+    cols : int
+    cardinality : int
+    cases : Optional[Sequence[str]]
+        Names of cases. If None, all cases are run.
+    repeat : int
+    verbose : bool
+
+    Returns
+    -------
+    Dict[str, Any]
+        Results with the environment, which can be saved as JSON.
+    """
+    cases = list(CASES) if cases is None else list(cases)
+    for case in cases:
+        if case not in CASES:
+            raise ValueError(f"Unknown case: {case}")
+
+    results = []
+    for n_rows in rows:
+        dfs = make_frames(n_rows, cols, cardinality)
+        for case in cases:
+            result = {"case": case, "rows": n_rows, "cols": cols}
+            result["cardinality"] = cardinality
+            result.update(measure(case, dfs, repeat))
+            results.append(result)
+            if verbose:
+                print(_format_result(result), flush=True)
+
+    return {
+        "environment": {
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "pandas": pd.__version__,
+            "peperoncino": pp.__version__,
+        },
+        "results": results,
+    }
+
+
+def compare(
+    results: Dict[str, Any], baseline: Dict[str, Any], threshold: float = 1.2
+) -> pd.DataFrame:
+    """Compare results with a baseline.
+
+    Parameters
+    ----------
+    results : Dict[str, Any]
+    baseline : Dict[str, Any]
+    threshold : float
+        Cases slower or using more memory than `threshold` times
+        the baseline are regressed.
+
+    Returns
+    -------
+    pd.DataFrame
+        Ratios of time and peak memory to the baseline, with `regressed`.
+    """
+    keys = ["case", "rows", "cols", "cardinality"]
+    current = pd.DataFrame(results["results"])
+    base = pd.DataFrame(baseline["results"])
+
+    df = current.merge(base, on=keys, how="inner", suffixes=("", "_baseline"))
+    df["time_ratio"] = df["time"] / df["time_baseline"]
+    df["memory_ratio"] = df["peak_memory"] / df["peak_memory_baseline"]
+    df["regressed"] = (df["time_ratio"] > threshold) | (df["memory_ratio"] > threshold)
+    return df[keys + ["time", "time_ratio", "peak_memory", "memory_ratio", "regressed"]]
+
+
+def _format_result(result: Dict[str, Any]) -> str:
+    return (
+        f"{result['case']:<20} rows={result['rows']:<9} "
+        f"time={result['time']:.4f}s peak={result['peak_memory'] / 2 ** 20:.1f}MiB"
+    )
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks", description="Benchmarks of peperoncino."
+    )
+    parser.add_argument(
+        "--rows",
+        type=float,
+        nargs="+",
+        default=[1e4, 1e5, 1e6],
+        help="numbers of rows, from 1e4 to 1e7",
+    )
+    parser.add_argument("--cols", type=int, default=10, help="number of features")
+    parser.add_argument(
+        "--cardinality", type=int, default=100, help="number of unique keys"
+    )
+    parser.add_argument(
+        "--cases", nargs="+", choices=list(CASES), help="cases to run (default: all)"
+    )
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--save", help="save results to JSON as a baseline")
+    parser.add_argument("--compare", help="compare results with a baseline JSON")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=1.2,
+        help="ratio to the baseline regarded as regression",
+    )
+    parser.add_argument("--log", action="store_true", help="show logs of processings")
+    args = parser.parse_args(argv)
+
+    # the logger of the package is restored for callers in the same process
+    logger = pp.get_logger()
+    level = logger.level
+    if not args.log:
+        logger.setLevel(logging.WARNING)
+    try:
+        return _run_main(args)
+    finally:
+        logger.setLevel(level)
+
+
+def _run_main(args: argparse.Namespace) -> int:
+    results = run(
+        [int(n) for n in args.rows],
+        args.cols,
+        args.cardinality,
+        args.cases,
+        args.repeat,
+        verbose=True,
+    )
+
+    if args.save is not None:
+        with open(args.save, "w") as f:
+            json.dump(results, f, indent=2)
+
+    if args.compare is not None:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        report = compare(results, baseline, args.threshold)
+        print(report.to_string(index=False))
+        if report["regressed"].any():
+            return 1
+
+    return 0
@@ -1,27 +1,80 @@
 __version__ = "0.0.5"
 
+from typing import TYPE_CHECKING, Any, List
+import importlib
+
 from peperoncino.processing import BaseProcessing  # NOQA
 from peperoncino.processing import SeparatedProcessing  # NOQA
 from peperoncino.processing import MergedProcessing  # NOQA
 from peperoncino.processing import ColumnsChangedError  # NOQA
 from peperoncino.processing import RowsChangedError  # NOQA
+from peperoncino.processing import NotFittedError  # NOQA
+from peperoncino.processing import set_validation_level  # NOQA
+from peperoncino.processing import get_validation_level  # NOQA
+
+from peperoncino.profiling import profile  # NOQA
+from peperoncino.profiling import ProfileReport  # NOQA
+
+# processings and utilities are imported lazily on the first access,
+# so that `import peperoncino` does not import all of them (and PyYAML)
+_LAZY_ATTRS = {
+    "Pipeline": "peperoncino.processings.pipeline",
+    "Query": "peperoncino.processings.query",
+    "ApplyColumn": "peperoncino.processings.apply_column",
+    "AsType": "peperoncino.processings.as_type",
+    "AsCategory": "peperoncino.processings.as_category",
+    "Downcast": "peperoncino.processings.downcast",
+    "RenameColumns": "peperoncino.processings.rename_columns",
+    "Assign": "peperoncino.processings.assign",
+    "DropColumns": "peperoncino.processings.drop_columns",
+    "DropDuplicates": "peperoncino.processings.drop_duplicates",
+    "Combinations": "peperoncino.processings.combinations",
+    "Select": "peperoncino.processings.select",
+    "StatsEncoding": "peperoncino.processings.stats_encoding",
+    "TargetEncoding": "peperoncino.processings.target_encoding",
+    "Read": "peperoncino.processings.read",
+    "Write": "peperoncino.processings.write",
+    "Union": "peperoncino.processings.union",
+    "Coalescer": "peperoncino.serving",
+    "from_list": "peperoncino.utils.from_list",
+    "from_yaml": "peperoncino.utils.from_yaml",
+}
+
+if TYPE_CHECKING:
+    from peperoncino.processings.pipeline import Pipeline  # NOQA
+    from peperoncino.processings.query import Query  # NOQA
+    from peperoncino.processings.apply_column import ApplyColumn  # NOQA
+    from peperoncino.processings.as_type import AsType  # NOQA
+    from peperoncino.processings.as_category import AsCategory  # NOQA
+    from peperoncino.processings.downcast import Downcast  # NOQA
+    from peperoncino.processings.rename_columns import RenameColumns  # NOQA
+    from peperoncino.processings.assign import Assign  # NOQA
+    from peperoncino.processings.drop_columns import DropColumns  # NOQA
+    from peperoncino.processings.drop_duplicates import DropDuplicates  # NOQA
+    from peperoncino.processings.combinations import Combinations  # NOQA
+    from peperoncino.processings.select import Select  # NOQA
+    from peperoncino.processings.stats_encoding import StatsEncoding  # NOQA
+    from peperoncino.processings.target_encoding import TargetEncoding  # NOQA
+    from peperoncino.processings.read import Read  # NOQA
+    from peperoncino.processings.write import Write  # NOQA
+    from peperoncino.processings.union import Union  # NOQA
+
+    from peperoncino.serving import Coalescer  # NOQA
+    from peperoncino.utils.from_list import from_list  # NOQA
+    from peperoncino.utils.from_yaml import from_yaml  # NOQA
+
+
+def __getattr__(name: str) -> Any:
+    if name not in _LAZY_ATTRS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    attr = getattr(importlib.import_module(_LAZY_ATTRS[name]), name)
+    globals()[name] = attr
+    return attr
 
-from peperoncino.processings.pipeline import Pipeline  # NOQA
-from peperoncino.processings.query import Query  # NOQA
-from peperoncino.processings.apply_column import ApplyColumn  # NOQA
-from peperoncino.processings.as_type import AsType  # NOQA
-from peperoncino.processings.as_category import AsCategory  # NOQA
-from peperoncino.processings.rename_columns import RenameColumns  # NOQA
-from peperoncino.processings.assign import Assign  # NOQA
-from peperoncino.processings.drop_columns import DropColumns  # NOQA
-from peperoncino.processings.drop_duplicates import DropDuplicates  # NOQA
-from peperoncino.processings.combinations import Combinations  # NOQA
-from peperoncino.processings.select import Select  # NOQA
-from peperoncino.processings.stats_encoding import StatsEncoding  # NOQA
-from peperoncino.processings.target_encoding import TargetEncoding  # NOQA
 
-from peperoncino.utils.from_list import from_list  # NOQA
-from peperoncino.utils.from_yaml import from_yaml  # NOQA
+def __dir__() -> List[str]:
+    return sorted(set(globals()) | set(_LAZY_ATTRS))
 
 
 def get_logger():  # type: ignore
@@ -29,6 +82,9 @@ def get_logger():  # type: ignore
     import sys
 
     logger = logging.getLogger("peperoncino")
+    # the handler is added only once even if it is called again
+    if any(getattr(h, "_peperoncino", False) for h in logger.handlers):
+        return logger
     logger.setLevel(logging.INFO)
 
     handler = logging.StreamHandler(sys.stdout)
@@ -36,6 +92,7 @@ def get_logger():  # type: ignore
 
     formatter = logging.Formatter("[%(levelname)s]\tpeperoncino:\t%(message)s")
     handler.setFormatter(formatter)
+    handler._peperoncino = True  # type: ignore
 
     logger.addHandler(handler)
 
@@ -0,0 +1,249 @@
+from functools import partial
+from typing import Any, Dict, List, Optional, Tuple
+import hashlib
+import os
+import pickle
+import shutil
+import tempfile
+import types
+
+import numpy as np
+import pandas as pd
+
+import peperoncino as pp
+from peperoncino.files import check_dtypes
+
+
+def _token(obj: Any) -> str:
+    """Deterministic string of an object, used for fingerprints.
+    Objects without deterministic representations (e.g. `<object at 0x...>`)
+    never hit the cache, but they never hit wrongly.
+    """
+    if isinstance(obj, pp.BaseProcessing):
+        cls = obj.__class__
+        params = _token([obj._fingerprint_params(), obj._indices])
+        return f"{cls.__module__}.{cls.__qualname__}{params}"
+    if isinstance(obj, dict):
+        items = sorted((_token(k), _token(v)) for k, v in obj.items())
+        return "{" + ",".join(f"{k}:{v}" for k, v in items) + "}"
+    if isinstance(obj, (list, tuple)):
+        return type(obj).__name__ + "(" + ",".join(_token(v) for v in obj) + ")"
+    if isinstance(obj, partial):
+        return "partial(" + _token([obj.func, obj.args, obj.keywords]) + ")"
+    if isinstance(obj, types.FunctionType):
+        closure = [c.cell_contents for c in obj.__closure__ or []]
+        defaults = [obj.__defaults__, obj.__kwdefaults__]
+        globals_ = {
+            name: _global_token(obj.__globals__[name])
+            for name in _code_names(obj.__code__)
+            if name in obj.__globals__
+        }
+        attrs = [obj.__qualname__, obj.__code__, closure, defaults, globals_]
+        return "function(" + _token(attrs) + ")"
+    if isinstance(obj, types.CodeType):
+        consts = [_token(c) for c in obj.co_consts]
+        return "code(" + obj.co_code.hex() + _token([consts, obj.co_names]) + ")"
+    if isinstance(obj, (pd.Series, pd.DataFrame, pd.Index)):
+        return "pandas(" + fingerprint_frames([pd.DataFrame(obj)]) + ")"
+    if isinstance(obj, np.ndarray):
+        digest = hashlib.sha256(obj.tobytes()).hexdigest()
+        return f"ndarray({obj.dtype},{obj.shape},{digest})"
+    return f"{type(obj).__name__}({obj!r})"
+
+
+def _code_names(code: types.CodeType) -> List[str]:
+    """Global names used by a code object and code objects nested in it."""
+    names = list(code.co_names)
+    for c in code.co_consts:
+        if isinstance(c, types.CodeType):
+            names.extend(_code_names(c))
+    return names
+
+
+def _global_token(obj: Any) -> str:
+    # functions, classes and modules are referenced by their names,
+    # which avoids infinite recursions of recursive functions
+    if isinstance(obj, (types.FunctionType, type)):
+        return f"{type(obj).__name__}({obj.__module__}.{obj.__qualname__})"
+    if isinstance(obj, types.ModuleType):
+        return f"module({obj.__name__})"
+    return _token(obj)
+
+
+def _sha256(*tokens: str) -> str:
+    h = hashlib.sha256()
+    for token in tokens:
+        h.update(token.encode())
+        h.update(b"\0")
+    return h.hexdigest()
+
+
+def fingerprint_frames(dfs: List[pd.DataFrame]) -> str:
+    """Fingerprint of dataframes by their contents, dtypes and indices.
+
+    Parameters
+    ----------
+    dfs : List[pd.DataFrame]
+
+    Returns
+    -------
+    str
+    """
+    h = hashlib.sha256()
+    for df in dfs:
+        h.update(repr(list(zip(df.columns, df.dtypes.astype(str)))).encode())
+        h.update(pd.util.hash_pandas_object(df.index).values.tobytes())
+        if len(df.columns) > 0:
+            h.update(pd.util.hash_pandas_object(df, index=False).values.tobytes())
+        h.update(b"\0")
+    return h.hexdigest()
+
+
+def fingerprint_step(key: str, proc: pp.BaseProcessing) -> str:
+    """Fingerprint of the output of `proc` for the input fingerprinted by `key`.
+
+    Parameters
+    ----------
+    key : str
+    proc : pp.BaseProcessing
+
+    Returns
+    -------
+    str
+    """
+    return _sha256(key, _token(proc))
+
+
+class StepCache:
+    """Content-addressed on-disk cache of outputs of processings.
+    Outputs are stored as Parquet files, and least recently used entries
+    are evicted when the total size exceeds `max_bytes`.
+
+    Parameters
+    ----------
+    directory : str
+    max_bytes : Optional[int]
+        The size limit of the cache. If None, the cache is not limited.
+    """
+
+    def __init__(self, directory: str, max_bytes: Optional[int] = None):
+        try:
+            import pyarrow  # NOQA
+        except ImportError:
+            raise ImportError("pyarrow is required to cache outputs of processings.")
+
+        self._directory = directory
+        self._max_bytes = max_bytes
+        os.makedirs(directory, exist_ok=True)
+
+    @property
+    def directory(self) -> str:
+        return self._directory
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self._directory, key)
+
+    def __contains__(self, key: str) -> bool:
+        return os.path.exists(os.path.join(self._path(key), "meta.pkl"))
+
+    def load_state(self, key: str) -> Optional[Dict[str, Any]]:
+        """Load only the fitted state of a processing.
+
+        Parameters
+        ----------
+        key : str
+
+        Returns
+        -------
+        Optional[Dict[str, Any]]
+            None if it is not cached.
+        """
+        try:
+            with open(os.path.join(self._path(key), "meta.pkl"), "rb") as f:
+                _, state = pickle.load(f)
+        except (OSError, EOFError, pickle.UnpicklingError):
+            return None
+        return state  # type: ignore
+
+    def load(self, key: str) -> Optional[Tuple[List[pd.DataFrame], Dict[str, Any]]]:
+        """Load outputs and the fitted state of a processing.
+
+        Parameters
+        ----------
+        key : str
+
+        Returns
+        -------
+        Optional[Tuple[List[pd.DataFrame], Dict[str, Any]]]
+            None if it is not cached.
+        """
+        path = self._path(key)
+        try:
+            with open(os.path.join(path, "meta.pkl"), "rb") as f:
+                n_dfs, state = pickle.load(f)
+            dfs = [
+                pd.read_parquet(os.path.join(path, f"{i}.parquet"))
+                for i in range(n_dfs)
+            ]
+        except (OSError, EOFError, pickle.UnpicklingError):
+            return None
+
+        # least recently used entries are evicted first
+        os.utime(path)
+        return dfs, state
+
+    def save(self, key: str, dfs: List[pd.DataFrame], state: Dict[str, Any]) -> bool:
+        """Save outputs and the fitted state of a processing.
+
+        Parameters
+        ----------
+        key : str
+        dfs : List[pd.DataFrame]
+        state : Dict[str, Any]
+
+        Returns
+        -------
+        bool
+            False if the outputs cannot be stored as Parquet files
+            or their dtypes are not kept by them.
+        """
+        tmp_path = tempfile.mkdtemp(dir=self._directory, prefix=".tmp-")
+        try:
+            for i, df in enumerate(dfs):
+                df_path = os.path.join(tmp_path, f"{i}.parquet")
+                df.to_parquet(df_path)
+                # outputs must not depend on whether they are cached
+                check_dtypes(df, df_path, "parquet")
+            with open(os.path.join(tmp_path, "meta.pkl"), "wb") as f:
+                pickle.dump((len(dfs), state), f, protocol=pickle.HIGHEST_PROTOCOL)
+        except Exception as e:
+            shutil.rmtree(tmp_path, ignore_errors=True)
+            pp.logger.debug(f"Outputs are not cached: {e}")
+            return False
+
+        path = self._path(key)
+        shutil.rmtree(path, ignore_errors=True)
+        os.replace(tmp_path, path)
+        os.utime(path)
+
+        self._evict()
+        return True
+
+    def _evict(self) -> None:
+        if self._max_bytes is None:
+            return
+
+        entries = []
+        for name in os.listdir(self._directory):
+            path = os.path.join(self._directory, name)
+            if name.startswith(".") or not os.path.isdir(path):
+                continue
+            size = sum(os.path.getsize(os.path.join(path, f)) for f in os.listdir(path))
+            entries.append((os.path.getmtime(path), size, path))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self._max_bytes:
+                break
+            shutil.rmtree(path, ignore_errors=True)
+            total -= size
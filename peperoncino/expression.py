@@ -0,0 +1,426 @@
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional, Sequence, Set, Tuple
+import ast
+import io
+import tokenize
+import numpy as np
+import pandas as pd
+
+# frames with this number of rows or more are evaluated by numexpr if installed,
+# which is the same threshold as pandas uses numexpr for its operations
+NUMEXPR_MIN_ROWS = 1_000_000
+
+
+def _parse(expr: str) -> Optional[ast.Expression]:
+    # local variables(@) and quoted names(`) are not python syntax
+    if "@" in expr or "`" in expr:
+        return None
+    try:
+        return ast.parse(expr.strip(), mode="eval")
+    except SyntaxError:
+        return None
+
+
+def referenced_names(expr: str) -> Optional[Set[str]]:
+    """Names referenced by an expression of `pd.DataFrame.eval` or `query`.
+
+    Parameters
+    ----------
+    expr : str
+
+    Returns
+    -------
+    Optional[Set[str]]
+        Referenced names, which may include non-column names.
+        None if the expression cannot be analyzed.
+    """
+    tree = _parse(expr)
+    if tree is None:
+        return None
+    return {node.id for node in ast.walk(tree) if isinstance(node, ast.Name)}
+
+
+def is_elementwise(expr: str) -> bool:
+    """Whether an expression is evaluated row by row,
+    i.e. it has no function calls, attributes nor subscripts,
+    which may aggregate rows (e.g. `a > a.mean()`).
+
+    Parameters
+    ----------
+    expr : str
+
+    Returns
+    -------
+    bool
+    """
+    tree = _parse(expr)
+    if tree is None:
+        return False
+    return not any(
+        isinstance(node, (ast.Call, ast.Attribute, ast.Subscript))
+        for node in ast.walk(tree)
+    )
+
+
+# values of records are converted to numpy scalars,
+# which follow numpy (i.e. pandas) semantics of division by zero and overflow
+_SCALARS: Dict[type, Callable[[Any], Any]] = {
+    int: np.int64,
+    float: np.float64,
+    bool: np.bool_,
+    type(None): lambda v: np.nan,
+}
+
+
+def _value(v: Any) -> Any:
+    convert = _SCALARS.get(type(v))
+    return v if convert is None else convert(v)
+
+
+def _invert(v: Any) -> Any:
+    # `~` is logical not for booleans as pandas
+    if isinstance(v, (bool, np.bool_)):
+        return not v
+    return ~v
+
+
+def _replace_booleans(expr: str) -> str:
+    # `&` and `|` have the precedence of `and` and `or` in pandas expressions
+    tokens = tokenize.generate_tokens(io.StringIO(expr.strip()).readline)
+    replaced = {"&": "and", "|": "or"}
+    return tokenize.untokenize(
+        (
+            (tokenize.NAME, replaced[tok.string])
+            if tok.type == tokenize.OP and tok.string in replaced
+            else (tok.type, tok.string)
+        )
+        for tok in tokens
+    )
+
+
+# nodes are parsed from source rather than constructed,
+# since their fields differ between python versions (e.g. `ast.Index`)
+
+
+def _lookup(arg: str, name: str) -> ast.expr:
+    # `arg["name"]`
+    node: ast.expr = ast.parse(f"{arg}[{name!r}]", mode="eval").body
+    return node
+
+
+def _lambda(body: ast.expr, arg: str, filename: str, env: Dict[str, Any]) -> Callable:
+    # a function of one argument returning the expression
+    fn = ast.parse(f"lambda {arg}: None", mode="eval")
+    assert isinstance(fn.body, ast.Lambda)
+    fn.body.body = body
+    code = compile(ast.fix_missing_locations(fn), filename, "eval")
+    compiled: Callable = eval(code, env)
+    return compiled
+
+
+class _RecordCompiler(ast.NodeTransformer):
+    def visit_Name(self, node: ast.Name) -> ast.AST:
+        return ast.Call(
+            func=ast.Name(id="_value", ctx=ast.Load()),
+            args=[_lookup("r", node.id)],
+            keywords=[],
+        )
+
+    def visit_BinOp(self, node: ast.BinOp) -> ast.AST:
+        self.generic_visit(node)
+        # python and pandas differ for negative operands
+        if isinstance(node.op, (ast.FloorDiv, ast.Mod)):
+            raise ValueError("floor division and modulo are not supported")
+        return node
+
+    def visit_UnaryOp(self, node: ast.UnaryOp) -> ast.AST:
+        self.generic_visit(node)
+        if not isinstance(node.op, ast.Invert):
+            return node
+        return ast.Call(
+            func=ast.Name(id="_invert", ctx=ast.Load()),
+            args=[node.operand],
+            keywords=[],
+        )
+
+    def visit_Compare(self, node: ast.Compare) -> ast.AST:
+        self.generic_visit(node)
+        ops = []
+        for op, right in zip(node.ops, node.comparators):
+            is_list = isinstance(right, (ast.List, ast.Tuple, ast.Set))
+            if isinstance(op, (ast.In, ast.NotIn)) and not is_list:
+                # `a in b` of columns tests values of all rows
+                raise ValueError("membership is supported only for literals")
+            # `a == [1, 2]` is `a in [1, 2]` as pandas
+            if isinstance(op, ast.Eq) and is_list:
+                op = ast.In()
+            elif isinstance(op, ast.NotEq) and is_list:
+                op = ast.NotIn()
+            ops.append(op)
+        node.ops = ops
+        return node
+
+
+@lru_cache(maxsize=1024)
+def compile_record_fn(expr: str) -> Optional[Callable[[Dict[str, Any]], Any]]:
+    """Compile an expression of `pd.DataFrame.eval` or `query`
+    into a function evaluating it for a record(a dict of a row).
+
+    Parameters
+    ----------
+    expr : str
+
+    Returns
+    -------
+    Optional[Callable[[Dict[str, Any]], Any]]
+        None if the expression is not elementwise or not supported.
+    """
+    if not is_elementwise(expr):
+        return None
+    try:
+        tree = ast.parse(_replace_booleans(expr), mode="eval")
+        body = _RecordCompiler().visit(tree).body
+        env = {"_value": _value, "_invert": _invert}
+        return _lambda(body, "r", "<record>", env)
+    except Exception:
+        # records are processed as a dataframe instead
+        return None
+
+
+def _call(name: str, *args: ast.expr) -> ast.Call:
+    return ast.Call(
+        func=ast.Name(id=name, ctx=ast.Load()), args=list(args), keywords=[]
+    )
+
+
+def _isin(values: np.ndarray, items: Sequence[Any]) -> np.ndarray:
+    return np.isin(values, list(items))
+
+
+class _Vectorizer(ast.NodeTransformer):
+    """Rewrite an expression into elementwise operations of numpy arrays
+    as pandas evaluates it, e.g. `and` into `&` and `a < b < c`
+    into `(a < b) & (b < c)`. Numeric operands only are supported."""
+
+    def __init__(self) -> None:
+        # whether `~` or `not` is written, which pandas supports only for booleans
+        self.inverts = False
+
+    def visit_BoolOp(self, node: ast.BoolOp) -> ast.AST:
+        self.generic_visit(node)
+        op = ast.BitAnd() if isinstance(node.op, ast.And) else ast.BitOr()
+        expr = node.values[0]
+        for value in node.values[1:]:
+            expr = ast.BinOp(left=expr, op=op, right=value)
+        return expr
+
+    def visit_UnaryOp(self, node: ast.UnaryOp) -> ast.AST:
+        self.generic_visit(node)
+        if isinstance(node.op, (ast.Not, ast.Invert)):
+            self.inverts = True
+        if isinstance(node.op, ast.Not):
+            return ast.UnaryOp(op=ast.Invert(), operand=node.operand)
+        return node
+
+    def visit_BinOp(self, node: ast.BinOp) -> ast.AST:
+        self.generic_visit(node)
+        # pandas returns NaN or inf for integer division by zero
+        if isinstance(node.op, (ast.FloorDiv, ast.Mod)):
+            raise ValueError("floor division and modulo are not supported")
+        return node
+
+    def visit_Constant(self, node: ast.Constant) -> ast.AST:
+        if isinstance(node.value, (str, bytes)):
+            raise ValueError("strings are not supported")
+        return node
+
+    # strings are not `ast.Constant` before python 3.8
+    def visit_Str(self, node: ast.AST) -> ast.AST:
+        raise ValueError("strings are not supported")
+
+    visit_Bytes = visit_Str
+
+    def visit_Compare(self, node: ast.Compare) -> ast.AST:
+        self.generic_visit(node)
+        exprs: List[ast.expr] = []
+        left = node.left
+        for op, right in zip(node.ops, node.comparators):
+            is_list = isinstance(right, (ast.List, ast.Tuple, ast.Set))
+            if isinstance(op, (ast.In, ast.NotIn)) and not is_list:
+                raise ValueError("membership is supported only for literals")
+
+            if is_list and isinstance(op, (ast.In, ast.Eq, ast.NotIn, ast.NotEq)):
+                expr: ast.expr = _call("_isin", left, right)
+                if isinstance(op, (ast.NotIn, ast.NotEq)):
+                    expr = ast.UnaryOp(op=ast.Invert(), operand=expr)
+            else:
+                expr = ast.Compare(left=left, ops=[op], comparators=[right])
+            exprs.append(expr)
+            left = right
+
+        result: ast.expr = exprs[0]
+        for expr in exprs[1:]:
+            result = ast.BinOp(left=result, op=ast.BitAnd(), right=expr)
+        return result
+
+
+class _ColumnLookup(ast.NodeTransformer):
+    def visit_Call(self, node: ast.Call) -> ast.AST:
+        # only arguments are looked up, not functions
+        node.args = [self.visit(arg) for arg in node.args]
+        return node
+
+    def visit_Name(self, node: ast.Name) -> ast.AST:
+        return _lookup("c", node.id)
+
+
+def _import_numexpr() -> Any:
+    try:
+        import numexpr
+    except ImportError:
+        return None
+    return numexpr
+
+
+_MISSING = object()
+
+# pandas casts other dtypes (e.g. `int8 * 100` is int64 unlike numpy)
+_NUMERIC_DTYPES = {np.dtype(np.int64), np.dtype(np.float64), np.dtype(np.bool_)}
+
+
+class CompiledExpression:
+    """An expression of `pd.DataFrame.eval` or `query` parsed once.
+
+    If all the names refer to int64, float64 or bool columns(or values),
+    it is evaluated on their numpy arrays directly, without pandas parsing
+    it again, and by numexpr for frames with `NUMEXPR_MIN_ROWS` rows or more
+    if it is installed. Otherwise, it falls back to `pd.DataFrame.eval`.
+    Use `compile_expression` to share compiled expressions.
+
+    Parameters
+    ----------
+    expr : str
+    """
+
+    def __init__(self, expr: str):
+        self.expr = expr
+        self._names: Tuple[str, ...] = ()
+        self._fn: Optional[Callable[[Dict[str, Any]], Any]] = None
+        self._numexpr_expr: Optional[str] = None
+        self._inverts = False
+        try:
+            self._compile(expr)
+        except Exception:
+            # e.g. syntax not supported, which is evaluated by pandas
+            self._fn = None
+            self._numexpr_expr = None
+
+    def _compile(self, expr: str) -> None:
+        names = referenced_names(expr)
+        if not names or not is_elementwise(expr):
+            return
+        vectorizer = _Vectorizer()
+        tree = ast.parse(_replace_booleans(expr), mode="eval")
+        body = vectorizer.visit(tree).body
+
+        self._names = tuple(sorted(names))
+        self._inverts = vectorizer.inverts
+        # numexpr supports the same syntax except for membership tests
+        unparse = getattr(ast, "unparse", None)
+        if unparse is not None and not any(
+            isinstance(node, ast.Call) for node in ast.walk(body)
+        ):
+            self._numexpr_expr = unparse(ast.fix_missing_locations(body))
+        body = _ColumnLookup().visit(body)
+        self._fn = _lambda(body, "c", "<expression>", {"_isin": _isin})
+
+    def __repr__(self) -> str:
+        return f"CompiledExpression({self.expr!r})"
+
+    def evaluate(self, df: pd.DataFrame, resolvers: Sequence[Any] = ()) -> Any:
+        """Evaluate the expression like `df.eval(expr, resolvers=resolvers)`.
+
+        Parameters
+        ----------
+        df : pd.DataFrame
+        resolvers : Sequence[Any]
+            Mappings of names to values, which are looked up before columns.
+
+        Returns
+        -------
+        Any
+            An array, a series or a scalar.
+        """
+        columns = None if self._fn is None else self._columns(df, resolvers)
+        if self._fn is None or columns is None:
+            # pandas before 1.4 drops the columns when resolvers are given
+            return df.eval(self.expr, resolvers=(*resolvers, df))
+
+        if self._numexpr_expr is not None and len(df) >= NUMEXPR_MIN_ROWS:
+            numexpr = _import_numexpr()
+            if numexpr is not None:
+                try:
+                    return numexpr.evaluate(self._numexpr_expr, local_dict=columns)
+                except NotImplementedError:
+                    # e.g. `~` of integers
+                    pass
+
+        with np.errstate(all="ignore"):
+            return self._fn(columns)
+
+    def query(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Rows of a dataframe where the expression holds like `df.query(expr)`.
+
+        Parameters
+        ----------
+        df : pd.DataFrame
+
+        Returns
+        -------
+        pd.DataFrame
+        """
+        res = self.evaluate(df)
+        try:
+            return df.loc[res]
+        except ValueError:
+            # e.g. boolean frames
+            return df[res]
+
+    def _columns(
+        self, df: pd.DataFrame, resolvers: Sequence[Any]
+    ) -> Optional[Dict[str, Any]]:
+        columns = {}
+        for name in self._names:
+            value = next((r[name] for r in resolvers if name in r), _MISSING)
+            if value is _MISSING:
+                if name not in df.columns:
+                    return None
+                value = df[name]
+
+            if isinstance(value, pd.Series):
+                value = value.to_numpy()
+            if isinstance(value, np.ndarray):
+                if value.ndim != 1 or value.dtype not in _NUMERIC_DTYPES:
+                    return None
+                if self._inverts and value.dtype.kind != "b":
+                    return None
+            elif not isinstance(value, (int, float, np.int64, np.float64, np.bool_)):
+                return None
+            columns[name] = value
+        return columns
+
+
+@lru_cache(maxsize=1024)
+def compile_expression(expr: str) -> CompiledExpression:
+    """A compiled expression of `pd.DataFrame.eval` or `query`,
+    shared by processings in a bounded cache.
+
+    Parameters
+    ----------
+    expr : str
+
+    Returns
+    -------
+    CompiledExpression
+    """
+    return CompiledExpression(expr)
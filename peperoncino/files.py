@@ -0,0 +1,174 @@
+from typing import Any, List, Optional
+import os
+import pandas as pd
+
+FORMATS = ("parquet", "feather")
+
+_EXTENSIONS = {
+    ".parquet": "parquet",
+    ".pq": "parquet",
+    ".feather": "feather",
+    ".arrow": "feather",
+    ".ipc": "feather",
+}
+
+
+def _import_pyarrow() -> Any:
+    try:
+        import pyarrow
+    except ImportError:
+        raise ImportError("pyarrow is required to read and write files.")
+    return pyarrow
+
+
+def infer_format(path: str, format: Optional[str] = None) -> str:
+    """Format of a file, given explicitly or inferred from its extension.
+
+    Parameters
+    ----------
+    path : str
+    format : Optional[str]
+        "parquet", "feather" or None(inferred).
+
+    Returns
+    -------
+    str
+    """
+    if format is None:
+        ext = os.path.splitext(path)[1].lower()
+        if ext not in _EXTENSIONS:
+            raise ValueError(f"The format of {path} cannot be inferred.")
+        return _EXTENSIONS[ext]
+
+    if format not in FORMATS:
+        raise ValueError("`format` should be one of None, 'parquet' and 'feather'")
+    return format
+
+
+def read_columns(path: str, format: str) -> List[str]:
+    """Columns of a file, except ones of the index.
+
+    Parameters
+    ----------
+    path : str
+    format : str
+
+    Returns
+    -------
+    List[str]
+    """
+    schema = _read_schema(path, format)
+    index_cols = _index_columns(schema)
+    return [c for c in schema.names if c not in index_cols]
+
+
+def _read_schema(path: str, format: str) -> Any:
+    pa = _import_pyarrow()
+    if format == "parquet":
+        import pyarrow.parquet as pq
+
+        return pq.read_schema(path)
+
+    with pa.memory_map(path) as f:
+        return pa.ipc.open_file(f).schema
+
+
+def _index_columns(schema: Any) -> List[str]:
+    # index columns stored by pandas, a RangeIndex is stored as metadata
+    metadata = schema.pandas_metadata or {}
+    return [c for c in metadata.get("index_columns", []) if isinstance(c, str)]
+
+
+def read_frame(
+    path: str,
+    format: str,
+    columns: Optional[List[str]] = None,
+    memory_map: bool = False,
+) -> pd.DataFrame:
+    """Read a dataframe from a file with its index.
+
+    Parameters
+    ----------
+    path : str
+    format : str
+    columns : Optional[List[str]]
+        Columns to be read. If None, all columns are read.
+    memory_map : bool
+        If True, the file is memory-mapped instead of read.
+
+    Returns
+    -------
+    pd.DataFrame
+    """
+    _import_pyarrow()
+    if format == "parquet":
+        import pyarrow.parquet as pq
+
+        # index columns are read by pandas metadata
+        table = pq.read_table(
+            path, columns=columns, memory_map=memory_map, use_pandas_metadata=True
+        )
+    else:
+        import pyarrow.feather as feather
+
+        if columns is not None:
+            columns = columns + _index_columns(_read_schema(path, format))
+        table = feather.read_table(path, columns=columns, memory_map=memory_map)
+
+    df: pd.DataFrame = table.to_pandas()
+    return df
+
+
+def _dtypes(df: pd.DataFrame) -> List[str]:
+    levels = range(df.index.nlevels)
+    index = [str(df.index.get_level_values(i).dtype) for i in levels]
+    return [str(dtype) for dtype in df.dtypes] + index
+
+
+def check_dtypes(df: pd.DataFrame, path: str, format: str) -> None:
+    """Check that a dataframe written to a file is read back with its dtypes,
+    e.g. objects of integers and None are read as floats.
+    Only the schema of the file is read.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+    path : str
+    format : str
+
+    Raises
+    ------
+    ValueError
+        If dtypes of columns or the index are not kept.
+    """
+    read = _read_schema(path, format).empty_table().to_pandas()
+    expected, actual = _dtypes(df), _dtypes(read)
+    if actual != expected:
+        raise ValueError(f"dtypes {expected} are read as {actual}.")
+
+
+def write_frame(
+    df: pd.DataFrame, path: str, format: str, compression: Optional[str] = None
+) -> None:
+    """Write a dataframe to a file with its index.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+    path : str
+    format : str
+    compression : Optional[str]
+        A codec of the format (e.g. "uncompressed" of feather).
+        If None, the default one is used.
+    """
+    pa = _import_pyarrow()
+    table = pa.Table.from_pandas(df)
+    kwargs = {} if compression is None else {"compression": compression}
+    if format == "parquet":
+        import pyarrow.parquet as pq
+
+        pq.write_table(table, path, **kwargs)
+    else:
+        import pyarrow.feather as feather
+
+        feather.write_feather(table, path, **kwargs)
@@ -0,0 +1,196 @@
+from typing import Any, Dict, List, Optional, Tuple
+import numpy as np
+import pandas as pd
+
+
+def factorize_keys(
+    dfs: List[pd.DataFrame], cols: List[str]
+) -> Tuple[List[np.ndarray], pd.Index]:
+    """Factorize key columns of dataframes jointly in linear time,
+    so that the same keys have the same codes across dataframes.
+
+    Parameters
+    ----------
+    dfs : List[pd.DataFrame]
+    cols : List[str]
+
+    Returns
+    -------
+    Tuple[List[np.ndarray], pd.Index]
+        Codes for each dataframe and unique keys indexed by the codes,
+        which is a MultiIndex if multiple columns are given.
+        Keys with missing values are coded as -1 like `groupby` drops them.
+    """
+    offsets = np.cumsum([0] + [len(df) for df in dfs])
+
+    codes: Optional[np.ndarray] = None
+    col_codes: List[np.ndarray] = []
+    col_uniques: List[pd.Index] = []
+    for c in cols:
+        values = pd.concat([df[c] for df in dfs], ignore_index=True)
+        _codes, uniques = pd.factorize(values)
+        col_codes.append(_codes)
+        col_uniques.append(pd.Index(uniques))
+
+        if codes is None:
+            codes = _codes
+            continue
+
+        # combine codes of the columns so far and compact them again,
+        # which keeps codes smaller than the number of rows
+        valid = (codes >= 0) & (_codes >= 0)
+        combined = codes[valid] * len(uniques) + _codes[valid]
+        codes = np.full(len(values), -1, dtype=np.intp)
+        codes[valid] = pd.factorize(combined)[0]
+
+    assert codes is not None
+    n_groups = codes.max() + 1 if len(codes) > 0 else 0
+
+    # any position of each group tells its key
+    valid = codes >= 0
+    pos = np.empty(n_groups, dtype=np.intp)
+    pos[codes[valid]] = np.flatnonzero(valid)
+
+    keys = [u.take(c[pos]) for u, c in zip(col_uniques, col_codes)]
+    if len(cols) == 1:
+        index = keys[0].rename(cols[0])
+    else:
+        index = pd.MultiIndex.from_arrays(keys, names=cols)
+
+    return [codes[start:stop] for start, stop in zip(offsets[:-1], offsets[1:])], index
+
+
+def group_count_sum(
+    codes: np.ndarray, values: np.ndarray, n_groups: int
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Count and sum non-missing values by groups.
+
+    Parameters
+    ----------
+    codes : np.ndarray
+        Group codes, where -1 is ignored.
+    values : np.ndarray
+        Float values.
+    n_groups : int
+
+    Returns
+    -------
+    Tuple[np.ndarray, np.ndarray]
+        Counts and sums of groups.
+    """
+    valid = (codes >= 0) & ~np.isnan(values)
+    count = np.bincount(codes[valid], minlength=n_groups)
+    sums = np.bincount(codes[valid], weights=values[valid], minlength=n_groups)
+    return count, sums
+
+
+def take_groups(table: np.ndarray, codes: np.ndarray) -> np.ndarray:
+    """Broadcast values of groups to rows, where code -1 is NaN.
+
+    Parameters
+    ----------
+    table : np.ndarray
+        Float values indexed by group codes.
+    codes : np.ndarray
+
+    Returns
+    -------
+    np.ndarray
+    """
+    # code -1 takes the appended NaN
+    table = np.append(table.astype(np.float64), np.nan)
+    return table.take(codes)
+
+
+# statistics computed by `group_stats`
+GROUP_STATS = ("count", "sum", "mean", "var", "std", "min", "max", "median")
+
+
+def group_stats(
+    codes: np.ndarray, values: np.ndarray, n_groups: int, ops: List[str]
+) -> Dict[str, np.ndarray]:
+    """Statistics of non-missing values by groups,
+    which are the same as ones of `groupby(...).agg(ops)`.
+
+    Parameters
+    ----------
+    codes : np.ndarray
+        Group codes, where -1 is ignored.
+    values : np.ndarray
+        int64 or float64 values.
+    n_groups : int
+    ops : List[str]
+        Statistics in `GROUP_STATS`.
+
+    Returns
+    -------
+    Dict[str, np.ndarray]
+    """
+    is_int = values.dtype.kind in "iu"
+    valid = codes >= 0
+    if not is_int:
+        valid &= ~np.isnan(values)
+    codes, values = codes[valid], values[valid]
+
+    count = np.bincount(codes, minlength=n_groups)
+    stats: Dict[str, np.ndarray] = {"count": count}
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        if "sum" in ops:
+            if is_int:
+                # float weights of bincount lose precision of large integers
+                stats["sum"] = np.zeros(n_groups, dtype=values.dtype)
+                np.add.at(stats["sum"], codes, values)
+            else:
+                stats["sum"] = np.bincount(codes, weights=values, minlength=n_groups)
+
+        if any(op in ops for op in ("mean", "var", "std")):
+            mean = np.bincount(codes, weights=values, minlength=n_groups) / count
+            stats["mean"] = mean
+
+        if "var" in ops or "std" in ops:
+            # squared deviations from the mean are stable unlike squared values
+            dev = (values - mean[codes]) ** 2
+            m2 = np.bincount(codes, weights=dev, minlength=n_groups)
+            var = np.where(count > 1, m2 / (count - 1), np.nan)
+            stats["var"] = var
+            stats["std"] = np.sqrt(var)
+
+    for op, ufunc in (("min", np.minimum), ("max", np.maximum)):
+        if op not in ops:
+            continue
+        init = _extreme(values.dtype, largest=op == "min")
+        table = np.full(n_groups, init, dtype=values.dtype)
+        ufunc.at(table, codes, values)
+        if not is_int:
+            table[count == 0] = np.nan
+        stats[op] = table
+
+    if "median" in ops:
+        stats["median"] = _group_median(codes, values, count)
+
+    return {op: stats[op] for op in ops}
+
+
+def _extreme(dtype: np.dtype, largest: bool) -> Any:
+    if dtype.kind in "iu":
+        info = np.iinfo(dtype)
+        return info.max if largest else info.min
+    return np.inf if largest else -np.inf
+
+
+def _group_median(
+    codes: np.ndarray, values: np.ndarray, count: np.ndarray
+) -> np.ndarray:
+    # sort values within groups, then pick middle ones
+    order = np.lexsort((values, codes))
+    values = values[order].astype(np.float64)
+
+    starts = np.cumsum(count) - count
+    has_values = count > 0
+    lower = (starts + (count - 1) // 2)[has_values]
+    upper = (starts + count // 2)[has_values]
+
+    median = np.full(len(count), np.nan)
+    median[has_values] = (values[lower] + values[upper]) / 2
+    return median
@@ -0,0 +1,138 @@
+from typing import List, Optional, Sequence, Set, TypeVar
+import peperoncino as pp
+from peperoncino.expression import is_elementwise, referenced_names
+
+P = TypeVar("P", bound=pp.BaseProcessing)
+
+
+def optimize(procs: Sequence[pp.BaseProcessing]) -> List[pp.BaseProcessing]:
+    """Rewrite a sequence of processings into a cheaper equivalent one.
+
+    - `Select` and `DropColumns` are moved earlier
+      as long as the processings they pass do not use the dropped columns.
+    - Consecutive `Query`s are fused into one query.
+    - Consecutive `Assign`s are fused into one assignment.
+
+    Parameters
+    ----------
+    procs : Sequence[pp.BaseProcessing]
+
+    Returns
+    -------
+    List[pp.BaseProcessing]
+    """
+    _procs = [p.optimize() if isinstance(p, pp.Pipeline) else p for p in procs]
+    _procs = _hoist_projections(_procs)
+    return _fuse(_procs)
+
+
+def required_columns(
+    procs: Sequence[pp.BaseProcessing], required: Optional[Set[str]] = None
+) -> Optional[Set[str]]:
+    """Columns of input dataframes used by a sequence of processings,
+    folded backward from the columns required of their outputs.
+
+    Parameters
+    ----------
+    procs : Sequence[pp.BaseProcessing]
+    required : Optional[Set[str]]
+        Columns required of outputs. If None, all columns are.
+
+    Returns
+    -------
+    Optional[Set[str]]
+        None if all columns are required or it is unknown.
+        Names which are not columns(e.g. functions in formulae) may be included.
+    """
+    for p in reversed(procs):
+        if isinstance(p, pp.Pipeline) and p._indices is None:
+            required = required_columns(p.procs, required)
+            continue
+        if type(p) is pp.Select and p._indices is None:
+            # only selected columns are passed to the following processings
+            required = set(p._cols)  # type: ignore
+            continue
+        if isinstance(p, pp.Read):
+            # dataframes are appended, and the given ones are passed as they are
+            continue
+
+        usage = p._column_usage()
+        if usage is None or required is None:
+            required = None
+            continue
+        reads, writes = usage
+
+        if p._indices is None:
+            # written columns are made by the processing
+            required = (required - writes) | reads
+        else:
+            required = required | reads
+    return required
+
+
+def _is_projection(proc: pp.BaseProcessing) -> bool:
+    return type(proc) in (pp.Select, pp.DropColumns)
+
+
+def _can_hoist(proj: pp.BaseProcessing, proc: pp.BaseProcessing) -> bool:
+    if _is_projection(proc):
+        return False
+
+    usage = proc._column_usage()
+    if usage is None:
+        return False
+    reads, writes = usage
+
+    cols = set(proj._cols)  # type: ignore
+    if isinstance(proj, pp.DropColumns):
+        return len(cols & (reads | writes)) == 0
+
+    # Select must keep all columns used by the processing,
+    # which must not add any columns to be dropped later.
+    return proc.is_fixed_columns and (reads | writes) <= cols
+
+
+def _hoist_projections(procs: List[pp.BaseProcessing]) -> List[pp.BaseProcessing]:
+    procs = list(procs)
+    for i in range(len(procs)):
+        if not _is_projection(procs[i]):
+            continue
+
+        j = i
+        while j > 0 and _can_hoist(procs[j], procs[j - 1]):
+            procs[j - 1], procs[j] = procs[j], procs[j - 1]
+            j -= 1
+    return procs
+
+
+def _with_config(proc: P, orig: pp.BaseProcessing) -> P:
+    proc._indices = orig._indices
+    proc._backend = orig._backend
+    proc._n_jobs = orig._n_jobs
+    proc._inplace = orig._inplace
+    return proc
+
+
+def _fuse(procs: List[pp.BaseProcessing]) -> List[pp.BaseProcessing]:
+    fused: List[pp.BaseProcessing] = []
+    for p in procs:
+        prev = fused[-1] if len(fused) > 0 else None
+        if prev is None or prev._indices != p._indices:
+            fused.append(p)
+
+        elif type(prev) is pp.Query and type(p) is pp.Query:
+            # the latter query is evaluated on rows dropped by the former one,
+            # then it must not aggregate rows.
+            q1, q2 = prev._query, p._query  # type: ignore
+            if referenced_names(q1) is not None and is_elementwise(q2):
+                fused[-1] = _with_config(pp.Query(f"({q1}) and ({q2})"), prev)
+            else:
+                fused.append(p)
+
+        elif type(prev) is pp.Assign and type(p) is pp.Assign:
+            stages = prev._stages + p._stages  # type: ignore
+            fused[-1] = _with_config(pp.Assign._from_stages(stages), prev)
+
+        else:
+            fused.append(p)
+    return fused
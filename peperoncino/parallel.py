@@ -0,0 +1,78 @@
+from concurrent.futures import Executor
+from concurrent.futures import FIRST_EXCEPTION
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import wait
+from typing import Callable, List, Optional, Sequence, TypeVar
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+BACKENDS = ("thread", "process")
+
+
+def validate_backend(backend: Optional[str]) -> None:
+    if backend is not None and backend not in BACKENDS:
+        raise ValueError("`backend` should be one of None, 'thread' and 'process'")
+
+
+def make_executor(backend: str, n_jobs: Optional[int] = None) -> Executor:
+    """Create an executor for the given backend.
+
+    Parameters
+    ----------
+    backend : str
+        "thread" or "process".
+    n_jobs : Optional[int]
+        The number of workers. If None, the executor's default is used.
+
+    Returns
+    -------
+    Executor
+    """
+    validate_backend(backend)
+    if backend == "process":
+        return ProcessPoolExecutor(max_workers=n_jobs)
+    return ThreadPoolExecutor(max_workers=n_jobs)
+
+
+def map_ordered(
+    fn: Callable[[T], R],
+    items: Sequence[T],
+    backend: Optional[str] = None,
+    n_jobs: Optional[int] = None,
+) -> List[R]:
+    """Apply `fn` to every item, optionally on an executor.
+
+    Results keep the order of `items`.
+    If any call fails, the pending calls are cancelled and
+    the exception of the earliest failed item is raised as is.
+
+    Parameters
+    ----------
+    fn : Callable[[T], R]
+    items : Sequence[T]
+    backend : Optional[str]
+        None(sequential), "thread" or "process".
+    n_jobs : Optional[int]
+        The number of workers.
+
+    Returns
+    -------
+    List[R]
+    """
+    validate_backend(backend)
+    if backend is None or len(items) <= 1:
+        return [fn(item) for item in items]
+
+    with make_executor(backend, n_jobs) as executor:
+        futures = [executor.submit(fn, item) for item in items]
+        _, not_done = wait(futures, return_when=FIRST_EXCEPTION)
+        for f in not_done:
+            f.cancel()
+
+        for f in futures:
+            if f.done() and not f.cancelled() and f.exception() is not None:
+                raise f.exception()  # type: ignore
+
+        return [f.result() for f in futures]
@@ -0,0 +1,259 @@
+from concurrent.futures import Executor
+from concurrent.futures import FIRST_EXCEPTION
+from concurrent.futures import Future
+from concurrent.futures import wait
+from contextlib import nullcontext
+from multiprocessing import resource_tracker
+from multiprocessing.shared_memory import SharedMemory
+from typing import Any, ContextManager, List, NamedTuple, Optional, Sequence
+from typing import Tuple
+import logging
+import numpy as np
+import pandas as pd
+
+import peperoncino as pp
+
+# alignment of arrays in a shared memory block
+_ALIGN = 64
+
+
+class SharedFrame(NamedTuple):
+    """Picklable description of a dataframe placed in shared memory.
+
+    Arrays of numpy dtypes(bool, numbers and datetimes) are laid out
+    in the block `name`, and they are described by `(dtype, offset)`.
+    Other columns(objects and extension arrays) are pickled as they are.
+    """
+
+    name: str
+    n_rows: int
+    columns: pd.Index
+    values: List[Any]
+    index: Any
+    index_name: Any
+
+
+def _is_sharable(values: Any) -> bool:
+    return isinstance(values, np.ndarray) and values.dtype.kind in "biufcmM"
+
+
+def share_frame(df: pd.DataFrame) -> Tuple[SharedMemory, SharedFrame]:
+    """Place a dataframe in a new block of shared memory.
+    The caller must close and unlink the block.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+
+    Returns
+    -------
+    Tuple[SharedMemory, SharedFrame]
+    """
+    arrays: List[Any] = []
+    for i in range(df.shape[1]):
+        array = df.iloc[:, i].array
+        if isinstance(array, pd.arrays.PandasArray):
+            array = array.to_numpy()
+        arrays.append(array)
+
+    index: Any = df.index
+    if not isinstance(index, (pd.RangeIndex, pd.MultiIndex)):
+        if _is_sharable(index.to_numpy()):
+            index = index.to_numpy()
+    arrays.append(index)
+
+    size = 0
+    offsets: List[Optional[int]] = []
+    for a in arrays:
+        if _is_sharable(a):
+            offsets.append(size)
+            size += -(-a.nbytes // _ALIGN) * _ALIGN
+        else:
+            offsets.append(None)
+
+    shm = SharedMemory(create=True, size=max(size, 1))
+    values: List[Any] = []
+    for a, offset in zip(arrays, offsets):
+        if offset is None:
+            values.append(a)
+            continue
+        buf: np.ndarray = np.ndarray(
+            a.shape, dtype=a.dtype, buffer=shm.buf, offset=offset
+        )
+        buf[...] = a
+        del buf
+        values.append((a.dtype, offset))
+
+    *values, index = values
+    frame = SharedFrame(shm.name, len(df), df.columns, values, index, df.index.name)
+    return shm, frame
+
+
+def slice_frame(frame: SharedFrame, start: int, stop: int) -> SharedFrame:
+    """Rows of a dataframe in shared memory, sharing the block.
+
+    Parameters
+    ----------
+    frame : SharedFrame
+    start : int
+    stop : int
+
+    Returns
+    -------
+    SharedFrame
+    """
+
+    def _slice(v: Any) -> Any:
+        if isinstance(v, tuple):
+            dtype, offset = v
+            return dtype, offset + start * dtype.itemsize
+        return v[start:stop]
+
+    return frame._replace(
+        n_rows=stop - start,
+        values=[_slice(v) for v in frame.values],
+        index=_slice(frame.index),
+    )
+
+
+def read_frame(frame: SharedFrame, unlink: bool = False) -> pd.DataFrame:
+    """Copy a dataframe in shared memory.
+
+    Parameters
+    ----------
+    frame : SharedFrame
+    unlink : bool
+        If True, the block is unlinked after copying.
+
+    Returns
+    -------
+    pd.DataFrame
+    """
+    shm = SharedMemory(name=frame.name)
+    try:
+
+        def _read(v: Any) -> Any:
+            if not isinstance(v, tuple):
+                return v
+            dtype, offset = v
+            return np.ndarray(frame.n_rows, dtype=dtype, buffer=shm.buf, offset=offset)
+
+        index = _read(frame.index)
+        if isinstance(index, np.ndarray):
+            index = pd.Index(index, name=frame.index_name, copy=True)
+        # views of the block are copied, which must be released before closing it
+        columns = {i: _read(v) for i, v in enumerate(frame.values)}
+        df = pd.DataFrame(columns, index=index, copy=True)
+        del columns
+    finally:
+        shm.close()
+        if unlink:
+            shm.unlink()
+
+    df.columns = frame.columns
+    return df
+
+
+def _run_partition(
+    procs: Sequence["pp.BaseProcessing"], frames: List[SharedFrame]
+) -> List[SharedFrame]:
+    # logs are summarized by the driver
+    pp.logger.setLevel(logging.WARNING)
+
+    dfs = [read_frame(f) for f in frames]
+    context: ContextManager[Any] = nullcontext()
+    if any(p._inplace for p in procs):
+        context = pd.option_context("mode.chained_assignment", None)
+    with context:
+        for p in procs:
+            dfs = p.transform(dfs)
+
+    outputs = []
+    for df in dfs:
+        shm, frame = share_frame(df)
+        # the driver unlinks the block after reading it
+        shm.close()
+        outputs.append(frame)
+    return outputs
+
+
+def _unlink(name: str) -> None:
+    try:
+        shm = SharedMemory(name=name)
+    except FileNotFoundError:
+        return
+    shm.close()
+    shm.unlink()
+
+
+def transform_partitioned(
+    procs: Sequence["pp.BaseProcessing"],
+    dfs: List[pd.DataFrame],
+    executor: Executor,
+    n_partitions: int,
+) -> List[pd.DataFrame]:
+    """Split dataframes by rows into partitions and transform them
+    by processings on worker processes. Dataframes are sent to workers
+    and sent back through shared memory instead of pickling.
+
+    Processings must be row-local(see `BaseProcessing._is_row_local`)
+    and picklable, since they are sent to workers with their fitted states.
+
+    Parameters
+    ----------
+    procs : Sequence[pp.BaseProcessing]
+    dfs : List[pd.DataFrame]
+    executor : Executor
+        An executor of processes.
+    n_partitions : int
+
+    Returns
+    -------
+    List[pd.DataFrame]
+        Concatenated outputs of partitions, in the order of rows.
+    """
+    # workers must share the tracker of blocks with the driver,
+    # otherwise blocks unlinked by the driver are reported as leaked.
+    resource_tracker.ensure_running()
+
+    blocks: List[SharedMemory] = []
+    futures: List[Future] = []
+    try:
+        frames = []
+        for df in dfs:
+            shm, frame = share_frame(df)
+            blocks.append(shm)
+            frames.append(frame)
+
+        stops = [
+            np.linspace(0, len(df), n_partitions + 1).astype(int).tolist() for df in dfs
+        ]
+        for k in range(n_partitions):
+            parts = [slice_frame(f, s[k], s[k + 1]) for f, s in zip(frames, stops)]
+            futures.append(executor.submit(_run_partition, procs, parts))
+
+        _, not_done = wait(futures, return_when=FIRST_EXCEPTION)
+        for f in not_done:
+            f.cancel()
+        wait(futures)
+
+        # raise the exception of the earliest partition
+        for f in futures:
+            if not f.cancelled() and f.exception() is not None:
+                raise f.exception()  # type: ignore
+
+        outputs: List[List[SharedFrame]] = [f.result() for f in futures]
+        return [
+            pd.concat([read_frame(o[i], unlink=True) for o in outputs], axis=0)
+            for i in range(len(dfs))
+        ]
+
+    finally:
+        # outputs which are not read
+        for f in futures:
+            if f.done() and not f.cancelled() and f.exception() is None:
+                for frame in f.result():
+                    _unlink(frame.name)
+        for shm in blocks:
+            shm.close()
+            shm.unlink()
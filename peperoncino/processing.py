@@ -1,11 +1,18 @@
 from __future__ import annotations
 from abc import ABCMeta
 from abc import abstractmethod
-from typing import List, Set, Dict, Union, Any, Optional
+from concurrent.futures import Executor
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Set
+from typing import Tuple, Type, TypeVar, Union
+import asyncio
+import logging
+import pickle
 import numpy as np
 import pandas as pd
 
 import peperoncino as pp
+from peperoncino.parallel import map_ordered, validate_backend
+from peperoncino.profiling import active_profiler
 
 
 class ColumnsChangedError(Exception):
@@ -16,16 +23,89 @@ class RowsChangedError(Exception):
     pass
 
 
+class NotFittedError(Exception):
+    pass
+
+
+P = TypeVar("P", bound="BaseProcessing")
+
+# a function transforming a record(a dict of a row), or returning None to drop it
+RecordFn = Callable[[Dict[str, Any]], Optional[Dict[str, Any]]]
+
+# attributes of BaseProcessing which are not parameters of processings
+_BASE_ATTRS = (
+    "_is_fixed_columns",
+    "_is_fixed_rows",
+    "_is_stateful",
+    "_logs",
+    "_indices",
+    "_backend",
+    "_n_jobs",
+    "_inplace",
+)
+
+VALIDATION_LEVELS = ("full", "fast", "off")
+_validation_level = "full"
+
+
+def set_validation_level(level: str) -> None:
+    """Set how strictly processings validate their fixed columns and rows.
+
+    Parameters
+    ----------
+    level : str
+        - full: compare columns and rows as sets (default)
+        - fast: compare lengths and identities (or `Index.equals`) first,
+          and compare as sets only if they are reordered
+        - off: no validation
+    """
+    global _validation_level
+    if level not in VALIDATION_LEVELS:
+        raise ValueError("`level` should be one of full, fast and off")
+    _validation_level = level
+
+
+def get_validation_level() -> str:
+    return _validation_level
+
+
+def _is_same_labels(labels: pd.Index, orig_labels: pd.Index, level: str) -> bool:
+    if level == "fast":
+        if labels is orig_labels:
+            return True
+        if len(labels) != len(orig_labels):
+            return False
+        if labels.equals(orig_labels):
+            return True
+
+    labels, orig_labels = labels.unique(), orig_labels.unique()
+    if len(labels) != len(orig_labels):
+        return False
+    return len(labels.intersection(orig_labels)) == len(labels)
+
+
 class BaseProcessing(metaclass=ABCMeta):
     """
     Abstruct class for data processing
     """
 
-    def __init__(self, is_fixed_columns: bool = True, is_fixed_rows: bool = True):
+    # attributes holding the fitted state
+    _state_attrs: Tuple[str, ...] = ()
+
+    def __init__(
+        self,
+        is_fixed_columns: bool = True,
+        is_fixed_rows: bool = True,
+        is_stateful: bool = False,
+    ):
         self._is_fixed_columns = is_fixed_columns
         self._is_fixed_rows = is_fixed_rows
+        self._is_stateful = is_stateful
         self._logs: List[Any] = []
         self._indices: Optional[List[int]] = None
+        self._backend: Optional[str] = None
+        self._n_jobs: Optional[int] = None
+        self._inplace = False
 
     @property
     def is_fixed_columns(self) -> bool:
@@ -35,12 +115,108 @@ class BaseProcessing(metaclass=ABCMeta):
     def is_fixed_rows(self) -> bool:
         return self._is_fixed_rows
 
+    @property
+    def is_stateful(self) -> bool:
+        return self._is_stateful
+
+    def __repr__(self) -> str:
+        params = ", ".join(f"{k}={v!r}" for k, v in self._params().items())
+        r = f"{self.__class__.__name__}({params})"
+        if self._indices is not None:
+            r += f".only({self._indices!r})"
+        return r
+
+    def _params(self) -> Dict[str, Any]:
+        """Parameters of the processing, which are attributes
+        except ones of BaseProcessing and the fitted state.
+
+        Returns
+        -------
+        Dict[str, Any]
+        """
+        return {
+            k.lstrip("_"): v
+            for k, v in vars(self).items()
+            if k not in _BASE_ATTRS and k not in self._state_attrs
+        }
+
+    def _fingerprint_params(self) -> Dict[str, Any]:
+        """Parameters fingerprinting the processing in the cache of
+        `Pipeline.use_cache`, which are `_params()` by default.
+
+        Returns
+        -------
+        Dict[str, Any]
+        """
+        return self._params()
+
+    def _get_state(self) -> Dict[str, Any]:
+        return {k: getattr(self, k) for k in self._state_attrs}
+
+    def _set_state(self, state: Dict[str, Any]) -> None:
+        for k, v in state.items():
+            setattr(self, k, v)
+
+    def _column_usage(self) -> Optional[Tuple[Set[str], Set[str]]]:
+        """Columns read and columns written(added, modified or dropped)
+        by the processing. Used to reorder processings safely.
+
+        Returns
+        -------
+        Optional[Tuple[Set[str], Set[str]]]
+            None if it is unknown.
+        """
+        return None
+
+    def _is_row_local(self) -> bool:
+        """Whether `transform` computes each row from the row itself and
+        the fitted state only, so that dataframes can be split by rows
+        and transformed separately (see `Pipeline.parallel`).
+
+        Returns
+        -------
+        bool
+        """
+        return False
+
+    def _record_fn(self) -> Optional[RecordFn]:
+        """A function transforming a record(a dict of a row) with the fitted
+        state like `transform`, which may mutate the given record and
+        returns None if the row is dropped. Used by `Pipeline.process_records`.
+
+        Returns
+        -------
+        Optional[RecordFn]
+            None if the processing has no implementation for records.
+        """
+        return None
+
+    def _set_columns(self, df: pd.DataFrame, columns: Dict[str, Any]) -> pd.DataFrame:
+        """Set columns like `df.assign`, but in place if the processing is in-place.
+
+        Parameters
+        ----------
+        df : pd.DataFrame
+        columns : Dict[str, Any]
+
+        Returns
+        -------
+        pd.DataFrame
+        """
+        if not self._inplace:
+            return df.assign(**columns)
+
+        for k, v in columns.items():
+            df[k] = v(df) if callable(v) else v
+        return df
+
     def _logging(self, msg: str, level: str = "info") -> None:
         if level not in ["fatal", "error", "warning", "info", "debug"]:
             raise ValueError(
                 "`level` should be one of fatal, error, warning, info and debug"
             )
-        self._logs.append((msg, level))
+        if pp.logger.isEnabledFor(getattr(logging, level.upper())):
+            self._logs.append((msg, level))
 
     def _flush_logs(self) -> None:
         for msg, level in self._logs:
@@ -59,18 +235,171 @@ class BaseProcessing(metaclass=ABCMeta):
         -------
         List[pd.DataFrame]
         """
+        return self._apply(dfs, self._process)
+
+    def fit(self: P, dfs: List[pd.DataFrame]) -> P:
+        """Fit the state of the processing (e.g. encoding mappings) to dataframes.
+        Stateless processings do nothing.
+
+        Parameters
+        ----------
+        dfs : List[pd.DataFrame]
+
+        Returns
+        -------
+        BaseProcessing
+            self
+        """
+        self._validate_input(dfs)
+        self._fit(self._limit(dfs))
+        return self
+
+    def partial_fit(self: P, dfs: List[pd.DataFrame]) -> P:
+        """Update the state of the processing with additional reference rows
+        incrementally, which are not given to the processing before.
+        Stateless processings do nothing.
+
+        Parameters
+        ----------
+        dfs : List[pd.DataFrame]
+
+        Returns
+        -------
+        BaseProcessing
+            self
+        """
+        self._validate_input(dfs)
+        self._partial_fit(self._limit(dfs))
+        return self
+
+    def process_append(self, dfs: List[pd.DataFrame]) -> List[pd.DataFrame]:
+        """Processing rows appended to dataframes processed before.
+        Stateful processings update their states by the new rows
+        (see `partial_fit`), and the new rows are transformed with them.
+        Rows processed before are not processed again, then use `transform`
+        to encode them with the updated states.
+
+        Parameters
+        ----------
+        dfs : List[pd.DataFrame]
+            Dataframes of the appended rows only.
+
+        Returns
+        -------
+        List[pd.DataFrame]
+        """
+        return self._apply(dfs, self._process_append)
+
+    def transform(self, dfs: List[pd.DataFrame]) -> List[pd.DataFrame]:
+        """Processing dataframes with the fitted state.
+        Unlike `process`, the state is never updated by the given dataframes.
+
+        Parameters
+        ----------
+        dfs : List[pd.DataFrame]
+
+        Returns
+        -------
+        List[pd.DataFrame]
+        """
+        return self._apply(dfs, self._transform)
+
+    async def aprocess(
+        self, dfs: List[pd.DataFrame], executor: Optional[Executor] = None
+    ) -> List[pd.DataFrame]:
+        """Processing dataframes on an executor without blocking the event loop.
+
+        Parameters
+        ----------
+        dfs : List[pd.DataFrame]
+        executor : Optional[Executor]
+            If None, the default executor of the event loop is used.
+
+        Returns
+        -------
+        List[pd.DataFrame]
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(executor, self.process, dfs)
+
+    async def atransform(
+        self, dfs: List[pd.DataFrame], executor: Optional[Executor] = None
+    ) -> List[pd.DataFrame]:
+        """Processing dataframes with the fitted state on an executor
+        without blocking the event loop. Since the state is not updated,
+        many calls can be in flight concurrently on a thread pool.
+
+        Parameters
+        ----------
+        dfs : List[pd.DataFrame]
+        executor : Optional[Executor]
+            If None, the default executor of the event loop is used.
+
+        Returns
+        -------
+        List[pd.DataFrame]
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(executor, self.transform, dfs)
+
+    def save(self, path: str) -> None:
+        """Save the processing with its fitted state to a binary file.
+
+        Parameters
+        ----------
+        path : str
+        """
+        with open(path, "wb") as f:
+            pickle.dump(self, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+    @classmethod
+    def load(cls: Type[P], path: str) -> P:
+        """Load a processing saved by `save`.
 
+        Parameters
+        ----------
+        path : str
+
+        Returns
+        -------
+        BaseProcessing
+        """
+        with open(path, "rb") as f:
+            proc = pickle.load(f)
+
+        if not isinstance(proc, cls):
+            raise ValueError(f"{path} is not a saved {cls.__name__}")
+        return proc
+
+    def _validate_input(self, dfs: List[pd.DataFrame]) -> None:
         assert isinstance(dfs, list)
         for df in dfs:
             assert isinstance(df, pd.DataFrame)
 
+    def _apply(
+        self,
+        dfs: List[pd.DataFrame],
+        fn: Callable[[List[pd.DataFrame]], List[pd.DataFrame]],
+    ) -> List[pd.DataFrame]:
+        self._validate_input(dfs)
+
         self._logging(f"Applying: {self.__class__.__name__}")
 
         # memory columns
         orig_cols = [df.columns for df in dfs]
         orig_rows = [df.index for df in dfs]
 
-        dfs = self._process_with_limitation(dfs)
+        profiler = active_profiler()
+        if profiler is None:
+            dfs = self._process_with_limitation(dfs, fn)
+        else:
+            profiler.start(self.__class__.__name__, dfs)
+            try:
+                dfs = self._process_with_limitation(dfs, fn)
+            except BaseException:
+                profiler.abort()
+                raise
+            profiler.stop(dfs)
 
         cols = [df.columns for df in dfs]
         rows = [df.index for df in dfs]
@@ -78,16 +407,19 @@ class BaseProcessing(metaclass=ABCMeta):
         self._logging_summary(cols, rows, orig_cols, orig_rows)
         self._flush_logs()
 
+        level = _validation_level
+        if level == "off":
+            return dfs
+
         for i, (col, orig_col) in enumerate(zip(cols, orig_cols)):
-            col, orig_col = set(col), set(orig_col)
-            if self.is_fixed_columns and len(col | orig_col) != len(col & orig_col):
+            if self.is_fixed_columns and not _is_same_labels(col, orig_col, level):
                 raise ColumnsChangedError(
                     f"Number of columns are changed in df[{i}]."
                     f"Please refer to logs by setting proc.set_log_level(logging.DEBUG)"
                 )
 
         for i, (row, orig_row) in enumerate(zip(rows, orig_rows)):
-            if self.is_fixed_rows and len(row | orig_row) != len(row & orig_row):
+            if self.is_fixed_rows and not _is_same_labels(row, orig_row, level):
                 raise RowsChangedError(
                     f"Number of rows are changed in df[{i}]."
                     f"Please refer to logs by setting proc.set_log_level(logging.DEBUG)"
@@ -109,14 +441,105 @@ class BaseProcessing(metaclass=ABCMeta):
         """
         pass
 
-    def _process_with_limitation(self, dfs: List[pd.DataFrame]) -> List[pd.DataFrame]:
+    def _fit(self, dfs: List[pd.DataFrame]) -> None:
+        """Fit the state of the processing.
+        Stateful processings should override it with `_transform`.
+
+        Parameters
+        ----------
+        dfs : List[pd.DataFrame]
+        """
+        pass
+
+    def _transform(self, dfs: List[pd.DataFrame]) -> List[pd.DataFrame]:
+        """Processing with the fitted state.
+        Stateless processings are the same as `_process`.
+
+        Parameters
+        ----------
+        dfs : List[pd.DataFrame]
+
+        Returns
+        -------
+        List[pd.DataFrame]
+        """
+        return self._process(dfs)
+
+    def _partial_fit(self, dfs: List[pd.DataFrame]) -> None:
+        """Update the state of the processing incrementally.
+        Stateful processings supporting it should override it.
+
+        Parameters
+        ----------
+        dfs : List[pd.DataFrame]
+        """
+        if self.is_stateful:
+            raise NotImplementedError(
+                f"{self.__class__.__name__} does not support incremental fitting."
+            )
+
+    def _process_append(self, dfs: List[pd.DataFrame]) -> List[pd.DataFrame]:
+        # appended rows can be processed separately from rows processed before
+        # only if each row is transformed independently
+        if not self._is_row_local():
+            raise ValueError(
+                f"{self.__class__.__name__} cannot process appended rows separately."
+            )
+        self._partial_fit(dfs)
+        return self._transform(dfs)
+
+    def _fit_stream(self, chunks_fn: Callable[[], Iterable[pd.DataFrame]]) -> None:
+        """Fit the state of the processing to a stream of reference chunks.
+        Stateful processings supporting streaming should override it.
+
+        Parameters
+        ----------
+        chunks_fn : Callable[[], Iterable[pd.DataFrame]]
+            A function returning a new iterable of the reference chunks.
+        """
+        if self.is_stateful:
+            raise NotImplementedError(
+                f"{self.__class__.__name__} does not support streaming."
+            )
+
+    def _transform_stream(
+        self, chunks: Iterable[pd.DataFrame]
+    ) -> Iterator[pd.DataFrame]:
+        """Processing a stream of chunks with the fitted state.
+        Processings supporting streaming should override it.
+
+        Parameters
+        ----------
+        chunks : Iterable[pd.DataFrame]
+
+        Returns
+        -------
+        Iterator[pd.DataFrame]
+        """
+        raise NotImplementedError(
+            f"{self.__class__.__name__} does not support streaming."
+        )
+
+    def _limit(self, dfs: List[pd.DataFrame]) -> List[pd.DataFrame]:
         # limit dataframes by `only` function
+        if self._indices is None:
+            return list(dfs)
+        return [df for i, df in enumerate(dfs) if i in self._indices]
+
+    def _process_with_limitation(
+        self,
+        dfs: List[pd.DataFrame],
+        fn: Optional[Callable[[List[pd.DataFrame]], List[pd.DataFrame]]] = None,
+    ) -> List[pd.DataFrame]:
+        if fn is None:
+            fn = self._process
+
         indices = self._indices
         if indices is None:
-            indices = list(range(len(dfs)))
+            # processings may change the number of dataframes (e.g. `Read`)
+            return fn(list(dfs))
 
-        _dfs = [df for i, df in enumerate(dfs) if i in indices]
-        _dfs = self._process(_dfs)
+        _dfs = fn(self._limit(dfs))
 
         for i in range(len(dfs)):
             if i in indices:
@@ -131,16 +554,21 @@ class BaseProcessing(metaclass=ABCMeta):
         orig_cols: List[pd.Index],
         orig_rows: List[pd.Index],
     ) -> None:
+        # build messages only if they are logged
+        if not pp.logger.isEnabledFor(logging.INFO):
+            return
+        is_debug = pp.logger.isEnabledFor(logging.DEBUG)
+
         for i, (col, row, orig_col, orig_row) in enumerate(
             zip(cols, rows, orig_cols, orig_rows)
         ):
-            added_cols = set(col) - set(orig_col)
-            dropped_cols = set(orig_col) - set(col)
-
             self._logging(f"df[{i}]")
             self._logging(f"#cols: {len(orig_col)} ---> {len(col)}")
-            self._logging(f"+cols: {added_cols}", level="debug")
-            self._logging(f"-cols: {dropped_cols}", level="debug")
+            if is_debug:
+                added_cols = set(col) - set(orig_col)
+                dropped_cols = set(orig_col) - set(col)
+                self._logging(f"+cols: {added_cols}", level="debug")
+                self._logging(f"-cols: {dropped_cols}", level="debug")
             self._logging(f"#rows: {len(orig_row)} ---> {len(row)}")
 
     def only(self, indices: Union[int, List[int]]) -> BaseProcessing:
@@ -165,6 +593,48 @@ class BaseProcessing(metaclass=ABCMeta):
         self._indices = indices
         return self
 
+    def parallel(
+        self, n_jobs: Optional[int] = None, backend: Optional[str] = "thread"
+    ) -> BaseProcessing:
+        """Run independent work of the processing on an executor.
+
+        Only `SeparatedProcessing` makes use of it, by fanning out
+        `sep_process` per dataframe. The order of outputs is kept.
+
+        Parameters
+        ----------
+        n_jobs : Optional[int]
+            The number of workers. If None, the executor's default is used.
+        backend : Optional[str]
+            "thread", "process" or None(sequential). Default is "thread".
+            The "process" backend requires the processing to be picklable.
+
+        Returns
+        -------
+        BaseProcessing
+            self
+        """
+        validate_backend(backend)
+        self._backend = backend
+        self._n_jobs = n_jobs
+        return self
+
+    def set_inplace(self, inplace: bool = True) -> BaseProcessing:
+        """Mutate dataframes in place (e.g. adding, dropping and casting columns)
+        instead of returning new dataframes, which avoids copies of dataframes.
+
+        Parameters
+        ----------
+        inplace : bool
+
+        Returns
+        -------
+        BaseProcessing
+            self
+        """
+        self._inplace = inplace
+        return self
+
 
 class SeparatedProcessing(BaseProcessing):
     """
@@ -172,7 +642,13 @@ class SeparatedProcessing(BaseProcessing):
     """
 
     def _process(self, dfs: List[pd.DataFrame]) -> List[pd.DataFrame]:
-        return [self.sep_process(df) for df in dfs]
+        return map_ordered(self.sep_process, dfs, self._backend, self._n_jobs)
+
+    def _transform_stream(
+        self, chunks: Iterable[pd.DataFrame]
+    ) -> Iterator[pd.DataFrame]:
+        for chunk in chunks:
+            yield self.sep_process(chunk)
 
     @abstractmethod
     def sep_process(self, df: pd.DataFrame) -> pd.DataFrame:
@@ -193,114 +669,87 @@ class SeparatedProcessing(BaseProcessing):
 class MergedProcessing(BaseProcessing):
     """
     Merge all dataframe and apply some processing simultaniously.
+
+    `simul_process` must keep the number and the order of rows
+    of the merged dataframe, since it is split back by row offsets.
     """
 
     def _process(self, dfs: List[pd.DataFrame]) -> List[pd.DataFrame]:
-        orig_dtypes = self._gather_dtypes(dfs)
-        dfs = [self._make_int_cols_nullable(df) for df in dfs]
         dtypes = self._gather_dtypes(dfs)
-        df_indices = [df.index for df in dfs]
-
-        xcols: List[List[str]] = []
-        # set cols with valid dtype
-        for i, df in enumerate(dfs):
-            xcol = list(set(dtypes.keys()) - set(df.columns))
-            df = df.assign(**{c: np.nan for c in xcol})
-            df = df.astype(dtypes)
-            dfs[i] = df
-            xcols.append(xcol)
-
-        # preserve dataframe ids and merge dataframes
-        dfs = [df.assign(__DFID__=i) for i, df in enumerate(dfs)]
-        merged_df = pd.concat(dfs, axis=0, sort=False).reset_index(drop=True)
-        indices = [merged_df.query("__DFID__ == @i").index for i in range(len(dfs))]
-        merged_df = merged_df.drop(columns="__DFID__")
+        xcols = [[c for c in dtypes if c not in df.columns] for df in dfs]
+
+        # integer columns lacked in some dataframes must accept NaN
+        nullable = {
+            c: self._nullable_int_dtype(dtypes[c])
+            for xcol in xcols
+            for c in xcol
+            if dtypes[c].startswith(("int", "uint"))
+        }
+
+        _dfs = []
+        for df, xcol in zip(dfs, xcols):
+            _nullable = {c: t for c, t in nullable.items() if c in df.columns}
+            if len(_nullable) > 0:
+                df = df.astype(_nullable)
+            if len(xcol) > 0:
+                df = df.assign(**{c: np.nan for c in xcol})
+                df = df.astype({c: nullable.get(c, dtypes[c]) for c in xcol})
+            _dfs.append(df)
+
+        # preserve row offsets of each dataframe and merge dataframes
+        offsets = np.cumsum([0] + [len(df) for df in _dfs])
+        df_indices = [df.index for df in _dfs]
+        merged_df = pd.concat(_dfs, axis=0, sort=False, ignore_index=True)
+        del _dfs
 
         merged_df = self.simul_process(merged_df)
+        if len(merged_df) != offsets[-1]:
+            raise RowsChangedError(
+                f"Number of rows are changed in {self.__class__.__name__}."
+                f"simul_process must keep rows of the merged dataframe."
+            )
 
-        for i, (index, df_index, xcol) in enumerate(zip(indices, df_indices, xcols)):
-            df = merged_df.loc[index]
-            df = df.drop(columns=xcol)
-            df.index = df_index
-            dfs[i] = df
+        # restore original dtypes of integer columns made nullable
+        restore_int = {
+            c: dtypes[c]
+            for c, t in nullable.items()
+            if c in merged_df.columns and str(merged_df.dtypes[c]) == t
+        }
 
-        # Restore original dtype (only integers)
-        restore_int = {}
-        for c, dtype in dtypes.items():
-            if not dtype.startswith("Int"):
-                continue
-            restore_int[c] = orig_dtypes[c]
+        split_dfs = []
+        for start, stop, index, xcol in zip(
+            offsets[:-1], offsets[1:], df_indices, xcols
+        ):
+            df = merged_df.iloc[start:stop]
+            xcol = [c for c in xcol if c in df.columns]
+            if len(xcol) > 0:
+                df = df.drop(columns=xcol)
+            df.index = index
 
-        for i, df in enumerate(dfs):
             _dtypes = {k: v for k, v in restore_int.items() if k in df.columns}
             if len(_dtypes) > 0:
-                dfs[i] = df.astype(_dtypes)
+                df = df.astype(_dtypes)
+            split_dfs.append(df)
 
-        return dfs
+        return split_dfs
 
     def _gather_dtypes(self, dfs: List[pd.DataFrame]) -> Dict[str, str]:
-        col_set: Set[str] = set()
-        for df in dfs:
-            col_set |= set(df.columns)
-
         dtypes: Dict[str, str] = {}
-        for c in col_set:
-            dtype_set: Set[str] = set()
-            for df in dfs:
-                if c not in df.columns:
-                    continue
-                dtype_set.add(str(df.dtypes[c]))
-
-            if len(dtype_set) >= 2:
-                raise ValueError(
-                    f"Column {c} has different dtypes"
-                    f"across given dataframes: {dtypes}"
-                )
-
-            dtypes[c] = dtype_set.pop()
-        return dtypes
-
-    def __process(self, dfs: List[pd.DataFrame]) -> List[pd.DataFrame]:
-        # make integer columns nullable
-        dfs = [self._make_int_cols_nullable(df) for df in dfs]
-        # preserve original index
-        orig_indices = [df.index for df in dfs]
-        # assign id and concat
-        dfs = [df.assign(__DFID__=i) for i, df in enumerate(dfs)]
-        merged_df = pd.concat(dfs, axis=0, sort=False).reset_index(drop=True)
-        # preserve which indices are belonging to which df
-        indices = [merged_df.query("__DFID__ == @i").index for i in range(len(dfs))]
-        merged_df = merged_df.drop(columns="__DFID__")
-
-        print(merged_df.dtypes)
-
-        dropped_cols = []
         for df in dfs:
-            # columns added by merging operation will be dropped
-            dropped_cols.append(set(merged_df.columns) - set(df.columns))
-
-        merged_df = self.simul_process(merged_df)
-
-        for i, (df, index, orig_index) in enumerate(zip(dfs, indices, orig_indices)):
-            # columns dropped in processing will be dropped too
-            dcols = set(df.columns) - set(merged_df.columns)
-            dcols |= dropped_cols[i]
-            cols = [c for c in merged_df.columns if c not in dcols]
-
-            df = merged_df.loc[index].get(cols)
-            df.index = orig_index
-            dfs[i] = df
-
-        return dfs
-
-    def _make_int_cols_nullable(self, df: pd.DataFrame) -> pd.DataFrame:
-        dtypes = df.dtypes.astype(str)
-        # select int
-        dtypes = dtypes[dtypes.str.startswith("int")]
-        # capitalized(e.g. Int64) int type accepts NaN
-        dtypes = dtypes.str.capitalize()
+            for c, dtype in df.dtypes.items():
+                dtype = str(dtype)
+                if dtypes.setdefault(c, dtype) != dtype:
+                    raise ValueError(
+                        f"Column {c} has different dtypes"
+                        f"across given dataframes: {dtypes[c]} and {dtype}"
+                    )
+        return dtypes
 
-        return df.astype(dtypes)
+    def _nullable_int_dtype(self, dtype: str) -> str:
+        # capitalized(e.g. Int64, UInt8) int type accepts NaN
+        if dtype.startswith("uint"):
+            return "UInt" + dtype[len("uint") :]
+        return dtype.capitalize()
 
     @abstractmethod
     def simul_process(self, df: pd.DataFrame) -> pd.DataFrame:
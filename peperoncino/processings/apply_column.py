@@ -1,4 +1,4 @@
-from typing import Callable
+from typing import Callable, Optional, Set, Tuple
 import pandas as pd
 from peperoncino import SeparatedProcessing
 
@@ -18,6 +18,12 @@ class ApplyColumn(SeparatedProcessing):
         self._col = col
         self._fn = fn
 
+    def _column_usage(self) -> Optional[Tuple[Set[str], Set[str]]]:
+        return {self._col}, {self._col}
+
+    def _is_row_local(self) -> bool:
+        return True
+
     def sep_process(self, df: pd.DataFrame) -> pd.DataFrame:
-        df = df.assign(**{self._col: df[self._col].apply(self._fn)})
+        df = self._set_columns(df, {self._col: df[self._col].apply(self._fn)})
         return df
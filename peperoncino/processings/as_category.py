@@ -1,10 +1,13 @@
-from typing import List, Optional
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
 import pandas as pd
-from peperoncino import MergedProcessing
+from peperoncino import BaseProcessing
+from peperoncino import NotFittedError
 
 
-class AsCategory(MergedProcessing):
+class AsCategory(BaseProcessing):
     """Change dtypes as category.
+    Categories are the union of values of all dataframes,
+    so that dataframes have the same dtypes.
 
     Parameters
     ----------
@@ -14,17 +17,75 @@ class AsCategory(MergedProcessing):
         filled by this value and use it as category.
     """
 
+    _state_attrs = ("_categories",)
+
     def __init__(self, cols: List[str], fillna: Optional[str] = None):
-        super().__init__()
+        super().__init__(is_stateful=True)
         self._cols = cols
         self._fillna = fillna
+        self._categories: Optional[Dict[str, pd.Index]] = None
+
+    def _column_usage(self) -> Optional[Tuple[Set[str], Set[str]]]:
+        return set(self._cols), set(self._cols)
+
+    def _is_row_local(self) -> bool:
+        return True
+
+    def _process(self, dfs: List[pd.DataFrame]) -> List[pd.DataFrame]:
+        self._fit(dfs)
+        return self._transform(dfs)
+
+    def _fit(self, dfs: List[pd.DataFrame]) -> None:
+        self._fit_chunks(dfs)
+
+    def _fit_stream(self, chunks_fn: Callable[[], Iterable[pd.DataFrame]]) -> None:
+        self._fit_chunks(chunks_fn())
+
+    def _fit_chunks(self, chunks: Iterable[pd.DataFrame]) -> None:
+        # only unique values are gathered instead of merging dataframes
+        uniques: Dict[str, List[pd.Index]] = {c: [] for c in self._cols}
+        for df in chunks:
+            for c in self._cols:
+                if c not in df.columns:
+                    continue
+                col = self._fill(df[c])
+                uniques[c].append(pd.Index(col.dropna().unique()))
+
+        self._categories = {}
+        for c, _uniques in uniques.items():
+            if len(_uniques) == 0:
+                continue
+            values = _uniques[0].append(_uniques[1:]).unique()
+            # categories are sorted in the same way as `astype("category")`
+            self._categories[c] = pd.Categorical(values).categories
+
+    def _transform(self, dfs: List[pd.DataFrame]) -> List[pd.DataFrame]:
+        if self._categories is None:
+            raise NotFittedError("AsCategory is not fitted yet.")
 
-    def simul_process(self, df: pd.DataFrame) -> pd.DataFrame:
-        if self._fillna is not None:
-            cols = df.get(self._cols)
-            cols = cols.fillna(self._fillna)
-            df = df.assign(**cols.to_dict("siries"))
+        dtypes = {
+            c: pd.CategoricalDtype(categories)
+            for c, categories in self._categories.items()
+        }
+        return [
+            self._set_columns(
+                df,
+                {
+                    c: self._fill(df[c]).astype(dtype)
+                    for c, dtype in dtypes.items()
+                    if c in df.columns
+                },
+            )
+            for df in dfs
+        ]
 
-        df = df.astype({c: "category" for c in self._cols})
+    def _transform_stream(
+        self, chunks: Iterable[pd.DataFrame]
+    ) -> Iterator[pd.DataFrame]:
+        for chunk in chunks:
+            yield self._transform([chunk])[0]
 
-        return df
+    def _fill(self, col: pd.Series) -> pd.Series:
+        if self._fillna is None:
+            return col
+        return col.fillna(self._fillna)
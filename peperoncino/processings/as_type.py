@@ -1,6 +1,21 @@
-from typing import Dict
+from typing import Any, Callable, Dict, Optional, Set, Tuple
+import numpy as np
 import pandas as pd
 from peperoncino import SeparatedProcessing
+from peperoncino.processing import RecordFn
+
+
+def _caster(dtype: Any) -> Optional[Callable[[Any], Any]]:
+    # casts of numpy dtypes for records, None for other dtypes
+    if not isinstance(dtype, np.dtype):
+        return None
+    if dtype.kind in "biuf":
+        return lambda v: dtype.type(np.nan if v is None else v)
+    if dtype.kind == "U":
+        return str
+    if dtype.kind == "O":
+        return lambda v: v
+    return None
 
 
 class AsType(SeparatedProcessing):
@@ -23,15 +38,41 @@ class AsType(SeparatedProcessing):
             if mapping[k] == "datetime":
                 _dt_cols.append(k)
                 _mapping.pop(k)
-            
+
         self._mapping = _mapping
         self._dt_cols = _dt_cols
 
+    def _column_usage(self) -> Optional[Tuple[Set[str], Set[str]]]:
+        cols = set(self._mapping) | set(self._dt_cols)
+        return cols, cols
+
+    def _is_row_local(self) -> bool:
+        # categories depend on all values
+        return all(str(t) != "category" for t in self._mapping.values())
+
+    def _record_fn(self) -> Optional[RecordFn]:
+        casts: Dict[str, Callable[[Any], Any]] = {}
+        for k, t in self._mapping.items():
+            cast = _caster(pd.api.types.pandas_dtype(t))
+            if cast is None:
+                return None
+            casts[k] = cast
+        for k in self._dt_cols:
+            casts[k] = pd.to_datetime
+
+        def as_type(r: Dict[str, Any]) -> Dict[str, Any]:
+            for k, cast in casts.items():
+                r[k] = cast(r[k])
+            return r
+
+        return as_type
+
     def sep_process(self, df: pd.DataFrame) -> pd.DataFrame:
-        df = df.astype(self._mapping)
+        if self._inplace:
+            cast = {k: df[k].astype(t) for k, t in self._mapping.items()}
+            df = self._set_columns(df, cast)
+        else:
+            df = df.astype(self._mapping)
 
-        df = df.assign(**{
-            k: pd.to_datetime(df[k])
-            for k in self._dt_cols
-        })
+        df = self._set_columns(df, {k: pd.to_datetime(df[k]) for k in self._dt_cols})
         return df
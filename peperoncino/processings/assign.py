@@ -1,6 +1,16 @@
-from typing import Any
+from __future__ import annotations
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+import numpy as np
 import pandas as pd
 from peperoncino import SeparatedProcessing
+from peperoncino.expression import compile_expression, compile_record_fn
+from peperoncino.expression import is_elementwise
+from peperoncino.expression import referenced_names
+from peperoncino.processing import RecordFn
+
+
+def _constant(value: Any) -> Callable[[Dict[str, Any]], Any]:
+    return lambda r: value
 
 
 class Assign(SeparatedProcessing):
@@ -19,20 +29,81 @@ class Assign(SeparatedProcessing):
     Parameters
     ----------
     **formula : Any
-        formula or values
+        formula or values.
+        Formulae are compiled once and shared by processings (see `compile_expression`).
     """
 
     def __init__(self, **formula: Any):
         super().__init__(is_fixed_columns=False)
-        self._formula = formula
+        # formulae in a stage are evaluated on the same columns,
+        # and later stages can refer to columns assigned by earlier ones.
+        self._stages: List[Dict[str, Any]] = [formula]
+
+    @classmethod
+    def _from_stages(cls, stages: List[Dict[str, Any]]) -> Assign:
+        proc = cls()
+        proc._stages = stages
+        return proc
+
+    def _params(self) -> Dict[str, Any]:
+        if len(self._stages) == 1:
+            return {"formula": self._stages[0]}
+        return {"stages": self._stages}
+
+    def _column_usage(self) -> Optional[Tuple[Set[str], Set[str]]]:
+        reads: Set[str] = set()
+        writes: Set[str] = set()
+        for stage in self._stages:
+            for k, f in stage.items():
+                if isinstance(f, str):
+                    names = referenced_names(f)
+                    if names is None:
+                        return None
+                    reads |= names
+                writes.add(k)
+        return reads, writes
+
+    def _is_row_local(self) -> bool:
+        # arrays and series are assigned by positions or indices of all rows
+        return all(
+            is_elementwise(f) if isinstance(f, str) else np.isscalar(f)
+            for stage in self._stages
+            for f in stage.values()
+        )
+
+    def _record_fn(self) -> Optional[RecordFn]:
+        stages: List[List[Tuple[str, Callable[[Dict[str, Any]], Any]]]] = []
+        for stage in self._stages:
+            fns = []
+            for k, f in stage.items():
+                if isinstance(f, str):
+                    fn = compile_record_fn(f)
+                    if fn is None:
+                        return None
+                elif np.isscalar(f):
+                    fn = _constant(f)
+                else:
+                    return None
+                fns.append((k, fn))
+            stages.append(fns)
+
+        def assign(r: Dict[str, Any]) -> Dict[str, Any]:
+            for fns in stages:
+                r.update([(k, fn(r)) for k, fn in fns])
+            return r
+
+        return assign
 
     def sep_process(self, df: pd.DataFrame) -> pd.DataFrame:
-        _assign = {}
-        for k, f in self._formula.items():
-            if isinstance(f, str):
-                val = df.eval(f)
-            else:
-                val = f
-            _assign[k] = val
-        df = df.assign(**_assign)
+        _assign: Dict[str, Any] = {}
+        for stage in self._stages:
+            values = {}
+            for k, f in stage.items():
+                if isinstance(f, str):
+                    val = compile_expression(f).evaluate(df, (_assign,))
+                else:
+                    val = f
+                values[k] = val
+            _assign.update(values)
+        df = self._set_columns(df, _assign)
         return df
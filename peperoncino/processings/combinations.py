@@ -3,10 +3,21 @@ from itertools import permutations
 from itertools import product
 from itertools import combinations
 from itertools import combinations_with_replacement
-from typing import List
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+import numpy as np
 import pandas as pd
 
 from peperoncino import SeparatedProcessing
+from peperoncino.expression import compile_expression, compile_record_fn
+from peperoncino.processing import RecordFn
+
+# operations computed for all pairs at once
+_UFUNCS: Dict[str, np.ufunc] = {
+    "+": np.add,
+    "-": np.subtract,
+    "*": np.multiply,
+    "/": np.true_divide,
+}
 
 
 class Combinations(SeparatedProcessing):
@@ -27,6 +38,10 @@ class Combinations(SeparatedProcessing):
         - product
         - permutaions
         Please refer to `itertools` for more details.
+
+    When all `ops` are arithmetic operations(+, -, *, /) and `cols` share
+    a numeric dtype, features are computed as one block of arrays.
+    Otherwise, each feature is computed by a compiled expression(`compile_expression`).
     """
 
     def __init__(
@@ -38,7 +53,9 @@ class Combinations(SeparatedProcessing):
         super().__init__(is_fixed_columns=False)
         self._cols = cols
         self._ops = ops
+        self._comb_type = comb_type
 
+        self._comb_fn: Callable[[Iterable[str]], Iterable[Tuple[str, ...]]]
         if comb_type == "combinations":
             self._comb_fn = partial(combinations, r=2)
         elif comb_type == "combinations_with_replacement":
@@ -54,9 +71,86 @@ class Combinations(SeparatedProcessing):
                 " 'product' and 'permutations'"
             )
 
+    def _params(self) -> Dict[str, Any]:
+        return {"cols": self._cols, "ops": self._ops, "comb_type": self._comb_type}
+
+    def _column_usage(self) -> Optional[Tuple[Set[str], Set[str]]]:
+        names = {
+            f"{op}_{a}_{b}" for a, b in self._comb_fn(self._cols) for op in self._ops
+        }
+        return set(self._cols), names
+
+    def _is_row_local(self) -> bool:
+        return True
+
+    def _record_fn(self) -> Optional[RecordFn]:
+        fns = []
+        for a, b in self._comb_fn(self._cols):
+            for op in self._ops:
+                fn = compile_record_fn(f"{a} {op} {b}")
+                if fn is None:
+                    return None
+                fns.append((f"{op}_{a}_{b}", fn))
+
+        def combine(r: Dict[str, Any]) -> Dict[str, Any]:
+            r.update([(name, fn(r)) for name, fn in fns])
+            return r
+
+        return combine
+
     def sep_process(self, df: pd.DataFrame) -> pd.DataFrame:
+        pairs = [(a, b) for a, b in self._comb_fn(self._cols)]
+        names = [f"{op}_{a}_{b}" for a, b in pairs for op in self._ops]
+
+        if self._is_vectorizable(df, names):
+            block = self._compute_block(df, pairs, names)
+            if self._inplace:
+                return self._set_columns(df, dict(block.items()))
+            return pd.concat([df, block], axis=1, copy=False)
+
         formulae = {}
-        for a, b in self._comb_fn(self._cols):
+        for a, b in pairs:
             for op in self._ops:
-                formulae[f"{op}_{a}_{b}"] = df.eval(f"{a} {op} {b}")
-        return df.assign(**formulae)
+                expr = compile_expression(f"{a} {op} {b}")
+                formulae[f"{op}_{a}_{b}"] = expr.evaluate(df)
+        return self._set_columns(df, formulae)
+
+    def _is_vectorizable(self, df: pd.DataFrame, names: List[str]) -> bool:
+        if any(op not in _UFUNCS for op in self._ops):
+            return False
+
+        # existing columns are overwritten by `assign`
+        if len(set(names)) != len(names) or df.columns.isin(names).any():
+            return False
+
+        dtypes = df.dtypes[self._cols]
+        if len(set(dtypes)) != 1:
+            return False
+        dtype = dtypes.iloc[0]
+        return isinstance(dtype, np.dtype) and dtype.kind in "iuf"
+
+    def _compute_block(
+        self, df: pd.DataFrame, pairs: List[Tuple[str, str]], names: List[str]
+    ) -> pd.DataFrame:
+        # features are laid out column by column, as pandas stores them
+        values = df[self._cols].to_numpy().T
+        pos = {c: i for i, c in enumerate(self._cols)}
+        left = values[[pos[a] for a, _ in pairs]]
+        right = values[[pos[b] for _, b in pairs]]
+
+        n_ops = len(self._ops)
+        ufuncs = [_UFUNCS[op] for op in self._ops]
+        out_dtypes = [fn(values[:1, :0], values[:1, :0]).dtype for fn in ufuncs]
+
+        with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+            if len(set(out_dtypes)) == 1:
+                # features of the k-th op are at every n_ops rows from k
+                out = np.empty((len(names), len(df)), dtype=out_dtypes[0])
+                for k, fn in enumerate(ufuncs):
+                    fn(left, right, out=out[k::n_ops])
+                return pd.DataFrame(out.T, index=df.index, columns=names)
+
+            outs = [fn(left, right) for fn in ufuncs]
+
+        columns = {name: outs[i % n_ops][i // n_ops] for i, name in enumerate(names)}
+        return pd.DataFrame(columns, index=df.index)
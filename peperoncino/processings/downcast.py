@@ -0,0 +1,210 @@
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Set
+from typing import Tuple
+import numpy as np
+import pandas as pd
+from peperoncino import BaseProcessing
+from peperoncino import NotFittedError
+
+_INT_DTYPES = [np.dtype(t) for t in ("int8", "int16", "int32", "int64")]
+
+
+class _ColumnSummary:
+    """Summary of a column over dataframes to choose its dtype."""
+
+    def __init__(self) -> None:
+        self.dtypes: Set[np.dtype] = set()
+        self.n_rows = 0
+        self.min: Any = None
+        self.max: Any = None
+        self.is_float32_exact = True
+        self.is_string = True
+        self.uniques: List[pd.Index] = []
+
+    def update(self, col: pd.Series, check_strings: bool) -> None:
+        self.dtypes.add(col.dtype)
+        self.n_rows += len(col)
+        if not isinstance(col.dtype, np.dtype):
+            return
+
+        values = col.to_numpy()
+        if col.dtype.kind in "iu" and len(values) > 0:
+            _min, _max = values.min(), values.max()
+            self.min = _min if self.min is None else min(self.min, _min)
+            self.max = _max if self.max is None else max(self.max, _max)
+
+        if col.dtype.kind in "iuf" and self.is_float32_exact:
+            with np.errstate(over="ignore", invalid="ignore"):
+                casted = values.astype(np.float32).astype(values.dtype)
+            exact = casted == values
+            if col.dtype.kind == "f":
+                # array_equal(equal_nan=True) needs numpy 1.19
+                exact |= np.isnan(casted) & np.isnan(values)
+            self.is_float32_exact = bool(exact.all())
+
+        if col.dtype.kind == "O" and check_strings and self.is_string:
+            self.is_string = pd.api.types.infer_dtype(col, skipna=True) == "string"
+            if self.is_string:
+                self.uniques.append(pd.Index(col.dropna().unique()))
+
+
+class Downcast(BaseProcessing):
+    """Downcast columns to the smallest dtypes holding values of all dataframes.
+    The same dtypes are applied to every dataframe.
+
+    - int: the smallest one of int8, int16 and int32
+    - float: float32 if values are kept by it
+    - object of strings: category if the number of unique values is small
+
+    Bytes saved per column are reported by `report`.
+
+    Parameters
+    ----------
+    cols : Optional[List[str]]
+        Columns to be downcasted. If None, all columns are.
+    category_ratio : float
+        Strings become category if the number of unique values is at most
+        this ratio of the number of rows. Default is 0.5.
+    lossy_float : bool
+        If True, float64 is downcasted to float32 even if values are rounded.
+        Default is False.
+    """
+
+    _state_attrs = ("_dtypes", "_report")
+
+    def __init__(
+        self,
+        cols: Optional[List[str]] = None,
+        category_ratio: float = 0.5,
+        lossy_float: bool = False,
+    ):
+        super().__init__(is_stateful=True)
+        self._cols = cols
+        self._category_ratio = category_ratio
+        self._lossy_float = lossy_float
+        self._dtypes: Optional[Dict[str, Any]] = None
+        self._report: Optional[pd.DataFrame] = None
+
+    @property
+    def dtypes(self) -> Optional[Dict[str, Any]]:
+        return self._dtypes
+
+    @property
+    def report(self) -> Optional[pd.DataFrame]:
+        """Dtypes and bytes of downcasted columns by the last processing,
+        summed over dataframes.
+
+        Returns
+        -------
+        Optional[pd.DataFrame]
+            Indexed by columns, with `from`, `to`, `bytes_before`,
+            `bytes_after` and `bytes_saved`.
+        """
+        return self._report
+
+    def _column_usage(self) -> Optional[Tuple[Set[str], Set[str]]]:
+        if self._cols is None:
+            return None
+        return set(self._cols), set(self._cols)
+
+    def _process(self, dfs: List[pd.DataFrame]) -> List[pd.DataFrame]:
+        self._fit(dfs)
+        return self._transform(dfs)
+
+    def _fit(self, dfs: List[pd.DataFrame]) -> None:
+        self._fit_chunks(dfs)
+
+    def _fit_stream(self, chunks_fn: Callable[[], Iterable[pd.DataFrame]]) -> None:
+        self._fit_chunks(chunks_fn())
+
+    def _fit_chunks(self, chunks: Iterable[pd.DataFrame]) -> None:
+        summaries: Dict[str, _ColumnSummary] = {}
+        for df in chunks:
+            cols = df.columns if self._cols is None else self._cols
+            for c in cols:
+                summary = summaries.setdefault(c, _ColumnSummary())
+                summary.update(df[c], check_strings=self._category_ratio > 0)
+
+        self._dtypes = {}
+        for c, summary in summaries.items():
+            dtype = self._choose_dtype(summary)
+            if dtype is not None:
+                self._dtypes[c] = dtype
+
+    def _choose_dtype(self, summary: _ColumnSummary) -> Any:
+        dtypes = summary.dtypes
+        if not all(isinstance(t, np.dtype) for t in dtypes):
+            return None
+        kinds = {t.kind for t in dtypes}
+
+        if kinds <= {"i", "u"}:
+            if summary.min is None:
+                return None
+            for dtype in _INT_DTYPES:
+                info = np.iinfo(dtype)
+                if info.min <= summary.min and summary.max <= info.max:
+                    break
+            # the largest one of dataframes must be downcasted
+            return dtype if dtype.itemsize < max(t.itemsize for t in dtypes) else None
+
+        if kinds <= {"i", "u", "f"}:
+            is_float32 = summary.is_float32_exact or (
+                self._lossy_float and kinds == {"f"}
+            )
+            if is_float32 and max(t.itemsize for t in dtypes) > 4:
+                return np.dtype(np.float32)
+            return None
+
+        if kinds == {"O"} and summary.is_string and summary.n_rows > 0:
+            categories = pd.Index([]).append(summary.uniques).unique()
+            if len(categories) > summary.n_rows * self._category_ratio:
+                return None
+            return pd.CategoricalDtype(categories.sort_values())
+
+        return None
+
+    def _transform(self, dfs: List[pd.DataFrame]) -> List[pd.DataFrame]:
+        if self._dtypes is None:
+            raise NotFittedError("Downcast is not fitted yet.")
+
+        report: Dict[str, List[Any]] = {}
+        _dfs = []
+        for df in dfs:
+            cols = {c: t for c, t in self._dtypes.items() if c in df.columns}
+            casted = {c: self._cast(df[c], t) for c, t in cols.items()}
+
+            for c, col in casted.items():
+                before = df[c].memory_usage(index=False, deep=True)
+                after = col.memory_usage(index=False, deep=True)
+                row = report.setdefault(c, [str(df[c].dtype), str(col.dtype), 0, 0])
+                row[2] += before
+                row[3] += after
+
+            _dfs.append(self._set_columns(df, casted))
+
+        self._report = pd.DataFrame.from_dict(
+            report,
+            orient="index",
+            columns=["from", "to", "bytes_before", "bytes_after"],
+        )
+        self._report["bytes_saved"] = (
+            self._report["bytes_before"] - self._report["bytes_after"]
+        )
+
+        if len(report) > 0:
+            saved = self._report["bytes_saved"].sum()
+            self._logging(f"Downcasted {len(report)} columns, {saved} bytes saved")
+        return _dfs
+
+    def _transform_stream(
+        self, chunks: Iterable[pd.DataFrame]
+    ) -> Iterator[pd.DataFrame]:
+        for chunk in chunks:
+            yield self._transform([chunk])[0]
+
+    def _cast(self, col: pd.Series, dtype: Any) -> pd.Series:
+        # values unseen in fitting must not overflow silently
+        if isinstance(dtype, np.dtype) and dtype.kind == "i" and len(col) > 0:
+            info = np.iinfo(dtype)
+            if col.min() < info.min or col.max() > info.max:
+                raise ValueError(f"Column {col.name} overflows {dtype}.")
+        return col.astype(dtype)
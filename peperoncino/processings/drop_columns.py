@@ -1,6 +1,7 @@
-from typing import List
+from typing import Any, Dict, List, Optional, Set, Tuple
 import pandas as pd
 from peperoncino import SeparatedProcessing
+from peperoncino.processing import RecordFn
 
 
 class DropColumns(SeparatedProcessing):
@@ -15,5 +16,24 @@ class DropColumns(SeparatedProcessing):
         super().__init__(is_fixed_columns=False)
         self._cols = cols
 
+    def _column_usage(self) -> Optional[Tuple[Set[str], Set[str]]]:
+        return set(self._cols), set(self._cols)
+
+    def _is_row_local(self) -> bool:
+        return True
+
+    def _record_fn(self) -> Optional[RecordFn]:
+        cols = self._cols
+
+        def drop(r: Dict[str, Any]) -> Dict[str, Any]:
+            for c in cols:
+                del r[c]
+            return r
+
+        return drop
+
     def sep_process(self, df: pd.DataFrame) -> pd.DataFrame:
+        if self._inplace:
+            df.drop(columns=self._cols, inplace=True)
+            return df
         return df.drop(columns=self._cols)
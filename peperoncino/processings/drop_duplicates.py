@@ -1,8 +1,46 @@
-from typing import List, Optional
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+import numpy as np
 import pandas as pd
 from peperoncino import SeparatedProcessing
 
 
+def _common_dtypes(dfs: List[pd.DataFrame]) -> Dict[Any, np.dtype]:
+    """Common dtypes of columns whose dtypes differ between dataframes,
+    e.g. float64 of int64 in train and float64 in test with NaN.
+    """
+    dtypes: Dict[Any, List[Any]] = {}
+    for df in dfs:
+        for col, dtype in df.dtypes.items():
+            dtypes.setdefault(col, []).append(dtype)
+
+    common = {}
+    for col, _dtypes in dtypes.items():
+        if all(dtype == _dtypes[0] for dtype in _dtypes):
+            continue
+        if not all(
+            isinstance(dtype, np.dtype) and dtype.kind in "biuf" for dtype in _dtypes
+        ):
+            raise ValueError(f"dtypes of {col} differ between dataframes: {_dtypes}")
+        common[col] = np.result_type(*_dtypes)
+    return common
+
+
+def _hash_rows(df: pd.DataFrame, dtypes: Optional[Dict[Any, Any]] = None) -> pd.Series:
+    """Hashes of rows, which depend on dtypes of columns."""
+    dtypes = dtypes or {}
+    if dtypes or any(dtype.kind == "f" for dtype in df.dtypes):
+        columns = []
+        for col, s in df.items():
+            if col in dtypes:
+                s = s.astype(dtypes[col])
+            if s.dtype.kind == "f":
+                # -0.0 and 0.0 are equal as in `drop_duplicates`
+                s = s + 0.0
+            columns.append(s)
+        df = pd.concat(columns, axis=1)
+    return pd.util.hash_pandas_object(df, index=False)
+
+
 class DropDuplicates(SeparatedProcessing):
     """Drop duplicate rows.
 
@@ -12,15 +50,75 @@ class DropDuplicates(SeparatedProcessing):
         Only these columns are considered for uniqueness
         If this is None, all columns are considered.
         Default value is `None`.
+    ref : Optional[int]
+        If given, rows of the other dataframes which appear in
+        the reference dataframe are also dropped (e.g. leakage of train
+        rows into validation or test). Default value is `None`.
+
+    Rows are compared by their 64-bit hashes. With `ref`, numeric columns
+    are cast to common dtypes of the dataframes before hashing (e.g. ints
+    of train and floats of test), and other dtypes must be the same.
+    In streaming, rows are compared with all preceding chunks by row hashes,
+    so that the hashes of unique rows are kept in memory.
     """
 
-    def __init__(self, cols: Optional[List[str]] = None):
+    def __init__(self, cols: Optional[List[str]] = None, ref: Optional[int] = None):
         super().__init__(is_fixed_rows=False)
         self._cols = cols
+        self._ref = ref
+
+    def _column_usage(self) -> Optional[Tuple[Set[str], Set[str]]]:
+        if self._cols is None:
+            return None
+        return set(self._cols), set()
+
+    def _process(self, dfs: List[pd.DataFrame]) -> List[pd.DataFrame]:
+        if self._ref is None:
+            return super()._process(dfs)
+
+        keys = [self._keys(df) for df in dfs]
+        dtypes = _common_dtypes(keys)
+        all_hashes = [_hash_rows(_df, dtypes) for _df in keys]
+        ref_hashes = all_hashes[self._ref]
+        _dfs = []
+        for i, (df, hashes) in enumerate(zip(dfs, all_hashes)):
+            mask = ~hashes.duplicated().to_numpy()
+            if i != self._ref:
+                mask &= ~hashes.isin(ref_hashes.to_numpy()).to_numpy()
+            _dfs.append(self._filter(df, mask))
+        return _dfs
 
     def sep_process(self, df: pd.DataFrame) -> pd.DataFrame:
-        _df = df
-        if self._cols is not None:
-            _df = df.get(self._cols)
-        index = _df.drop_duplicates().index
-        return df.loc[index]
+        mask = ~self._hashes(df).duplicated().to_numpy()
+        return self._filter(df, mask)
+
+    def _keys(self, df: pd.DataFrame) -> pd.DataFrame:
+        if self._cols is None:
+            return df
+        return df[self._cols]
+
+    def _hashes(self, df: pd.DataFrame) -> pd.Series:
+        return _hash_rows(self._keys(df))
+
+    def _filter(self, df: pd.DataFrame, mask: np.ndarray) -> pd.DataFrame:
+        # rows are selected by positions, since indices may not be unique
+        if mask.all():
+            return df
+        return df[mask]
+
+    def _transform_stream(
+        self, chunks: Iterable[pd.DataFrame]
+    ) -> Iterator[pd.DataFrame]:
+        if self._ref is not None:
+            raise NotImplementedError("`ref` is not supported in streaming.")
+
+        seen: Set[int] = set()
+        for df in chunks:
+            hashes = self._hashes(df)
+
+            mask = ~hashes.duplicated().values
+            mask &= np.fromiter(
+                (h not in seen for h in hashes.values.tolist()), bool, len(hashes)
+            )
+            seen.update(hashes.values[mask].tolist())
+            yield df[mask]
@@ -1,6 +1,51 @@
-from typing import List, Tuple
+from __future__ import annotations
+from functools import partial
+from numbers import Number
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+from typing import Sequence, Set, Tuple, Union
+import os
+import weakref
+import numpy as np
 import pandas as pd
 from peperoncino import BaseProcessing
+from peperoncino.cache import StepCache, fingerprint_frames, fingerprint_step
+from peperoncino.parallel import make_executor
+from peperoncino.processing import RecordFn
+from peperoncino.processings.read import Read
+from peperoncino.spill import Spiller
+
+# functions for records compiled by pipelines, with their fitted states
+_record_plans: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+
+
+def _is_streamed(proc: BaseProcessing) -> bool:
+    # a stream is regarded as the first dataframe
+    return proc._indices is None or 0 in proc._indices
+
+
+def _state_values(proc: BaseProcessing) -> List[Any]:
+    if isinstance(proc, Pipeline):
+        return [v for p in proc.procs for v in _state_values(p)]
+    return list(proc._get_state().values())
+
+
+def _to_array(records: List[Dict[str, Any]]) -> np.ndarray:
+    if len(records) == 0:
+        return np.empty((0, 0))
+    cols = list(records[0])
+    rows = [[r[c] for c in cols] for r in records]
+    is_numeric = all(isinstance(v, Number) for row in rows for v in row)
+    return np.array(rows, dtype=np.float64 if is_numeric else object)
+
+
+def _stream_through(
+    procs: Sequence[BaseProcessing], chunks: Iterable[pd.DataFrame]
+) -> Iterator[pd.DataFrame]:
+    _chunks = iter(chunks)
+    for p in procs:
+        if _is_streamed(p):
+            _chunks = p._transform_stream(_chunks)
+    return _chunks
 
 
 class Pipeline(BaseProcessing):
@@ -14,12 +59,585 @@ class Pipeline(BaseProcessing):
     def __init__(self, *procs: BaseProcessing):
         super().__init__(is_fixed_columns=False, is_fixed_rows=False)
         self._procs = procs
+        self._cache: Optional[StepCache] = None
+        self._copy_inputs = False
+        self._memory_budget: Optional[int] = None
+        self._spill_directory: Optional[str] = None
 
     @property
     def procs(self) -> Tuple[BaseProcessing, ...]:
         return self._procs
 
+    def _params(self) -> Dict[str, Any]:
+        return {"procs": self._procs}
+
+    def _get_state(self) -> Dict[str, Any]:
+        return {"procs": [p._get_state() for p in self._procs]}
+
+    def _set_state(self, state: Dict[str, Any]) -> None:
+        for p, s in zip(self._procs, state["procs"]):
+            p._set_state(s)
+
+    def use_cache(
+        self, directory: Optional[str], max_bytes: Optional[int] = None
+    ) -> Pipeline:
+        """Cache outputs of processings on disk as Parquet files (requires pyarrow).
+
+        Outputs are keyed by the fingerprint of input dataframes and
+        parameters of processings so far, so when a processing is changed,
+        processings before it are loaded from the cache instead of running.
+        Fitted states of stateful processings are restored as well.
+        Processings using functions are fingerprinted by their code, default
+        arguments, closures and global variables referenced by them, except
+        that global functions, classes and modules are fingerprinted by names.
+        Outputs whose dtypes are not kept by Parquet files (e.g. objects of
+        integers and None) are not cached.
+
+        Parameters
+        ----------
+        directory : Optional[str]
+            The directory of the cache. If None, the cache is disabled.
+        max_bytes : Optional[int]
+            The size limit of the cache. Least recently used outputs are
+            evicted beyond it. If None, the cache is not limited.
+
+        Returns
+        -------
+        Pipeline
+            self
+
+        Raises
+        ------
+        ValueError
+            If the partition backend or a memory budget is set.
+        """
+        self._check_modes(
+            directory is not None,
+            self._backend == "partition",
+            self._memory_budget is not None,
+        )
+        if directory is None:
+            self._cache = None
+        else:
+            self._cache = StepCache(directory, max_bytes)
+        return self
+
+    def set_memory_budget(
+        self, max_bytes: Optional[int], directory: Optional[str] = None
+    ) -> Pipeline:
+        """Keep dataframes within a memory budget while processing,
+        by spilling dataframes not used by the current processing
+        (e.g. test dataframes while `only(0)` processings run on train ones)
+        to uncompressed Feather files in a temporary directory (requires pyarrow).
+        Spilled dataframes are read back by memory mapping when they are used,
+        and the files are removed at the end. While they are spilled,
+        processings see them as empty dataframes with the same columns.
+
+        Parameters
+        ----------
+        max_bytes : Optional[int]
+            The budget of dataframes in memory. If None, nothing is spilled.
+        directory : Optional[str]
+            The parent of the temporary directory. If None, the system default.
+
+        Returns
+        -------
+        Pipeline
+            self
+
+        Raises
+        ------
+        ValueError
+            If the cache or the partition backend is set.
+        """
+        self._check_modes(
+            self._cache is not None, self._backend == "partition", max_bytes is not None
+        )
+        self._memory_budget = max_bytes
+        self._spill_directory = directory
+        return self
+
+    def _check_modes(self, cache: bool, partition: bool, memory_budget: bool) -> None:
+        # each mode runs processings in its own way, so they are not combined
+        modes = [
+            name
+            for name, enabled in [
+                ("use_cache", cache),
+                ("the partition backend", partition),
+                ("set_memory_budget", memory_budget),
+            ]
+            if enabled
+        ]
+        if len(modes) > 1:
+            raise ValueError(f"{' and '.join(modes)} cannot be used together.")
+
+    @property
+    def is_stateful(self) -> bool:
+        return any(p.is_stateful for p in self._procs)
+
+    def parallel(
+        self, n_jobs: Optional[int] = None, backend: Optional[str] = "thread"
+    ) -> BaseProcessing:
+        """Run independent work of processings on an executor.
+
+        With the "partition" backend, dataframes are split by rows into
+        `n_jobs` partitions, which are sent to worker processes through
+        shared memory. Each run of consecutive row-local processings
+        (e.g. `Query`, `Assign`, `ApplyColumn` and `Combinations`) is
+        applied to the partitions on the workers, and the outputs are
+        concatenated in the order of rows. Stateful processings are fitted
+        on the driver, and they are sent to the workers with their fitted
+        states. Other processings(e.g. `DropDuplicates`) run on the driver.
+        Processings must be picklable, i.e. functions must be defined at
+        the top level of modules. The backend requires
+        `multiprocessing.shared_memory`(python 3.8+), and it cannot be used
+        with `use_cache` or `set_memory_budget`.
+
+        Parameters
+        ----------
+        n_jobs : Optional[int]
+            The number of workers. If None, the number of CPUs is used.
+        backend : Optional[str]
+            "thread", "process", "partition" or None(sequential).
+            Default is "thread".
+
+        Returns
+        -------
+        BaseProcessing
+            self
+
+        Raises
+        ------
+        ValueError
+            If the partition backend is not available, or it is used
+            with the cache or a memory budget.
+        """
+        if backend == "partition":
+            self._check_modes(
+                self._cache is not None, True, self._memory_budget is not None
+            )
+            try:
+                import peperoncino.partition  # noqa: F401
+            except ImportError as e:
+                raise ValueError(
+                    "The partition backend requires multiprocessing.shared_memory"
+                    " (python 3.8 or later)."
+                ) from e
+            self._backend = backend
+            self._n_jobs = n_jobs
+            # processings run sequentially on each worker
+            for p in self._procs:
+                p.parallel(None, None)
+            return self
+
+        super().parallel(n_jobs, backend)
+        for p in self._procs:
+            p.parallel(n_jobs, backend)
+        return self
+
+    def _is_row_local(self) -> bool:
+        if self._cache is not None:
+            return False
+        return all(p._is_row_local() and not p.is_stateful for p in self._procs)
+
+    def set_inplace(
+        self, inplace: bool = True, copy_inputs: bool = False
+    ) -> BaseProcessing:
+        """Let processings mutate dataframes in place instead of copying them
+        at every step, which reduces the peak memory.
+
+        Parameters
+        ----------
+        inplace : bool
+        copy_inputs : bool
+            If True, input dataframes are copied once at the entry of
+            the pipeline, so that the caller's dataframes are kept.
+            Otherwise they may be mutated.
+
+        Returns
+        -------
+        BaseProcessing
+            self
+        """
+        super().set_inplace(inplace)
+        self._copy_inputs = copy_inputs
+        for p in self._procs:
+            p.set_inplace(inplace)
+        return self
+
+    def optimize(self) -> Pipeline:
+        """Rewrite the pipeline into a cheaper one with the same results.
+
+        - `Select` and `DropColumns` are moved earlier
+          as long as the processings they pass do not use the dropped columns.
+        - Consecutive `Query`s are fused into one query.
+        - Consecutive `Assign`s are fused into one assignment.
+
+        Returns
+        -------
+        Pipeline
+            A new pipeline. Use `explain` to see the rewritten plan.
+        """
+        from peperoncino.optimizer import optimize
+
+        pipeline = Pipeline(*optimize(self._procs))
+        pipeline._indices = self._indices
+        pipeline._backend = self._backend
+        pipeline._n_jobs = self._n_jobs
+        pipeline._cache = self._cache
+        pipeline._inplace = self._inplace
+        pipeline._copy_inputs = self._copy_inputs
+        pipeline._memory_budget = self._memory_budget
+        pipeline._spill_directory = self._spill_directory
+        return pipeline
+
+    def explain(self) -> str:
+        """Describe processings of the pipeline as an indented tree.
+
+        Returns
+        -------
+        str
+        """
+        lines: List[str] = []
+        self._explain(lines, 0)
+        return "\n".join(lines)
+
+    def _explain(self, lines: List[str], depth: int) -> None:
+        line = "  " * depth + "Pipeline"
+        if self._indices is not None:
+            line += f".only({self._indices!r})"
+        lines.append(line)
+
+        for p in self._procs:
+            if isinstance(p, Pipeline):
+                p._explain(lines, depth + 1)
+            else:
+                lines.append("  " * (depth + 1) + repr(p))
+
+    def _column_usage(self) -> Optional[Tuple[Set[str], Set[str]]]:
+        reads: Set[str] = set()
+        writes: Set[str] = set()
+        for p in self._procs:
+            usage = p._column_usage()
+            if usage is None:
+                return None
+            reads |= usage[0]
+            writes |= usage[1]
+        return reads, writes
+
+    def process_records(
+        self, records: List[Dict[str, Any]], as_array: bool = False
+    ) -> Union[List[Dict[str, Any]], np.ndarray]:
+        """Processing a few records(dicts of rows) with the fitted state
+        like `transform`, without building dataframes for online inference.
+
+        Processings are compiled into functions for records once, and they
+        are recompiled when their states are fitted again. `Query`, `Assign`
+        and `Combinations` with elementwise formulae, `AsType` to numpy dtypes,
+        `Select`, `RenameColumns`, `DropColumns` and encoders are supported.
+        Otherwise, records are processed as a dataframe by `transform`.
+        Records are regarded as the first dataframe, and values of the outputs
+        may be numpy scalars. Unlike `transform`, columns and rows are not
+        validated and no logs are written.
+
+        ```
+        pipeline.fit([train_df])
+        pipeline.process_records([{"foo": 1, "bar": "x"}])
+        ```
+
+        Parameters
+        ----------
+        records : List[Dict[str, Any]]
+            Records with the same keys.
+        as_array : bool
+            If True, outputs are returned as a 2-D array in the order of
+            columns, whose dtype is float64 if all values are numbers and
+            object otherwise.
+
+        Returns
+        -------
+        Union[List[Dict[str, Any]], np.ndarray]
+        """
+        states = _state_values(self)
+        plan = _record_plans.get(self)
+        if plan is None or not (
+            len(plan[0]) == len(states) and all(a is b for a, b in zip(plan[0], states))
+        ):
+            plan = (states, self._record_fn())
+            _record_plans[self] = plan
+        fn = plan[1]
+
+        outputs: List[Dict[str, Any]] = []
+        if fn is None:
+            self._logging("Records are processed as a dataframe", "debug")
+            if len(records) > 0:
+                (df,) = self.transform([pd.DataFrame.from_records(records)])
+                if as_array:
+                    values: np.ndarray = df.to_numpy()
+                    return values
+                outputs = df.to_dict("records")
+        else:
+            with np.errstate(all="ignore"):
+                for r in records:
+                    _r = fn(dict(r))
+                    if _r is not None:
+                        outputs.append(_r)
+
+        return _to_array(outputs) if as_array else outputs
+
+    def _record_fn(self) -> Optional[RecordFn]:
+        fns = []
+        for p in self._procs:
+            if not _is_streamed(p):
+                # records are regarded as the first dataframe
+                continue
+            fn = p._record_fn()
+            if fn is None:
+                return None
+            fns.append(fn)
+
+        def run(r: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+            for fn in fns:
+                _r = fn(r)
+                if _r is None:
+                    return None
+                r = _r
+            return r
+
+        return run
+
+    def process_stream(
+        self,
+        chunks: Iterable[pd.DataFrame],
+        ref_chunks: Optional[Callable[[], Iterable[pd.DataFrame]]] = None,
+    ) -> Iterator[pd.DataFrame]:
+        """Processing a stream of chunks lazily.
+        Memory usage is bounded by the chunk size instead of the data size.
+
+        Stateful processings are fitted by aggregation passes over `ref_chunks`
+        in advance, and then chunks are processed by a single streaming pass.
+        `DropDuplicates` drops duplicates across all chunks of the stream.
+
+        ```
+        def ref_chunks():
+            return pd.read_csv("train.csv", chunksize=10 ** 6)
+
+        for df in pipeline.process_stream(
+            pd.read_csv("test.csv", chunksize=10 ** 6), ref_chunks=ref_chunks
+        ):
+            ...
+        ```
+
+        Parameters
+        ----------
+        chunks : Iterable[pd.DataFrame]
+        ref_chunks : Optional[Callable[[], Iterable[pd.DataFrame]]]
+            A function returning a new iterable of the reference chunks,
+            since one pass is needed for each stateful processing.
+            If None, the stateful processings must be fitted already.
+
+        Returns
+        -------
+        Iterator[pd.DataFrame]
+        """
+        if ref_chunks is not None:
+            self.fit_stream(ref_chunks)
+        return self._transform_stream(chunks)
+
+    def fit_stream(self, chunks_fn: Callable[[], Iterable[pd.DataFrame]]) -> Pipeline:
+        """Fit stateful processings to a stream of reference chunks.
+
+        Parameters
+        ----------
+        chunks_fn : Callable[[], Iterable[pd.DataFrame]]
+            A function returning a new iterable of the reference chunks.
+
+        Returns
+        -------
+        Pipeline
+            self
+        """
+        self._fit_stream(chunks_fn)
+        return self
+
+    def _apply(
+        self,
+        dfs: List[pd.DataFrame],
+        fn: Callable[[List[pd.DataFrame]], List[pd.DataFrame]],
+    ) -> List[pd.DataFrame]:
+        if not self._inplace:
+            return super()._apply(dfs, fn)
+
+        if self._copy_inputs:
+            dfs = [df.copy() for df in dfs]
+
+        # dataframes sliced by processings are intended to be mutated
+        with pd.option_context("mode.chained_assignment", None):
+            return super()._apply(dfs, fn)
+
     def _process(self, dfs: List[pd.DataFrame]) -> List[pd.DataFrame]:
+        self._push_down_projections()
+        if self._cache is not None:
+            return self._process_cached(dfs, self._cache)
+        if self._backend == "partition":
+            return self._process_partitioned(dfs, fit=True)
+        if self._memory_budget is not None:
+            return self._process_spilled(dfs, self._memory_budget, fit=True)
+
+        for p in self._procs:
+            dfs = p.process(dfs)
+        return dfs
+
+    def _process_spilled(
+        self, dfs: List[pd.DataFrame], max_bytes: int, fit: bool
+    ) -> List[pd.DataFrame]:
+        with Spiller(max_bytes, self._spill_directory, self._logging) as spiller:
+            for p in self._procs:
+                needed = range(len(dfs)) if p._indices is None else p._indices
+                dfs = spiller.prepare(dfs, needed)
+                dfs = p.process(dfs) if fit else p.transform(dfs)
+            return spiller.restore(dfs)
+
+    def _push_down_projections(self) -> None:
+        # `Read` reads only columns used by the following processings
+        from peperoncino.optimizer import required_columns
+
+        for i, p in enumerate(self._procs):
+            if isinstance(p, Read):
+                required = required_columns(self._procs[i + 1 :])
+                p._projection = None if required is None else sorted(required)
+
+    def _flatten(self) -> List[BaseProcessing]:
+        # nested pipelines without their own configurations are inlined
+        procs: List[BaseProcessing] = []
         for p in self._procs:
+            if isinstance(p, Pipeline) and p._indices is None and p._cache is None:
+                procs.extend(p._flatten())
+            else:
+                procs.append(p)
+        return procs
+
+    def _process_partitioned(
+        self, dfs: List[pd.DataFrame], fit: bool
+    ) -> List[pd.DataFrame]:
+        # shared memory is not available before python 3.8
+        from peperoncino.partition import transform_partitioned
+
+        n_jobs = self._n_jobs or os.cpu_count() or 1
+
+        with make_executor("process", n_jobs) as executor:
+
+            def run(
+                segment: List[BaseProcessing], dfs: List[pd.DataFrame]
+            ) -> List[pd.DataFrame]:
+                if len(segment) == 0:
+                    return dfs
+                names = ", ".join(p.__class__.__name__ for p in segment)
+                self._logging(f"Applying on {n_jobs} partitions: {names}")
+                return transform_partitioned(segment, dfs, executor, n_jobs)
+
+            segment: List[BaseProcessing] = []
+            for p in self._flatten():
+                if not p._is_row_local():
+                    dfs = run(segment, dfs)
+                    segment = []
+                    dfs = p.process(dfs) if fit else p.transform(dfs)
+                    continue
+
+                if fit and p.is_stateful:
+                    # the state is fitted to outputs of the preceding processings
+                    dfs = run(segment, dfs)
+                    segment = []
+                    p.fit(dfs)
+                segment.append(p)
+
+            return run(segment, dfs)
+
+    def _process_cached(
+        self, dfs: List[pd.DataFrame], cache: StepCache
+    ) -> List[pd.DataFrame]:
+        try:
+            key = fingerprint_frames(dfs)
+        except TypeError:
+            # unhashable values (e.g. lists) cannot be fingerprinted
+            self._logging("Inputs are not cached: unhashable values", "debug")
+            for p in self._procs:
+                dfs = p.process(dfs)
+            return dfs
+
+        keys = []
+        for p in self._procs:
+            key = fingerprint_step(key, p)
+            keys.append(key)
+
+        # load outputs of the longest cached prefix,
+        # whose stateful processings have their states cached
+        start = 0
+        for k in reversed(range(len(keys))):
+            if keys[k] not in cache:
+                continue
+            states = {
+                i: cache.load_state(keys[i])
+                for i in range(k)
+                if self._procs[i].is_stateful
+            }
+            if any(s is None for s in states.values()):
+                continue
+            loaded = cache.load(keys[k])
+            if loaded is None:
+                continue
+
+            dfs, state = loaded
+            states[k] = state
+            for i, s in states.items():
+                self._procs[i]._set_state(s)  # type: ignore
+            start = k + 1
+            self._logging(f"Loaded outputs of {start} processings from cache")
+            break
+
+        for p, key in zip(self._procs[start:], keys[start:]):
             dfs = p.process(dfs)
+            cache.save(key, dfs, p._get_state())
         return dfs
+
+    def _fit(self, dfs: List[pd.DataFrame]) -> None:
+        # processing fits stateful processings to their inputs
+        self._process(dfs)
+
+    def _transform(self, dfs: List[pd.DataFrame]) -> List[pd.DataFrame]:
+        self._push_down_projections()
+        if self._backend == "partition":
+            return self._process_partitioned(dfs, fit=False)
+        if self._memory_budget is not None:
+            return self._process_spilled(dfs, self._memory_budget, fit=False)
+
+        for p in self._procs:
+            dfs = p.transform(dfs)
+        return dfs
+
+    def _partial_fit(self, dfs: List[pd.DataFrame]) -> None:
+        # states are updated by outputs of the preceding processings
+        self._process_append(dfs)
+
+    def _process_append(self, dfs: List[pd.DataFrame]) -> List[pd.DataFrame]:
+        for p in self._procs:
+            dfs = p.process_append(dfs)
+        return dfs
+
+    def _fit_stream(self, chunks_fn: Callable[[], Iterable[pd.DataFrame]]) -> None:
+        for i, p in enumerate(self._procs):
+            if not (_is_streamed(p) and p.is_stateful):
+                continue
+
+            prefix_fn = partial(self._stream_prefix, i, chunks_fn)
+            p._fit_stream(prefix_fn)
+
+    def _stream_prefix(
+        self, i: int, chunks_fn: Callable[[], Iterable[pd.DataFrame]]
+    ) -> Iterator[pd.DataFrame]:
+        return _stream_through(self._procs[:i], chunks_fn())
+
+    def _transform_stream(
+        self, chunks: Iterable[pd.DataFrame]
+    ) -> Iterator[pd.DataFrame]:
+        return _stream_through(self._procs, chunks)
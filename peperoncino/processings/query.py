@@ -1,5 +1,10 @@
+from typing import Any, Dict, Optional, Set, Tuple
 import pandas as pd
 from peperoncino import SeparatedProcessing
+from peperoncino.expression import compile_expression, compile_record_fn
+from peperoncino.expression import is_elementwise
+from peperoncino.expression import referenced_names
+from peperoncino.processing import RecordFn
 
 
 class Query(SeparatedProcessing):
@@ -9,11 +14,31 @@ class Query(SeparatedProcessing):
     ----------
     query : str
         query strings to be passed to pd.DataFrame.query.
+        It is compiled once and shared by processings with the same query.
     """
 
     def __init__(self, query: str):
         super().__init__(is_fixed_rows=False)
         self._query = query
 
+    def _column_usage(self) -> Optional[Tuple[Set[str], Set[str]]]:
+        names = referenced_names(self._query)
+        if names is None:
+            return None
+        return names, set()
+
+    def _is_row_local(self) -> bool:
+        return is_elementwise(self._query)
+
+    def _record_fn(self) -> Optional[RecordFn]:
+        cond = compile_record_fn(self._query)
+        if cond is None:
+            return None
+
+        def query(r: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+            return r if cond(r) else None
+
+        return query
+
     def sep_process(self, df: pd.DataFrame) -> pd.DataFrame:
-        return df.query(self._query)
+        return compile_expression(self._query).query(df)
@@ -0,0 +1,91 @@
+from typing import Any, Dict, List, Optional, Union
+import os
+import pandas as pd
+from peperoncino import BaseProcessing
+from peperoncino.files import infer_format, read_columns, read_frame
+
+
+class Read(BaseProcessing):
+    """Read dataframes from Parquet or Feather files (requires pyarrow),
+    which are appended to the given dataframes.
+
+    In a pipeline, only columns used by the following processings are read,
+    e.g. when they end with `Select`, columns not selected are never read.
+
+    ```
+    pipeline = pp.Pipeline(
+        pp.Read(["train.parquet", "test.parquet"]),
+        pp.Assign(z="x * y"),
+        pp.Select(["id", "z"]),
+    )
+    train_df, test_df = pipeline.process([])  # reads only id, x and y
+    ```
+
+    Files are fingerprinted by their paths, modification times and sizes
+    instead of their contents by the cache of `Pipeline.use_cache`.
+
+    Parameters
+    ----------
+    paths : Union[str, List[str]]
+    columns : Optional[List[str]]
+        Columns to be read. If None, all columns are read.
+    format : Optional[str]
+        "parquet" or "feather". If None, it is inferred from extensions.
+    memory_map : bool
+        If True, files are memory-mapped instead of read, which avoids copies
+        of uncompressed Feather files.
+    """
+
+    def __init__(
+        self,
+        paths: Union[str, List[str]],
+        columns: Optional[List[str]] = None,
+        format: Optional[str] = None,
+        memory_map: bool = False,
+    ):
+        super().__init__(is_fixed_columns=False, is_fixed_rows=False)
+        self._paths = [paths] if isinstance(paths, str) else list(paths)
+        self._columns = columns
+        self._format = format
+        self._memory_map = memory_map
+        # columns used by the following processings, set by the pipeline
+        self._projection: Optional[List[str]] = None
+
+        for path in self._paths:
+            infer_format(path, format)
+
+    def _params(self) -> Dict[str, Any]:
+        params = {
+            "paths": self._paths,
+            "columns": self._columns,
+            "format": self._format,
+            "memory_map": self._memory_map,
+        }
+        if self._projection is not None:
+            params["projection"] = self._projection
+        return params
+
+    def _fingerprint_params(self) -> Dict[str, Any]:
+        # files rewritten in place are read again instead of the cache
+        stats = [os.stat(path) for path in self._paths]
+        files = [(stat.st_mtime_ns, stat.st_size) for stat in stats]
+        return dict(self._params(), files=files)
+
+    def _process(self, dfs: List[pd.DataFrame]) -> List[pd.DataFrame]:
+        _dfs = list(dfs)
+        for path in self._paths:
+            format = infer_format(path, self._format)
+
+            columns = None
+            if self._columns is not None or self._projection is not None:
+                all_columns = read_columns(path, format)
+                columns = [
+                    c
+                    for c in all_columns
+                    if (self._columns is None or c in self._columns)
+                    and (self._projection is None or c in self._projection)
+                ]
+                self._logging(f"{path}: {len(columns)} of {len(all_columns)} columns")
+
+            _dfs.append(read_frame(path, format, columns, self._memory_map))
+        return _dfs
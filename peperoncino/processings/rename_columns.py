@@ -1,6 +1,7 @@
-from typing import Dict
+from typing import Any, Dict, Optional, Set, Tuple
 import pandas as pd
 from peperoncino import SeparatedProcessing
+from peperoncino.processing import RecordFn
 
 
 class RenameColumns(SeparatedProcessing):
@@ -19,5 +20,22 @@ class RenameColumns(SeparatedProcessing):
         mapping.update(kwargs)
         self._mapping = mapping
 
+    def _column_usage(self) -> Optional[Tuple[Set[str], Set[str]]]:
+        return set(self._mapping), set(self._mapping) | set(self._mapping.values())
+
+    def _is_row_local(self) -> bool:
+        return True
+
+    def _record_fn(self) -> Optional[RecordFn]:
+        mapping = self._mapping
+
+        def rename(r: Dict[str, Any]) -> Dict[str, Any]:
+            return {mapping.get(k, k): v for k, v in r.items()}
+
+        return rename
+
     def sep_process(self, df: pd.DataFrame) -> pd.DataFrame:
+        if self._inplace:
+            df.rename(self._mapping, axis=1, inplace=True)
+            return df
         return df.rename(self._mapping, axis=1)
@@ -1,6 +1,7 @@
-from typing import List
+from typing import Any, Dict, List, Optional
 import pandas as pd
 from peperoncino import SeparatedProcessing
+from peperoncino.processing import RecordFn
 
 
 class Select(SeparatedProcessing):
@@ -9,6 +10,20 @@ class Select(SeparatedProcessing):
         self._cols = cols
         self._lackable_cols = lackable_cols
 
+    def _is_row_local(self) -> bool:
+        return True
+
+    def _record_fn(self) -> Optional[RecordFn]:
+        cols, lackable_cols = self._cols, set(self._lackable_cols)
+
+        def select(r: Dict[str, Any]) -> Dict[str, Any]:
+            for c in cols:
+                if c not in r and c not in lackable_cols:
+                    raise ValueError(f"Column {c} must not be lacked.")
+            return {c: r[c] for c in cols if c in r}
+
+        return select
+
     def sep_process(self, df: pd.DataFrame) -> pd.DataFrame:
         cols = self._cols
         df_cols = df.columns.tolist()
@@ -1,6 +1,40 @@
-from typing import List
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Set
+from typing import Tuple
+import numpy as np
 import pandas as pd
 from peperoncino import BaseProcessing
+from peperoncino import NotFittedError
+from peperoncino.kernels import GROUP_STATS, factorize_keys, group_stats
+from peperoncino.processing import RecordFn
+
+# aggregations which can be merged across chunks or updated incrementally
+STREAMABLE_OPS = ("count", "sum", "mean", "var", "std", "min", "max")
+
+
+def _merge_moments(a: pd.DataFrame, b: pd.DataFrame) -> pd.DataFrame:
+    """Merge grouped count, sum, m2, min and max of two chunks.
+    m2 is the sum of squared deviations from the mean.
+    """
+    index = a.index.union(b.index)
+    a = a.reindex(index)
+    b = b.reindex(index)
+
+    count_a, count_b = a["count"].fillna(0), b["count"].fillna(0)
+    count = count_a + count_b
+    delta = b["sum"] / count_b - a["sum"] / count_a
+    m2 = a["m2"].fillna(0) + b["m2"].fillna(0)
+    m2 += (delta * delta * count_a * count_b / count).fillna(0)
+
+    return pd.DataFrame(
+        {
+            "count": count,
+            "sum": a["sum"].fillna(0) + b["sum"].fillna(0),
+            "m2": m2,
+            "min": np.fmin(a["min"], b["min"]),
+            "max": np.fmax(a["max"], b["max"]),
+        },
+        index=index,
+    )
 
 
 class StatsEncoding(BaseProcessing):
@@ -14,30 +48,199 @@ class StatsEncoding(BaseProcessing):
         The name of the target column.
     ops : List[str]
         A list of aggregation operation function names (e.g. ['mean', 'std']).
+        Streaming and `partial_fit` support only count, sum, mean, var, std,
+        min and max.
     ref : int
         A reference dataframe index to calculate the mapping from categories
         to encodings.
         Default values is 0(first dataframe).
     """
 
+    _state_attrs = ("_mapping", "_moments")
+
     def __init__(
         self, cols: List[str], target: str, ops: List[str], ref: int = 0,
     ):
-        super().__init__(is_fixed_columns=False)
+        super().__init__(is_fixed_columns=False, is_stateful=True)
         self._cols = cols
         self._target = target
         self._ops = ops
         self._ref = ref
+        self._mapping: Optional[pd.DataFrame] = None
+        # grouped count, sum, m2, min and max to update the mapping incrementally
+        self._moments: Optional[pd.DataFrame] = None
+
+    def _column_usage(self) -> Optional[Tuple[Set[str], Set[str]]]:
+        return set(self._cols) | {self._target}, set(self._enc_names())
+
+    def _is_row_local(self) -> bool:
+        return True
 
     def _process(self, dfs: List[pd.DataFrame]) -> List[pd.DataFrame]:
+        # factorize keys once, where groups of the reference are coded first
         ref_df = dfs[self._ref]
+        (ref_codes, *codes), keys = factorize_keys([ref_df, *dfs], self._cols)
+        n_groups = ref_codes.max() + 1 if len(ref_codes) > 0 else 0
+        stats = self._fit_codes(ref_df, ref_codes, keys[:n_groups])
+
+        return [
+            self._attach(df, stats, np.where(c < n_groups, c, -1))
+            for df, c in zip(dfs, codes)
+        ]
+
+    def _fit(self, dfs: List[pd.DataFrame]) -> None:
+        ref_df = dfs[self._ref]
+        (ref_codes,), keys = factorize_keys([ref_df], self._cols)
+        self._fit_codes(ref_df, ref_codes, keys)
+
+    def _fit_codes(
+        self, ref_df: pd.DataFrame, codes: np.ndarray, keys: pd.Index
+    ) -> Dict[str, Any]:
+        # all statistics are computed from the same group codes
+        target = ref_df[self._target]
+        fast_ops = [op for op in self._ops if op in GROUP_STATS]
+        if target.dtype in (np.int64, np.float64) and len(fast_ops) > 0:
+            stats: Dict[str, Any] = group_stats(
+                codes, target.to_numpy(), len(keys), fast_ops
+            )
+        else:
+            stats = {}
+
+        valid = codes >= 0
+        grouped = target[valid].groupby(codes[valid], sort=True)
+        for op in self._ops:
+            if op not in stats:
+                stats[op] = grouped.agg(op).array
+
+        stats = {name: stats[op] for op, name in zip(self._ops, self._enc_names())}
+        mapping = keys.to_frame(index=False)
+        for name, values in stats.items():
+            mapping[name] = values
+        self._mapping = mapping
+        self._moments = self._code_moments(target, codes, keys)
+        return stats
+
+    def _code_moments(
+        self, target: pd.Series, codes: np.ndarray, keys: pd.Index
+    ) -> Optional[pd.DataFrame]:
+        # moments are kept to update the mapping by `partial_fit` later
+        if any(op not in STREAMABLE_OPS for op in self._ops):
+            return None
+
+        ops = ["count", "sum", "var", "min", "max"]
+        if target.dtype in (np.int64, np.float64):
+            moments = group_stats(codes, target.to_numpy(), len(keys), ops)
+        else:
+            valid = codes >= 0
+            grouped = target[valid].groupby(codes[valid], sort=True)
+            moments = {op: grouped.agg(op).to_numpy() for op in ops}
 
-        mapping = ref_df.groupby(self._cols)[self._target].agg(self._ops).reset_index()
-        mapping = self._rename_op2col(mapping)
+        count = moments["count"]
+        with np.errstate(invalid="ignore"):
+            m2 = np.where(count > 1, moments["var"] * (count - 1), 0.0)
+        return pd.DataFrame(
+            {
+                "count": count,
+                "sum": moments["sum"],
+                "m2": m2,
+                "min": moments["min"],
+                "max": moments["max"],
+            },
+            index=keys,
+        )
+
+    def _partial_fit(self, dfs: List[pd.DataFrame]) -> None:
+        self._check_streamable("incremental fitting")
+        if self._mapping is not None and self._moments is None:
+            raise ValueError(
+                f"{self._enc_names()} have no statistics to be updated."
+                " Fit them again."
+            )
+        self._fit_moments([dfs[self._ref]], self._moments, "incremental fitting")
+
+    def _fit_stream(self, chunks_fn: Callable[[], Iterable[pd.DataFrame]]) -> None:
+        self._fit_moments(chunks_fn(), None, "streaming")
+
+    def _fit_moments(
+        self,
+        chunks: Iterable[pd.DataFrame],
+        moments: Optional[pd.DataFrame],
+        mode: str,
+    ) -> None:
+        self._check_streamable(mode)
+        for df in chunks:
+            grouped = df.groupby(self._cols)[self._target]
+            _moments = grouped.agg(["count", "sum", "min", "max"])
+            _moments["m2"] = grouped.var(ddof=0) * _moments["count"]
+            if moments is None:
+                moments = _moments
+            else:
+                moments = _merge_moments(moments, _moments)
+
+        if moments is None:
+            raise ValueError("No reference dataframe is given.")
+
+        count = moments["count"].astype(int)
+        var = (moments["m2"] / (count - 1)).where(count > 1)
+        stats = {
+            "count": count,
+            "sum": moments["sum"],
+            "mean": moments["sum"] / count,
+            "var": var,
+            "std": np.sqrt(var),
+            "min": moments["min"],
+            "max": moments["max"],
+        }
+
+        mapping = pd.DataFrame({op: stats[op] for op in self._ops}).reset_index()
+        self._mapping = self._rename_op2col(mapping)
+        self._moments = moments
+
+    def _check_streamable(self, mode: str) -> None:
+        for op in self._ops:
+            if op not in STREAMABLE_OPS:
+                raise NotImplementedError(f"`{op}` is not supported in {mode}.")
+
+    def _transform(self, dfs: List[pd.DataFrame]) -> List[pd.DataFrame]:
+        if self._mapping is None:
+            raise NotFittedError(f"{self._enc_names()} are not fitted yet.")
 
-        dfs = [self._apply_mapping(df, mapping) for df in dfs]
+        # factorize mapping keys together, which are coded first
+        mapping = self._mapping
+        key_df = mapping[self._cols]
+        (key_codes, *codes), keys = factorize_keys([key_df, *dfs], self._cols)
 
-        return dfs
+        rows = np.full(len(keys) + 1, -1)
+        rows[key_codes] = np.arange(len(mapping))
+        stats = {name: mapping[name].array for name in self._enc_names()}
+        # code -1 takes the last row, which is -1
+        return [self._attach(df, stats, rows.take(c)) for df, c in zip(dfs, codes)]
+
+    def _transform_stream(
+        self, chunks: Iterable[pd.DataFrame]
+    ) -> Iterator[pd.DataFrame]:
+        for chunk in chunks:
+            yield self._transform([chunk])[0]
+
+    def _record_fn(self) -> Optional[RecordFn]:
+        if self._mapping is None:
+            raise NotFittedError(f"{self._enc_names()} are not fitted yet.")
+
+        # keys are looked up as scalars(or tuples of them) in a dict
+        mapping, cols, names = self._mapping, self._cols, self._enc_names()
+        if len(cols) == 1:
+            keys = mapping[cols[0]].tolist()
+        else:
+            keys = list(zip(*[mapping[c].tolist() for c in cols]))
+        lookup = dict(zip(keys, zip(*[mapping[n].tolist() for n in names])))
+        missing = (np.nan,) * len(names)
+
+        def encode(r: Dict[str, Any]) -> Dict[str, Any]:
+            key = r[cols[0]] if len(cols) == 1 else tuple(r[c] for c in cols)
+            r.update(zip(names, lookup.get(key, missing)))
+            return r
+
+        return encode
 
     def _enc_names(self) -> List[str]:
         col_names = "&".join(self._cols)
@@ -47,13 +250,13 @@ class StatsEncoding(BaseProcessing):
         op2col = {op: name for op, name in zip(self._ops, self._enc_names())}
         return mapping.rename(columns=op2col)
 
-    def _apply_mapping(self, df: pd.DataFrame, mapping: pd.DataFrame) -> pd.DataFrame:
-        index = df.index
-
-        # broadcast mapping to each row
-        df = df.merge(
-            mapping, on=self._cols, how="left", validate="many_to_one", sort=False,
-        )
-        df.index = index
-
+    def _attach(
+        self, df: pd.DataFrame, stats: Dict[str, Any], rows: np.ndarray
+    ) -> pd.DataFrame:
+        """Attach statistics to rows, where row -1 is missing."""
+        # existing columns are shared, not copied
+        if not self._inplace:
+            df = df.copy(deep=False)
+        for name, values in stats.items():
+            df[name] = pd.api.extensions.take(values, rows, allow_fill=True)
         return df
@@ -1,32 +1,11 @@
-from typing import List
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Set
+from typing import Tuple
+import numpy as np
 import pandas as pd
 from peperoncino import BaseProcessing
-
-
-def _broadcast_stats(stats: pd.DataFrame, df: pd.DataFrame) -> pd.DataFrame:
-    """Broadcast aggregated statistical values to dataframe rows.
-
-    Parameters
-    ----------
-    stats : pd.DataFrame
-        dataframe generated by df.groupby(columns).agg(agg_list)
-    df : pd.DataFrame
-        original dataframe
-
-    Returns
-    -------
-    pd.DataFrame
-        Broadcasted stats
-    """
-
-    cols = list(stats.index.names)
-    stats = (
-        stats.reset_index()
-        .merge(df[cols], on=cols, how="right", validate="one_to_many")
-        .drop(columns=cols)
-    )
-    stats.index = df.index
-    return stats
+from peperoncino import NotFittedError
+from peperoncino.processing import RecordFn
+from peperoncino.kernels import factorize_keys, group_count_sum, take_groups
 
 
 class TargetEncoding(BaseProcessing):
@@ -53,6 +32,8 @@ class TargetEncoding(BaseProcessing):
         Default is True.
     """
 
+    _state_attrs = ("_mapping", "_prior", "_stats", "_n_values", "_total")
+
     def __init__(
         self,
         cols: List[str],
@@ -61,53 +42,156 @@ class TargetEncoding(BaseProcessing):
         prior_weight: float = 1.0,
         impute_by_prior: bool = True,
     ):
-        super().__init__(is_fixed_columns=False)
+        super().__init__(is_fixed_columns=False, is_stateful=True)
         self._cols = cols
         self._target = target
         self._ref = ref
         self._prior_weight = prior_weight
         self._impute_by_prior = impute_by_prior
+        self._mapping: Optional[pd.DataFrame] = None
+        self._prior: Optional[float] = None
+        # sufficient statistics to update the mapping incrementally
+        self._stats: Optional[pd.DataFrame] = None
+        self._n_values = 0
+        self._total = 0.0
 
     @property
     def enc_name(self) -> str:
         col_names = "&".join(self._cols)
         return f"TARGET_ENC_{col_names}_BY_{self._target}"
 
-    def _process(self, dfs: List[pd.DataFrame]) -> List[pd.DataFrame]:
-        ref_df = dfs[self._ref]
+    def _column_usage(self) -> Optional[Tuple[Set[str], Set[str]]]:
+        return set(self._cols) | {self._target}, {self.enc_name}
 
-        # mapping
-        mapping = ref_df.groupby(self._cols)[self._target].agg(["count", "mean"])
+    def _is_row_local(self) -> bool:
+        return True
 
-        # smoothing
-        global_prior = ref_df[self._target].mean()
+    def _process(self, dfs: List[pd.DataFrame]) -> List[pd.DataFrame]:
+        # factorize keys once for both fitting and broadcasting
+        codes, keys = factorize_keys(dfs, self._cols)
+        y = self._target_values(dfs[self._ref])
+        count, sums = group_count_sum(codes[self._ref], y, len(keys))
+        table = self._set_mapping(
+            keys, count, sums, np.nansum(y), np.count_nonzero(~np.isnan(y))
+        )
+        return [self._assign(df, take_groups(table, c)) for df, c in zip(dfs, codes)]
 
-        if self._prior_weight > 0.0:
-            prior = mapping.assign(count=len(ref_df), mean=global_prior)
-            lamb = mapping["count"] / (mapping["count"] + self._prior_weight)
-            mapping["mean"] = lamb * mapping["mean"] + (1 - lamb) * prior["mean"]
+    def _fit(self, dfs: List[pd.DataFrame]) -> None:
+        self._fit_chunks([dfs[self._ref]])
 
-        mapping = mapping[["mean"]]
-        dfs = [self._apply_mapping(df, mapping) for df in dfs]
+    def _partial_fit(self, dfs: List[pd.DataFrame]) -> None:
+        if self._mapping is None:
+            self._fit(dfs)
+            return
+        if self._stats is None:
+            raise ValueError(
+                f"{self.enc_name} has no statistics to be updated incrementally."
+            )
+        self._fit_chunks([dfs[self._ref]], self._stats, self._n_values, self._total)
 
-        if self._impute_by_prior:
-            dfs = [df.fillna({self.enc_name: global_prior}) for df in dfs]
+    def _fit_stream(self, chunks_fn: Callable[[], Iterable[pd.DataFrame]]) -> None:
+        self._fit_chunks(chunks_fn())
+
+    def _fit_chunks(
+        self,
+        chunks: Iterable[pd.DataFrame],
+        stats: Optional[pd.DataFrame] = None,
+        n_values: int = 0,
+        total: float = 0.0,
+    ) -> None:
+        # aggregate sufficient statistics chunk by chunk
+        for df in chunks:
+            (codes,), keys = factorize_keys([df], self._cols)
+            y = self._target_values(df)
+            count, sums = group_count_sum(codes, y, len(keys))
+            _stats = pd.DataFrame({"count": count, "sum": sums}, index=keys)
+            stats = _stats if stats is None else stats.add(_stats, fill_value=0)
+            n_values += np.count_nonzero(~np.isnan(y))
+            total += np.nansum(y)
+
+        if stats is None:
+            raise ValueError("No reference dataframe is given.")
+
+        self._set_mapping(
+            stats.index,
+            stats["count"].to_numpy(),
+            stats["sum"].to_numpy(),
+            total,
+            n_values,
+        )
 
-        return dfs
+    def _target_values(self, df: pd.DataFrame) -> np.ndarray:
+        # nullable dtypes are cast with NaN for missing values
+        return np.asarray(df[self._target].astype(np.float64).to_numpy())
 
-    def _apply_mapping(self, df: pd.DataFrame, mapping: pd.DataFrame) -> pd.DataFrame:
-        mapping = _broadcast_stats(mapping, df)
+    def _set_mapping(
+        self,
+        keys: pd.Index,
+        count: np.ndarray,
+        sums: np.ndarray,
+        total: float,
+        n_values: int,
+    ) -> np.ndarray:
+        # mapping, where groups without target values are NaN
+        with np.errstate(divide="ignore", invalid="ignore"):
+            mean: np.ndarray = sums / count
 
-        # rename
-        mapping = mapping.rename(columns={"mean": self.enc_name})
+        # smoothing
+        global_prior = total / n_values if n_values > 0 else float("nan")
 
-        df = df.merge(
-            mapping,
-            how="inner",
-            left_index=True,
-            right_index=True,
-            sort=False,
-            validate="one_to_one",
+        if self._prior_weight > 0.0:
+            lamb = count / (count + self._prior_weight)
+            mean = lamb * mean + (1 - lamb) * global_prior
+
+        observed = count > 0
+        self._mapping = pd.DataFrame({"mean": mean[observed]}, index=keys[observed])
+        self._prior = global_prior
+        self._stats = pd.DataFrame(
+            {"count": count[observed], "sum": sums[observed]}, index=keys[observed]
         )
+        self._n_values = n_values
+        self._total = total
+        return mean
+
+    def _transform(self, dfs: List[pd.DataFrame]) -> List[pd.DataFrame]:
+        if self._mapping is None:
+            raise NotFittedError(f"{self.enc_name} is not fitted yet.")
+
+        # factorize mapping keys together, which are coded first
+        mapping = self._mapping
+        key_df = mapping.index.to_frame(index=False)
+        (key_codes, *codes), keys = factorize_keys([key_df, *dfs], self._cols)
+
+        table = np.full(len(keys), np.nan)
+        table[key_codes] = mapping["mean"].to_numpy()
+        return [self._assign(df, take_groups(table, c)) for df, c in zip(dfs, codes)]
+
+    def _transform_stream(
+        self, chunks: Iterable[pd.DataFrame]
+    ) -> Iterator[pd.DataFrame]:
+        for chunk in chunks:
+            yield self._transform([chunk])[0]
+
+    def _record_fn(self) -> Optional[RecordFn]:
+        if self._mapping is None:
+            raise NotFittedError(f"{self.enc_name} is not fitted yet.")
+
+        # keys are looked up as scalars(or tuples of them) in a dict
+        means = self._mapping["mean"].to_numpy()
+        default: Any = self._prior if self._impute_by_prior else np.nan
+        if self._impute_by_prior:
+            means = np.where(np.isnan(means), default, means)
+        lookup = dict(zip(self._mapping.index.tolist(), means.tolist()))
+        cols, name = self._cols, self.enc_name
 
-        return df
+        def encode(r: Dict[str, Any]) -> Dict[str, Any]:
+            key = r[cols[0]] if len(cols) == 1 else tuple(r[c] for c in cols)
+            r[name] = lookup.get(key, default)
+            return r
+
+        return encode
+
+    def _assign(self, df: pd.DataFrame, values: np.ndarray) -> pd.DataFrame:
+        if self._impute_by_prior:
+            values[np.isnan(values)] = self._prior
+        return self._set_columns(df, {self.enc_name: values})
@@ -0,0 +1,225 @@
+from __future__ import annotations
+from contextlib import nullcontext
+from functools import partial
+from typing import Any, Callable, ContextManager, Dict, Iterable, Iterator, List
+from typing import Optional, Set, Tuple
+import numpy as np
+import pandas as pd
+
+from peperoncino import BaseProcessing, ColumnsChangedError, RowsChangedError
+from peperoncino.parallel import map_ordered
+from peperoncino.profiling import active_profiler
+
+
+def _is_unchanged(before: pd.Series, after: pd.Series) -> bool:
+    # columns sharing the same array are unchanged without comparing values
+    if isinstance(before.dtype, np.dtype) and before.dtype == after.dtype:
+        x, y = before.to_numpy(), after.to_numpy()
+        if x.__array_interface__ == y.__array_interface__:
+            return True
+    return bool(before.equals(after))
+
+
+def _run_branch(
+    branch: BaseProcessing, fit: bool, dfs: List[pd.DataFrame]
+) -> Tuple[List[pd.DataFrame], Dict[str, Any]]:
+    # each branch gets shallow copies, so that columns added or replaced
+    # by in-place processings are not seen by other branches
+    _dfs = [df.copy(deep=False) for df in dfs]
+    outputs = branch.process(_dfs) if fit else branch.transform(_dfs)
+
+    added = []
+    for i, (df, out) in enumerate(zip(dfs, outputs)):
+        if not out.index.equals(df.index):
+            raise RowsChangedError(
+                f"Rows are changed in df[{i}] by a branch of Union."
+                f" Branches must keep rows of dataframes."
+            )
+        is_input = out.columns.isin(df.columns)
+        changed = [c for c in out.columns[is_input] if not _is_unchanged(df[c], out[c])]
+        if len(changed) > 0:
+            raise ColumnsChangedError(
+                f"Columns {changed} of df[{i}] are changed by a branch of Union."
+                f" Branches must not change columns of the input dataframes."
+            )
+        added.append(out[out.columns[~is_input]])
+    # fitted states are sent back from worker processes
+    return added, branch._get_state()
+
+
+def _fit_branch(branch: BaseProcessing, dfs: List[pd.DataFrame]) -> Dict[str, Any]:
+    branch.fit([df.copy(deep=False) for df in dfs])
+    return branch._get_state()
+
+
+class Union(BaseProcessing):
+    """Run branches on the same dataframes, and join columns added by them.
+
+    Columns of the input dataframes are kept as they are, and only columns
+    added by each branch are joined, in the order of branches.
+    Branches get shallow copies of the input dataframes, so the columns
+    are not copied per branch. They must keep rows of dataframes,
+    must not change columns of the input dataframes
+    (e.g. `Assign(a="a * 2")` raises `ColumnsChangedError`),
+    and must not add the same columns.
+    Use `parallel` to run branches concurrently.
+
+    ```
+    pp.Union(
+        pp.StatsEncoding(["a"], "y", ["mean", "std"]),
+        pp.StatsEncoding(["b"], "y", ["mean", "std"]),
+        pp.Pipeline(pp.Combinations(["x", "z"], ["*"]), pp.TargetEncoding(["c"], "y")),
+    ).parallel(n_jobs=3)
+    ```
+
+    Parameters
+    ----------
+    *branches : List[BaseProcessing]
+    """
+
+    def __init__(self, *branches: BaseProcessing):
+        super().__init__(is_fixed_columns=False)
+        self._branches = branches
+
+    @property
+    def branches(self) -> Tuple[BaseProcessing, ...]:
+        return self._branches
+
+    def _params(self) -> Dict[str, Any]:
+        return {"branches": self._branches}
+
+    def _get_state(self) -> Dict[str, Any]:
+        return {"branches": [b._get_state() for b in self._branches]}
+
+    def _set_state(self, state: Dict[str, Any]) -> None:
+        for b, s in zip(self._branches, state["branches"]):
+            b._set_state(s)
+
+    @property
+    def is_stateful(self) -> bool:
+        return any(b.is_stateful for b in self._branches)
+
+    def parallel(
+        self, n_jobs: Optional[int] = None, backend: Optional[str] = "thread"
+    ) -> BaseProcessing:
+        """Run branches concurrently on an executor.
+        Branches are configured with the same executor as well.
+
+        With the "process" backend, branches and dataframes are pickled,
+        and fitted states are sent back from worker processes.
+        While profiling, branches run sequentially to record their steps.
+
+        Parameters
+        ----------
+        n_jobs : Optional[int]
+            The number of workers. If None, the executor's default is used.
+        backend : Optional[str]
+            "thread", "process" or None(sequential). Default is "thread".
+
+        Returns
+        -------
+        BaseProcessing
+            self
+        """
+        super().parallel(n_jobs, backend)
+        for b in self._branches:
+            b.parallel(n_jobs, backend)
+        return self
+
+    def set_inplace(self, inplace: bool = True) -> BaseProcessing:
+        """Join added columns to the input dataframes in place.
+        Branches are configured in the same way, and they mutate
+        their own shallow copies of the input dataframes.
+
+        Parameters
+        ----------
+        inplace : bool
+
+        Returns
+        -------
+        BaseProcessing
+            self
+        """
+        super().set_inplace(inplace)
+        for b in self._branches:
+            b.set_inplace(inplace)
+        return self
+
+    def _is_row_local(self) -> bool:
+        return all(b._is_row_local() for b in self._branches)
+
+    def _column_usage(self) -> Optional[Tuple[Set[str], Set[str]]]:
+        reads: Set[str] = set()
+        writes: Set[str] = set()
+        for b in self._branches:
+            usage = b._column_usage()
+            if usage is None:
+                return None
+            reads |= usage[0]
+            writes |= usage[1]
+        return reads, writes
+
+    def _map_branches(self, fn: Callable[[BaseProcessing], Any]) -> List[Any]:
+        backend = self._backend
+        if active_profiler() is not None:
+            # the profiler records steps of a single thread
+            backend = None
+
+        # pandas options are global, then they must not be set and restored
+        # by in-place processings running concurrently
+        context: ContextManager[Any] = nullcontext()
+        if backend == "thread":
+            context = pd.option_context("mode.chained_assignment", None)
+        with context:
+            return map_ordered(fn, self._branches, backend, self._n_jobs)
+
+    def _run(self, dfs: List[pd.DataFrame], fit: bool) -> List[pd.DataFrame]:
+        results = self._map_branches(partial(_run_branch, fit=fit, dfs=dfs))
+
+        names: Set[str] = set()
+        addeds: List[List[pd.DataFrame]] = [[] for _ in dfs]
+        for b, (added, state) in zip(self._branches, results):
+            b._set_state(state)
+            for i, _added in enumerate(added):
+                duplicated = names.intersection(_added.columns)
+                if len(duplicated) > 0:
+                    raise ValueError(
+                        f"Columns {sorted(duplicated)} are added by multiple branches."
+                    )
+                addeds[i].append(_added)
+            names.update(c for _added in added for c in _added.columns)
+
+        outputs = []
+        for df, added in zip(dfs, addeds):
+            if self._inplace:
+                columns = {c: a[c] for a in added for c in a.columns}
+                outputs.append(self._set_columns(df, columns))
+            else:
+                outputs.append(pd.concat([df, *added], axis=1, copy=False))
+        return outputs
+
+    def _process(self, dfs: List[pd.DataFrame]) -> List[pd.DataFrame]:
+        return self._run(dfs, fit=True)
+
+    def _transform(self, dfs: List[pd.DataFrame]) -> List[pd.DataFrame]:
+        return self._run(dfs, fit=False)
+
+    def _fit(self, dfs: List[pd.DataFrame]) -> None:
+        states = self._map_branches(partial(_fit_branch, dfs=dfs))
+        for b, state in zip(self._branches, states):
+            b._set_state(state)
+
+    def _partial_fit(self, dfs: List[pd.DataFrame]) -> None:
+        for b in self._branches:
+            b.partial_fit([df.copy(deep=False) for df in dfs])
+
+    def _fit_stream(self, chunks_fn: Callable[[], Iterable[pd.DataFrame]]) -> None:
+        for b in self._branches:
+            if b.is_stateful:
+                b._fit_stream(chunks_fn)
+
+    def _transform_stream(
+        self, chunks: Iterable[pd.DataFrame]
+    ) -> Iterator[pd.DataFrame]:
+        for chunk in chunks:
+            yield self._run([chunk], fit=False)[0]
@@ -0,0 +1,35 @@
+from typing import List, Optional, Union
+import pandas as pd
+from peperoncino import BaseProcessing
+from peperoncino.files import infer_format, write_frame
+
+
+class Write(BaseProcessing):
+    """Write dataframes to Parquet or Feather files with their indices
+    (requires pyarrow). Dataframes are passed through as they are.
+
+    Parameters
+    ----------
+    paths : Union[str, List[str]]
+        A path for each dataframe.
+    format : Optional[str]
+        "parquet" or "feather". If None, it is inferred from extensions.
+    """
+
+    def __init__(self, paths: Union[str, List[str]], format: Optional[str] = None):
+        super().__init__()
+        self._paths = [paths] if isinstance(paths, str) else list(paths)
+        self._format = format
+
+        for path in self._paths:
+            infer_format(path, format)
+
+    def _process(self, dfs: List[pd.DataFrame]) -> List[pd.DataFrame]:
+        if len(dfs) != len(self._paths):
+            raise ValueError(
+                f"{len(self._paths)} paths are given for {len(dfs)} dataframes."
+            )
+
+        for df, path in zip(dfs, self._paths):
+            write_frame(df, path, infer_format(path, self._format))
+        return dfs
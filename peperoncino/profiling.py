@@ -0,0 +1,232 @@
+from __future__ import annotations
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, List, Optional
+import json
+import threading
+import time
+import tracemalloc
+
+import pandas as pd
+
+_COLUMNS = [
+    "step",
+    "wall_time",
+    "cpu_time",
+    "peak_memory",
+    "rows_in",
+    "rows_out",
+    "cols_in",
+    "cols_out",
+    "memory_in",
+    "memory_out",
+]
+
+
+@dataclass
+class StepProfile:
+    """Profile of a processing run.
+
+    Memory sizes are in bytes, and `peak_memory` is the peak of memory
+    traced by `tracemalloc` during the step over the memory at its start.
+    Before python 3.9, the peak of tracemalloc cannot be reset, so that
+    `peak_memory` of a step which does not exceed the peak of earlier steps
+    is the memory at its end over the memory at its start (a lower bound).
+    """
+
+    name: str
+    depth: int
+    wall_time: float = 0.0
+    cpu_time: float = 0.0
+    peak_memory: int = 0
+    rows_in: List[int] = field(default_factory=list)
+    rows_out: List[int] = field(default_factory=list)
+    cols_in: List[int] = field(default_factory=list)
+    cols_out: List[int] = field(default_factory=list)
+    memory_in: List[int] = field(default_factory=list)
+    memory_out: List[int] = field(default_factory=list)
+
+
+class ProfileReport:
+    """Profiles of processings recorded by `pp.profile`.
+    Nested processings (e.g. in a nested `Pipeline`) are recorded
+    in order of their start with deeper `depth`.
+    """
+
+    def __init__(self) -> None:
+        self.steps: List[StepProfile] = []
+
+    def to_frame(self) -> pd.DataFrame:
+        """Convert profiles to a dataframe, one row per step.
+        Per-dataframe values are summed.
+
+        Returns
+        -------
+        pd.DataFrame
+        """
+        records = []
+        for step in self.steps:
+            records.append(
+                {
+                    "step": "  " * step.depth + step.name,
+                    "wall_time": step.wall_time,
+                    "cpu_time": step.cpu_time,
+                    "peak_memory": step.peak_memory,
+                    "rows_in": sum(step.rows_in),
+                    "rows_out": sum(step.rows_out),
+                    "cols_in": max(step.cols_in, default=0),
+                    "cols_out": max(step.cols_out, default=0),
+                    "memory_in": sum(step.memory_in),
+                    "memory_out": sum(step.memory_out),
+                }
+            )
+        return pd.DataFrame(records, columns=_COLUMNS)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"steps": [asdict(step) for step in self.steps]}
+
+    def to_json(self, path: Optional[str] = None) -> str:
+        """Dump profiles as JSON.
+
+        Parameters
+        ----------
+        path : Optional[str]
+            If given, JSON is also written to the file.
+
+        Returns
+        -------
+        str
+        """
+        js = json.dumps(self.to_dict(), indent=2)
+        if path is not None:
+            with open(path, "w") as f:
+                f.write(js)
+        return js
+
+    def __str__(self) -> str:
+        return str(self.to_frame().to_string(index=False))
+
+
+class _Profiler:
+    def __init__(self, report: ProfileReport):
+        self.report = report
+        self.stack: List[List[Any]] = []
+
+    def start(self, name: str, dfs: List[pd.DataFrame]) -> StepProfile:
+        step = StepProfile(name=name, depth=len(self.stack))
+        step.rows_in = [len(df) for df in dfs]
+        step.cols_in = [len(df.columns) for df in dfs]
+        step.memory_in = [_memory_usage(df) for df in dfs]
+        self.report.steps.append(step)
+
+        current, peak = tracemalloc.get_traced_memory()
+        if len(self.stack) > 0:
+            self.stack[-1][1] = max(self.stack[-1][1], peak)
+        if _reset_peak():
+            peak = current
+        # [step, peak seen, memory at start, peak at start, wall clock, cpu clock]
+        self.stack.append(
+            [step, current, current, peak, time.perf_counter(), time.process_time()]
+        )
+        return step
+
+    def stop(self, dfs: List[pd.DataFrame]) -> None:
+        step, peak, start, start_peak, wall, cpu = self.stack.pop()
+        step.wall_time = time.perf_counter() - wall
+        step.cpu_time = time.process_time() - cpu
+
+        current, traced_peak = tracemalloc.get_traced_memory()
+        if traced_peak > start_peak:
+            peak = max(peak, traced_peak)
+        else:
+            # the peak was reached before the step and not reset
+            peak = max(peak, current)
+        step.peak_memory = peak - start
+        if len(self.stack) > 0:
+            self.stack[-1][1] = max(self.stack[-1][1], peak)
+
+        step.rows_out = [len(df) for df in dfs]
+        step.cols_out = [len(df.columns) for df in dfs]
+        step.memory_out = [_memory_usage(df) for df in dfs]
+
+    def abort(self) -> None:
+        self.stack.pop()
+
+
+def _memory_usage(df: pd.DataFrame) -> int:
+    return int(df.memory_usage(deep=True).sum())
+
+
+def _reset_peak() -> bool:
+    # tracemalloc.reset_peak is available since python 3.9
+    reset_peak = getattr(tracemalloc, "reset_peak", None)
+    if reset_peak is None:
+        return False
+    reset_peak()
+    return True
+
+
+# each thread(and asyncio task) has its own profiler,
+# since steps run concurrently in other threads are not nested in its steps
+_profiler: ContextVar[Optional[_Profiler]] = ContextVar("_profiler", default=None)
+
+# tracemalloc is global, then it is stopped by the last profiling
+# if the first one started it
+_tracing_lock = threading.Lock()
+_n_profiles = 0
+_started_tracing = False
+
+
+def active_profiler() -> Optional[_Profiler]:
+    return _profiler.get()
+
+
+def _start_tracing() -> None:
+    global _n_profiles, _started_tracing
+    with _tracing_lock:
+        if _n_profiles == 0:
+            _started_tracing = not tracemalloc.is_tracing()
+            if _started_tracing:
+                tracemalloc.start()
+        _n_profiles += 1
+
+
+def _stop_tracing() -> None:
+    global _n_profiles
+    with _tracing_lock:
+        _n_profiles -= 1
+        if _n_profiles == 0 and _started_tracing:
+            tracemalloc.stop()
+
+
+@contextmanager
+def profile() -> Iterator[ProfileReport]:
+    """Profile processings run in the context.
+
+    ```
+    with pp.profile() as report:
+        pipeline.process([train_df, test_df])
+
+    print(report)
+    report.to_json("profile.json")
+    ```
+
+    Processings run in the current thread are profiled,
+    and ones run in other threads (e.g. by `aprocess`) are not.
+
+    Yields
+    -------
+    ProfileReport
+    """
+    if _profiler.get() is not None:
+        raise RuntimeError("Profiling is already active.")
+
+    report = ProfileReport()
+    token = _profiler.set(_Profiler(report))
+    _start_tracing()
+    try:
+        yield report
+    finally:
+        _profiler.reset(token)
+        _stop_tracing()
@@ -0,0 +1,157 @@
+from __future__ import annotations
+from concurrent.futures import Executor
+from typing import Any, Dict, List, Optional, Tuple
+import asyncio
+import numpy as np
+import pandas as pd
+
+import peperoncino as pp
+
+
+def _is_batchable(proc: pp.BaseProcessing) -> bool:
+    # a fitted pipeline transforms each row independently
+    # if all of its processings do so
+    if isinstance(proc, pp.Pipeline) and proc._indices is None:
+        return all(_is_batchable(p) for p in proc.procs)
+    return proc._is_row_local()
+
+
+def _schema(df: pd.DataFrame) -> Tuple[Any, ...]:
+    return tuple(zip(df.columns, df.dtypes))
+
+
+class Coalescer:
+    """Batch dataframes of concurrent requests into one `transform` call,
+    and split the outputs back to the callers.
+
+    Small dataframes are costly to process one by one, since every processing
+    has a fixed overhead. Requests arriving within `max_delay` seconds
+    (or until `max_rows` rows) are concatenated, if they have the same
+    columns and dtypes, and transformed on the executor.
+    The processing must be fitted, and it must transform each row
+    independently (e.g. `Query`, `Assign` and encoders), so that outputs
+    do not depend on the other requests in the batch.
+    If a batch fails, its requests are transformed one by one,
+    so that errors are raised only to the callers of failing requests.
+
+    ```
+    coalescer = pp.Coalescer(pipeline, max_delay=0.002)
+
+    async def handle(request):
+        df = await coalescer.transform(pd.DataFrame(request.records))
+        ...
+    ```
+
+    Parameters
+    ----------
+    proc : pp.BaseProcessing
+    max_rows : int
+        Batches are processed as soon as they have this number of rows.
+    max_delay : float
+        Seconds to wait for other requests after the first one of a batch.
+    executor : Optional[Executor]
+        If None, the default executor of the event loop is used.
+    """
+
+    def __init__(
+        self,
+        proc: pp.BaseProcessing,
+        max_rows: int = 10000,
+        max_delay: float = 0.005,
+        executor: Optional[Executor] = None,
+    ):
+        if not _is_batchable(proc):
+            raise ValueError(
+                f"{proc!r} cannot be batched, since it does not transform rows"
+                " independently."
+            )
+        self._proc = proc
+        self._max_rows = max_rows
+        self._max_delay = max_delay
+        self._executor = executor
+
+        self._pending: List[Tuple[pd.DataFrame, asyncio.Future]] = []
+        self._n_rows = 0
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._tasks: List[asyncio.Task] = []
+
+    async def transform(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Transform a dataframe in a batch with concurrent requests.
+
+        Parameters
+        ----------
+        df : pd.DataFrame
+
+        Returns
+        -------
+        pd.DataFrame
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((df, future))
+        self._n_rows += len(df)
+
+        if self._n_rows >= self._max_rows:
+            self.flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self._max_delay, self.flush)
+        return await future
+
+    def flush(self) -> None:
+        """Start processing pending requests without waiting for others."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        pending, self._pending, self._n_rows = self._pending, [], 0
+
+        batches: Dict[Tuple[Any, ...], List[Tuple[pd.DataFrame, asyncio.Future]]]
+        batches = {}
+        for df, future in pending:
+            batches.setdefault(_schema(df), []).append((df, future))
+
+        loop = asyncio.get_running_loop()
+        for batch in batches.values():
+            task = loop.create_task(self._run(batch))
+            # keep references to running tasks until they are done
+            self._tasks.append(task)
+            task.add_done_callback(self._tasks.remove)
+
+    async def _run(self, batch: List[Tuple[pd.DataFrame, asyncio.Future]]) -> None:
+        dfs = [df for df, _ in batch]
+        loop = asyncio.get_running_loop()
+        try:
+            outputs = await loop.run_in_executor(
+                self._executor, self._transform_batch, dfs
+            )
+        except Exception as e:
+            if len(batch) > 1:
+                # a malformed request must not fail the others in the batch
+                await asyncio.gather(*(self._run([request]) for request in batch))
+                return
+            _, future = batch[0]
+            if not future.done():
+                future.set_exception(e)
+            return
+
+        for (_, future), output in zip(batch, outputs):
+            # callers may be cancelled while waiting
+            if not future.done():
+                future.set_result(output)
+
+    def _transform_batch(self, dfs: List[pd.DataFrame]) -> List[pd.DataFrame]:
+        if len(dfs) == 1:
+            return self._proc.transform(dfs)
+
+        # rows are labeled by their positions in the batch,
+        # which are mapped back to the requests and their labels
+        owners = np.repeat(np.arange(len(dfs)), [len(df) for df in dfs])
+        index = dfs[0].index.append([df.index for df in dfs[1:]])
+        batch = pd.concat(dfs, axis=0, ignore_index=True)
+
+        (out,) = self._proc.transform([batch])
+        positions = out.index.to_numpy()
+        out.index = index.take(positions)
+
+        # row-local processings keep the order of rows
+        bounds = np.searchsorted(owners[positions], np.arange(len(dfs) + 1))
+        return [out.iloc[bounds[i] : bounds[i + 1]] for i in range(len(dfs))]
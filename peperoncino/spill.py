@@ -0,0 +1,164 @@
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+import os
+import shutil
+import tempfile
+import pandas as pd
+
+from peperoncino.files import check_dtypes, read_frame, write_frame
+
+
+def _memory_usage(df: pd.DataFrame) -> int:
+    return int(df.memory_usage(deep=True).sum())
+
+
+class Spiller:
+    """Keep dataframes within a memory budget by spilling ones which are not
+    in use to uncompressed Feather files in a temporary directory (requires
+    pyarrow). Spilled dataframes are replaced by empty dataframes with the
+    same columns and dtypes, and they are read back by memory mapping
+    when they are used again. Dataframes whose dtypes are not kept by
+    Feather files (e.g. objects of integers and None) stay in memory.
+
+    Parameters
+    ----------
+    max_bytes : int
+        The budget of dataframes in memory, measured by `memory_usage(deep=True)`.
+    directory : Optional[str]
+        The parent of the temporary directory. If None, the system default.
+    log : Optional[Callable[[str, str], None]]
+        A function logging a message with its level.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int,
+        directory: Optional[str] = None,
+        log: Optional[Callable[[str, str], None]] = None,
+    ):
+        self._max_bytes = max_bytes
+        self._directory = tempfile.mkdtemp(prefix="peperoncino-spill-", dir=directory)
+        self._log = log
+        # index of a dataframe -> (the empty dataframe in place of it, path, size)
+        self._spilled: Dict[int, Tuple[pd.DataFrame, str, int]] = {}
+        # sizes of dataframes in the last step by id, with the dataframes
+        self._sizes: Dict[int, Tuple[pd.DataFrame, int]] = {}
+        self._n_files = 0
+
+    def __enter__(self) -> "Spiller":
+        return self
+
+    def __exit__(self, *args: object) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Remove the spilled files."""
+        shutil.rmtree(self._directory, ignore_errors=True)
+        self._spilled.clear()
+        self._sizes.clear()
+
+    @property
+    def spilled(self) -> List[int]:
+        """Indices of spilled dataframes."""
+        return sorted(self._spilled)
+
+    def prepare(
+        self, dfs: List[pd.DataFrame], needed: Iterable[int]
+    ) -> List[pd.DataFrame]:
+        """Read back dataframes needed by the next step, after spilling
+        the other dataframes while the needed ones would exceed the budget.
+
+        Parameters
+        ----------
+        dfs : List[pd.DataFrame]
+        needed : Iterable[int]
+            Indices of dataframes used by the next step.
+
+        Returns
+        -------
+        List[pd.DataFrame]
+        """
+        dfs = list(dfs)
+        needed = {i for i in needed if i < len(dfs)}
+
+        sizes = [self._size(df) for df in dfs]
+        # dataframes of previous steps must not be kept alive
+        self._sizes = {id(df): (df, s) for df, s in zip(dfs, sizes)}
+        resident = sum(s for i, s in enumerate(sizes) if i not in self._spilled)
+        to_load = sum(self._spilled[i][2] for i in needed if i in self._spilled)
+
+        # larger dataframes are spilled first
+        candidates = sorted(
+            (i for i in range(len(dfs)) if i not in needed and i not in self._spilled),
+            key=lambda i: -sizes[i],
+        )
+        for i in candidates:
+            if resident + to_load <= self._max_bytes:
+                break
+            if self._spill(dfs, i):
+                resident -= sizes[i]
+
+        for i in sorted(needed):
+            if i in self._spilled:
+                dfs[i] = self._load(i)
+        return dfs
+
+    def restore(self, dfs: List[pd.DataFrame]) -> List[pd.DataFrame]:
+        """Read back all spilled dataframes.
+
+        Parameters
+        ----------
+        dfs : List[pd.DataFrame]
+
+        Returns
+        -------
+        List[pd.DataFrame]
+        """
+        return self.prepare(dfs, range(len(dfs)))
+
+    def _size(self, df: pd.DataFrame) -> int:
+        cached = self._sizes.get(id(df))
+        if cached is not None and cached[0] is df:
+            return cached[1]
+        size = _memory_usage(df)
+        self._sizes[id(df)] = (df, size)
+        return size
+
+    def _spill(self, dfs: List[pd.DataFrame], i: int) -> bool:
+        df = dfs[i]
+        path = os.path.join(self._directory, f"{self._n_files}.feather")
+        self._n_files += 1
+        try:
+            write_frame(df, path, "feather", compression="uncompressed")
+            # results must not depend on whether dataframes are spilled
+            check_dtypes(df, path, "feather")
+        except (ValueError, TypeError, NotImplementedError) as e:
+            # e.g. mixed types of objects, unsupported dtypes (complex numbers)
+            # and objects of integers and None, which are read as floats
+            if os.path.exists(path):
+                os.remove(path)
+            self._logging(f"df[{i}] cannot be spilled: {e}", "debug")
+            return False
+
+        size = self._size(df)
+        # a copy, since a slice of the dataframe keeps its values alive
+        empty = df.iloc[:0].copy()
+        self._spilled[i] = (empty, path, size)
+        self._sizes.pop(id(df))
+        dfs[i] = empty
+        self._logging(f"Spilled df[{i}]: {size} bytes", "debug")
+        return True
+
+    def _load(self, i: int) -> pd.DataFrame:
+        empty, path, _ = self._spilled.pop(i)
+        df = read_frame(path, "feather", memory_map=True)
+        os.remove(path)
+
+        # labels which are not kept by files (e.g. non-string column names)
+        df.columns = empty.columns
+        df.index.names = empty.index.names
+        self._logging(f"Loaded df[{i}]", "debug")
+        return df
+
+    def _logging(self, msg: str, level: str) -> None:
+        if self._log is not None:
+            self._log(msg, level)
@@ -1,2 +1,13 @@
-from peperoncino.utils.from_list import from_list  # NOQA
-from peperoncino.utils.from_yaml import from_yaml  # NOQA
+from typing import TYPE_CHECKING, Any
+import importlib
+
+if TYPE_CHECKING:
+    from peperoncino.utils.from_list import from_list  # NOQA
+    from peperoncino.utils.from_yaml import from_yaml  # NOQA
+
+
+def __getattr__(name: str) -> Any:
+    # `from_yaml` requires PyYAML, then it is imported on the first access
+    if name not in ("from_list", "from_yaml"):
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return getattr(importlib.import_module(f"peperoncino.utils.{name}"), name)
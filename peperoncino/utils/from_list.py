@@ -68,5 +68,9 @@ def _resolve_proc(proc_dict: Dict[str, Any]) -> pp.BaseProcessing:
 
 
 def _get_proc_by_name(name: str) -> type:
-    proc: type = getattr(pp, name)
+    # only the module of the processing is imported
+    try:
+        proc: type = getattr(pp, name)
+    except AttributeError:
+        raise ValueError(f"Unknown processing: {name}")
     return proc
@@ -22,3 +22,17 @@ class TestAsCategory:
             assert set(df.a.cat.categories) == {"foo", "bar", "baz", "NaN"}
         else:
             assert set(df.a.cat.categories) == {"foo", "bar", "baz"}
+
+    def test_process_shared_categories(self):
+        df1 = pd.DataFrame({"a": ["foo", "bar"], "b": [1, 2]})
+        df2 = pd.DataFrame({"a": ["baz", None, "foo"]})
+
+        proc = pp.AsCategory(["a", "b"])
+        df1, df2 = proc.process([df1, df2])
+
+        dtype = pd.CategoricalDtype(["bar", "baz", "foo"])
+        assert df1.a.dtype == dtype
+        assert df2.a.dtype == dtype
+        assert df1.b.dtype == pd.CategoricalDtype([1, 2])
+        assert df2.columns.tolist() == ["a"]
+        assert df2.a.isna().tolist() == [False, True, False]
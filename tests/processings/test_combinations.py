@@ -123,3 +123,41 @@ class TestCombinations:
                     }
                 ),
             )
+
+    @pytest.mark.parametrize(
+        "dtypes,ops",
+        [
+            (["float64", "float64", "float64"], ["*", "/", "+", "-"]),
+            (["int64", "int64", "int64"], ["*", "-"]),
+            (["int32", "int32", "int32"], ["/", "+"]),
+            (["int64", "float64", "int64"], ["*", "/"]),
+            (["float64", "float64", "float64"], ["*", "%"]),
+        ],
+    )
+    def test_process_block(self, dtypes, ops):
+        df = pd.DataFrame(
+            {
+                "a": [1, 0, -3, 4],
+                "b": [0, 5, 6, 2],
+                "c": [7, 0, 9, 1],
+                "d": ["w", "x", "y", "z"],
+            },
+            index=[3, 1, 2, 0],
+        ).astype({"a": dtypes[0], "b": dtypes[1], "c": dtypes[2]})
+        proc = pp.Combinations(["a", "b", "c"], ops, comb_type="product")
+        (_df,) = proc.process([df])
+
+        formulae = {}
+        for a in ["a", "b", "c"]:
+            for b in ["a", "b", "c"]:
+                for op in ops:
+                    formulae[f"{op}_{a}_{b}"] = df.eval(f"{a} {op} {b}")
+        assert_frame_equal(_df, df.assign(**formulae))
+
+    def test_process_overwrite(self):
+        df = pd.DataFrame({"a": [1.0, 2.0], "*_a_a": [0.0, 0.0], "b": [3.0, 4.0]})
+        proc = pp.Combinations(["a"], ["*"])
+        (df,) = proc.process([df])
+        assert_frame_equal(
+            df, pd.DataFrame({"a": [1.0, 2.0], "*_a_a": [1.0, 4.0], "b": [3.0, 4.0]})
+        )
@@ -0,0 +1,77 @@
+import pytest
+import numpy as np
+import pandas as pd
+from pandas.testing import assert_frame_equal
+import peperoncino as pp
+
+
+class TestDowncast:
+    def test_process(self):
+        df1 = pd.DataFrame(
+            {
+                "i": [1, 2, 300],
+                "f": [0.5, 1.5, np.nan],
+                "g": [0.1, 0.2, 0.3],
+                "s": ["a", "b", "a"],
+                "u": ["x", "y", "z"],
+            }
+        )
+        df2 = pd.DataFrame({"i": [-1, 2], "f": [2.0, 3.0], "s": ["b", None]})
+
+        proc = pp.Downcast()
+        df1, df2 = proc.process([df1, df2])
+
+        category = pd.CategoricalDtype(["a", "b"])
+        assert df1.dtypes.to_dict() == {
+            "i": np.int16,
+            "f": np.float32,
+            "g": np.float64,
+            "s": category,
+            "u": object,
+        }
+        assert df2.dtypes.to_dict() == {"i": np.int16, "f": np.float32, "s": category}
+        assert_frame_equal(
+            df2,
+            pd.DataFrame(
+                {
+                    "i": np.array([-1, 2], dtype=np.int16),
+                    "f": np.array([2.0, 3.0], dtype=np.float32),
+                    "s": pd.Categorical(["b", None], categories=["a", "b"]),
+                }
+            ),
+        )
+
+        report = proc.report
+        assert report.index.tolist() == ["i", "f", "s"]
+        assert report.loc["i", "to"] == "int16"
+        assert report.loc["i", "bytes_saved"] == (8 - 2) * 5
+        assert report.loc["f", "bytes_saved"] == (8 - 4) * 5
+
+    def test_lossy_float(self):
+        df = pd.DataFrame({"g": [0.1, 0.2]})
+
+        (df,) = pp.Downcast(lossy_float=True).process([df])
+
+        assert df["g"].dtype == np.float32
+
+    def test_merged_processing(self):
+        df1 = pd.DataFrame({"i": [1, 2], "s": ["a", "b"]})
+        df2 = pd.DataFrame({"i": [1000, 2], "s": ["b", "b"]})
+
+        proc = pp.Pipeline(pp.Downcast(), pp.AsCategory(["i"]))
+        df1, df2 = proc.process([df1, df2])
+
+        assert df1["s"].dtype == df2["s"].dtype
+
+    def test_fit_transform(self):
+        proc = pp.Downcast(["i"])
+
+        with pytest.raises(pp.NotFittedError):
+            proc.transform([pd.DataFrame({"i": [1]})])
+
+        proc.fit([pd.DataFrame({"i": [1, 2, 3]})])
+        (df,) = proc.transform([pd.DataFrame({"i": [4, 5]})])
+        assert df["i"].dtype == np.int8
+
+        with pytest.raises(ValueError):
+            proc.transform([pd.DataFrame({"i": [1000]})])
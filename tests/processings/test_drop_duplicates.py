@@ -1,4 +1,5 @@
 import pytest
+import numpy as np
 import pandas as pd
 from pandas.testing import assert_frame_equal
 import peperoncino as pp
@@ -22,3 +23,42 @@ class TestDropDuplicates:
             assert_frame_equal(
                 df, pd.DataFrame({"a": [1, 2], "b": [4, 5], "c": [5, 6]})
             )
+
+    def test_process_non_unique_index(self):
+        df = pd.DataFrame({"a": [1, 1, 2, 1]}, index=[0, 0, 1, 1])
+        (df,) = pp.DropDuplicates().process([df])
+
+        assert_frame_equal(df, pd.DataFrame({"a": [1, 2]}, index=[0, 1]))
+
+    def test_process_ref(self):
+        train_df = pd.DataFrame({"a": [1, 2, 2], "b": [4, 5, 5]})
+        test_df = pd.DataFrame({"a": [2, 3, 3, 1], "b": [5, 6, 6, 5]})
+
+        proc = pp.DropDuplicates(ref=0)
+        train_df, test_df = proc.process([train_df, test_df])
+
+        assert_frame_equal(train_df, pd.DataFrame({"a": [1, 2], "b": [4, 5]}))
+        assert_frame_equal(
+            test_df, pd.DataFrame({"a": [3, 1], "b": [6, 5]}, index=[1, 3])
+        )
+
+    def test_process_negative_zero(self):
+        df = pd.DataFrame({"a": [0.0, -0.0, 1.0], "b": [1, 1, 1]})
+        (df,) = pp.DropDuplicates().process([df])
+
+        assert_frame_equal(
+            df, pd.DataFrame({"a": [0.0, 1.0], "b": [1, 1]}, index=[0, 2])
+        )
+
+    def test_process_ref_dtypes(self):
+        train_df = pd.DataFrame({"a": [1, 2, 3]})
+        test_df = pd.DataFrame({"a": [1.0, 4.0, np.nan]})
+
+        proc = pp.DropDuplicates(ref=0)
+        train_df, test_df = proc.process([train_df, test_df])
+
+        assert_frame_equal(train_df, pd.DataFrame({"a": [1, 2, 3]}))
+        assert_frame_equal(test_df, pd.DataFrame({"a": [4.0, np.nan]}, index=[1, 2]))
+
+        with pytest.raises(ValueError, match="differ between dataframes"):
+            proc.process([pd.DataFrame({"a": [1]}), pd.DataFrame({"a": ["1"]})])
@@ -1,3 +1,7 @@
+import os
+import sys
+import pytest
+import numpy as np
 import pandas as pd
 from pandas.testing import assert_frame_equal
 import peperoncino as pp
@@ -19,6 +23,10 @@ class DoubleProcessing(pp.SeparatedProcessing):
         return pd.concat((df, df), ignore_index=True)
 
 
+def _square(x):
+    return x * x
+
+
 class TestPipeline:
     def test_process(self):
         df = pd.DataFrame({"a": [1, 2, 3], "b": [4, 5, 6]})
@@ -30,3 +38,292 @@ class TestPipeline:
         assert_frame_equal(
             df, pd.DataFrame({"A": [1, 2, 3, 1, 2, 3], "b": [4, 5, 6, 4, 5, 6]})
         )
+
+    def test_parallel(self):
+        df = pd.DataFrame({"a": [1, 2, 3], "b": [4, 5, 6]})
+
+        rename = RenameProcessing()
+        proc = pp.Pipeline(pp.Pipeline(rename), DoubleProcessing()).parallel(2)
+
+        assert rename._backend == "thread"
+        assert rename._n_jobs == 2
+
+        dfs = proc.process([df, df, df])
+
+        for _df in dfs:
+            assert_frame_equal(
+                _df, pd.DataFrame({"A": [1, 2, 3, 1, 2, 3], "b": [4, 5, 6, 4, 5, 6]})
+            )
+
+    @pytest.mark.skipif(sys.version_info < (3, 8), reason="requires shared memory")
+    def test_parallel_partition(self):
+        train_df = pd.DataFrame(
+            {
+                "a": [1, 2, 3, 1, 2, 3, 1, 2, 3, 4],
+                "s": list("xyzxyzxyzw"),
+                "y": [1.0, 2.0, 3.0, 4.0, 5.0, 6.0, 7.0, 8.0, 9.0, 10.0],
+            },
+            index=pd.Index(range(100, 110), name="id"),
+        )
+        test_df = pd.DataFrame({"a": [3, 2, 5], "s": ["z", "y", "v"]})
+
+        def build():
+            return pp.Pipeline(
+                pp.Query("a < 4"),
+                pp.ApplyColumn("a", _square),
+                pp.AsCategory(["s"]),
+                pp.TargetEncoding(["s"], "y"),
+                pp.DropDuplicates(["a"]),
+                pp.Pipeline(pp.Assign(b="a + 1")),
+            )
+
+        expected = build().process([train_df, test_df])
+        proc = build().parallel(3, "partition")
+        dfs = proc.process([train_df, test_df])
+        for df, xdf in zip(dfs, expected):
+            assert_frame_equal(df, xdf)
+
+        expected = build().fit([train_df]).transform([test_df])
+        assert_frame_equal(proc.transform([test_df])[0], expected[0])
+
+        with pytest.raises(KeyError):
+            proc = pp.Pipeline(pp.ApplyColumn("c", _square))
+            proc.parallel(2, "partition").process([test_df])
+
+    def test_parallel_partition_unavailable(self, monkeypatch):
+        # as python 3.7, which has no multiprocessing.shared_memory
+        monkeypatch.setitem(sys.modules, "multiprocessing.shared_memory", None)
+        monkeypatch.delitem(sys.modules, "peperoncino.partition", raising=False)
+
+        with pytest.raises(ValueError, match="shared_memory"):
+            pp.Pipeline(pp.Query("a > 1")).parallel(2, "partition")
+
+    def test_fit_transform_save_load(self, tmp_path):
+        train_df = pd.DataFrame({"a": [1, 1, 2, 2], "y": [1, 2, 3, 4]})
+        test_df = pd.DataFrame({"a": [2, 1, 3]})
+
+        proc = pp.Pipeline(
+            pp.Assign(b="a * 2"),
+            pp.Pipeline(pp.TargetEncoding(["b"], "y", prior_weight=0.0)),
+        )
+        _, xtest_df = proc.process([train_df, test_df])
+
+        path = str(tmp_path / "pipeline.pkl")
+        proc.fit([train_df]).save(path)
+
+        (df,) = pp.Pipeline.load(path).transform([test_df])
+        assert_frame_equal(df, xtest_df)
+
+        with pytest.raises(pp.NotFittedError):
+            pp.Pipeline(pp.TargetEncoding(["a"], "y")).transform([test_df])
+
+    def test_process_stream(self):
+        rng = np.random.RandomState(0)
+        df = pd.DataFrame(
+            {
+                "a": rng.randint(0, 5, 100),
+                "b": rng.randint(0, 3, 100),
+                "c": rng.choice(["x", "y", None], 100),
+                "y": rng.rand(100),
+            }
+        )
+        df = pd.concat([df, df.head(10)], ignore_index=True)
+
+        def make_proc():
+            return pp.Pipeline(
+                pp.Query("a > 0"),
+                pp.Assign(d="a * b"),
+                pp.DropDuplicates(),
+                pp.TargetEncoding(["a", "b"], "y"),
+                pp.Pipeline(pp.StatsEncoding(["d"], "y", ["mean", "std", "max"])),
+                pp.AsCategory(["c"], fillna="NaN"),
+            )
+
+        (xdf,) = make_proc().process([df])
+
+        def chunks():
+            return (df.iloc[i : i + 7] for i in range(0, len(df), 7))
+
+        proc = make_proc()
+        dfs = list(proc.process_stream(chunks(), ref_chunks=chunks))
+        assert max(len(_df) for _df in dfs) <= 7
+
+        assert_frame_equal(pd.concat(dfs), xdf)
+
+    def test_process_stream_not_supported(self):
+        proc = pp.Pipeline(pp.StatsEncoding(["a"], "y", ["median"]))
+        df = pd.DataFrame({"a": [1, 2], "y": [3, 4]})
+
+        with pytest.raises(NotImplementedError):
+            proc.process_stream([df], ref_chunks=lambda: [df])
+
+    def test_process_append(self):
+        rng = np.random.RandomState(0)
+        df = pd.DataFrame(
+            {"a": rng.randint(0, 5, 60), "b": rng.rand(60), "y": rng.rand(60)}
+        )
+
+        def make_proc():
+            return pp.Pipeline(
+                pp.Query("b > 0.2"),
+                pp.Assign(c="a * b"),
+                pp.TargetEncoding(["a"], "y"),
+                pp.StatsEncoding(["a"], "y", ["mean", "std"]),
+            )
+
+        (xdf,) = make_proc().process([df])
+
+        proc = make_proc()
+        (df1,) = proc.process_append([df.iloc[:30]])
+        (df2,) = proc.process_append([df.iloc[30:]])
+
+        # the first rows are processed by states before the second ones
+        assert_frame_equal(df1, make_proc().process([df.iloc[:30]])[0])
+        assert_frame_equal(df2, xdf.loc[df2.index])
+        assert_frame_equal(proc.transform([df])[0], xdf)
+
+    def test_process_append_not_row_local(self):
+        proc = pp.Pipeline(pp.Assign(c="a * 2"), pp.DropDuplicates())
+        df = pd.DataFrame({"a": [1, 1, 2]})
+
+        with pytest.raises(ValueError):
+            proc.process_append([df])
+
+    def test_process_records(self):
+        rng = np.random.RandomState(0)
+        df = pd.DataFrame(
+            {
+                "a": rng.randint(0, 5, 100),
+                "b": rng.randint(0, 3, 100),
+                "c": rng.choice(["x", "y", None], 100),
+                "x": rng.rand(100),
+                "y": rng.rand(100),
+            }
+        )
+        proc = pp.Pipeline(
+            pp.Query("x > 0.2 & c == ['x', 'y']"),
+            pp.Assign(d="a * b", e=1),
+            pp.Combinations(["a", "x"], ["*", "/"], comb_type="combinations"),
+            pp.AsType({"a": "float32"}),
+            pp.Pipeline(pp.TargetEncoding(["b", "c"], "y")),
+            pp.StatsEncoding(["b"], "y", ["mean", "max"]),
+            pp.RenameColumns({"d": "f"}),
+            pp.DropColumns(["e"]),
+            pp.Select(["f", "/_a_x", "TARGET_ENC_b&c_BY_y", "STATS_ENC_b_BY_max_y"]),
+        ).fit([df])
+
+        test_df = df.drop(columns="y").head(20)
+        records = test_df.to_dict("records")
+        (xdf,) = proc.transform([test_df])
+        xdf = xdf.reset_index(drop=True)
+
+        assert_frame_equal(pd.DataFrame(proc.process_records(records)), xdf)
+        np.testing.assert_allclose(
+            proc.process_records(records, as_array=True), xdf.to_numpy()
+        )
+
+        # compiled functions are updated with fitted states
+        proc.fit([df.assign(y=df["y"] * 2)])
+        (xdf,) = proc.transform([test_df])
+        df = pd.DataFrame(proc.process_records(records))
+        assert_frame_equal(df, xdf.reset_index(drop=True))
+
+        # processings without implementations for records
+        proc = pp.Pipeline(pp.Assign(d="a * b"), pp.DropDuplicates(["a"]))
+        assert proc.process_records(records) == (
+            test_df.assign(d=test_df["a"] * test_df["b"])
+            .drop_duplicates(["a"])
+            .to_dict("records")
+        )
+
+        # python and pandas differ in modulo of negative values
+        proc = pp.Pipeline(pp.Assign(d="(a - 2) % 3"))
+        (xdf,) = proc.transform([test_df])
+        df = pd.DataFrame(proc.process_records(records))
+        assert_frame_equal(df, xdf.reset_index(drop=True))
+
+        with pytest.raises(pp.NotFittedError):
+            pp.Pipeline(pp.TargetEncoding(["a"], "y")).process_records(records)
+
+    def test_memory_budget(self, tmp_path):
+        rng = np.random.RandomState(0)
+
+        def make_df(n):
+            return pd.DataFrame(
+                {"a": rng.randint(0, 5, n), "x": rng.rand(n), "y": rng.rand(n)}
+            )
+
+        def make_proc():
+            return pp.Pipeline(
+                pp.Query("x > 0.2").only(0),
+                pp.Assign(z="x * 2").only(0),
+                pp.TargetEncoding(["a"], "y"),
+            )
+
+        train_df, test_df = make_df(100), make_df(50)
+        # objects of integers and None are kept in memory, not spilled
+        test_df["o"] = pd.Series([1, None] * 25, dtype=object)
+        xdfs = make_proc().process([train_df, test_df])
+
+        proc = make_proc().set_memory_budget(1, str(tmp_path))
+        for df, xdf in zip(proc.process([train_df, test_df]), xdfs):
+            assert_frame_equal(df, xdf)
+        for df, xdf in zip(proc.transform([train_df, test_df]), xdfs):
+            assert_frame_equal(df, xdf)
+        assert os.listdir(tmp_path) == []
+
+    def test_exclusive_modes(self, tmp_path):
+        pytest.importorskip("pyarrow")
+        cache_dir = str(tmp_path / "cache")
+        with pytest.raises(ValueError, match="cannot be used together"):
+            pp.Pipeline().use_cache(cache_dir).set_memory_budget(1)
+        with pytest.raises(ValueError, match="cannot be used together"):
+            pp.Pipeline().set_memory_budget(1).use_cache(cache_dir)
+        with pytest.raises(ValueError, match="cannot be used together"):
+            pp.Pipeline().use_cache(cache_dir).parallel(2, "partition")
+        if sys.version_info >= (3, 8):
+            with pytest.raises(ValueError, match="cannot be used together"):
+                pp.Pipeline().parallel(2, "partition").set_memory_budget(1)
+
+        # modes can be switched after disabling others
+        proc = pp.Pipeline().use_cache(cache_dir).use_cache(None)
+        proc.set_memory_budget(1).set_memory_budget(None).use_cache(cache_dir)
+
+    @pytest.mark.parametrize("copy_inputs", [False, True])
+    def test_inplace(self, copy_inputs):
+        def make_df():
+            return pd.DataFrame(
+                {"a": [1, 2, 3, 4], "b": [4.0, 5.0, 6.0, 7.0], "c": list("xyzw")}
+            )
+
+        def make_pipeline():
+            return pp.Pipeline(
+                pp.Query("a > 1"),
+                pp.Assign(d="a * b"),
+                pp.ApplyColumn("c", str.upper),
+                pp.AsType({"a": "float32"}),
+                pp.Combinations(["a", "b"], ["+", "*"]),
+                pp.Pipeline(pp.RenameColumns(d="e"), pp.DropColumns(["b"])),
+            )
+
+        (expected,) = make_pipeline().process([make_df()])
+
+        df = make_df()
+        proc = make_pipeline().set_inplace(copy_inputs=copy_inputs)
+        with pd.option_context("mode.chained_assignment", "raise"):
+            (result,) = proc.process([df])
+
+        assert_frame_equal(result, expected)
+        assert proc.procs[-1].procs[0]._inplace
+        if copy_inputs:
+            assert_frame_equal(df, make_df())
+
+    def test_inplace_mutates_inputs(self):
+        df = pd.DataFrame({"a": [1, 2], "b": [3, 4]})
+
+        proc = pp.Pipeline(pp.Assign(c="a + b"), pp.DropColumns(["a"]))
+        proc.set_inplace()
+        (result,) = proc.process([df])
+
+        assert result is df
+        assert df.columns.tolist() == ["b", "c"]
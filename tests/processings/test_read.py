@@ -0,0 +1,75 @@
+import pytest
+import pandas as pd
+from pandas.testing import assert_frame_equal
+import peperoncino as pp
+
+
+@pytest.fixture
+def df():
+    return pd.DataFrame(
+        {"a": [1, 2, 3], "b": [0.1, 0.2, 0.3], "c": ["x", "y", "z"], "d": [4, 5, 6]},
+        index=pd.Index([10, 20, 30], name="id"),
+    )
+
+
+class TestRead:
+    @pytest.mark.parametrize("ext", ["parquet", "feather"])
+    @pytest.mark.parametrize("memory_map", [False, True])
+    def test_process(self, tmp_path, df, ext, memory_map):
+        path = str(tmp_path / f"df.{ext}")
+        pp.Write(path).process([df])
+
+        other_df = pd.DataFrame({"e": [1]})
+        dfs = pp.Read(path, memory_map=memory_map).process([other_df])
+
+        assert len(dfs) == 2
+        assert dfs[0] is other_df
+        assert_frame_equal(dfs[1], df)
+
+        (_df,) = pp.Read(path, columns=["c", "a"]).process([])
+        assert_frame_equal(_df, df[["a", "c"]])
+
+    @pytest.mark.parametrize("ext", ["parquet", "feather"])
+    def test_projection_pushdown(self, tmp_path, df, ext):
+        paths = [str(tmp_path / f"train.{ext}"), str(tmp_path / f"test.{ext}")]
+        pp.Write(paths).process([df, df.iloc[:2]])
+
+        read = pp.Read(paths)
+        pipeline = pp.Pipeline(
+            read,
+            pp.Query("a > 1"),
+            pp.Pipeline(pp.Assign(e="b * 2"), pp.Select(["e", "f"], ["f"])),
+        )
+        train_df, test_df = pipeline.process([])
+
+        assert read._projection == ["a", "b", "f"]
+        assert_frame_equal(
+            train_df, df.query("a > 1").assign(e=lambda x: x.b * 2)[["e"]]
+        )
+        assert_frame_equal(test_df, train_df.iloc[:1])
+
+        # all columns are used
+        pipeline = pp.Pipeline(read, pp.Query("a > 1"))
+        pipeline.process([])
+        assert read._projection is None
+
+    def test_from_yaml(self, tmp_path, df):
+        path = str(tmp_path / "df.parquet")
+        df.to_parquet(path)
+
+        pipeline = pp.from_yaml(f"""
+            processing:
+                -   name: Read
+                    paths: {path}
+                -   name: Select
+                    cols:
+                        - a
+            """)
+        (_df,) = pipeline.process([])
+        assert_frame_equal(_df, df[["a"]])
+
+    def test_invalid_format(self):
+        with pytest.raises(ValueError):
+            pp.Read("df.csv")
+        with pytest.raises(ValueError):
+            pp.Read("df", format="csv")
@@ -1,3 +1,4 @@
+import pytest
 import numpy as np
 import pandas as pd
 from pandas.testing import assert_frame_equal
@@ -62,3 +63,94 @@ class TestStatsEncoding:
             },
         )
         assert_frame_equal(other_df, xother_df)
+
+    def test_fit_transform(self):
+        ref_df = pd.DataFrame({"a": [1, 1, 2, 2], "y": [1, 2, 3, 4]})
+        other_df = pd.DataFrame({"a": [2, 1, 3]})
+
+        proc = pp.StatsEncoding(["a"], "y", ["max"])
+
+        with pytest.raises(pp.NotFittedError):
+            proc.transform([other_df])
+
+        proc.fit([ref_df])
+        (df,) = proc.transform([other_df])
+
+        assert_frame_equal(
+            df,
+            pd.DataFrame({"a": [2, 1, 3], "STATS_ENC_a_BY_max_y": [4.0, 2.0, np.nan]}),
+        )
+
+    def test_process_keeps_columns(self):
+        ref_df = pd.DataFrame(
+            {"a": [1, 1, 2, 2, 2], "x": [0.1, 0.2, 0.3, 0.4, 0.5], "y": [1, 2, 3, 4, 8]}
+        )
+        other_df = pd.DataFrame({"a": [2, 3]})
+
+        proc = pp.StatsEncoding(["a"], "y", ["median", "count", "max"])
+        df, other_df = proc.process([ref_df, other_df])
+
+        assert np.shares_memory(df["x"].to_numpy(), ref_df["x"].to_numpy())
+        assert_frame_equal(
+            df,
+            ref_df.assign(
+                STATS_ENC_a_BY_median_y=[1.5, 1.5, 4.0, 4.0, 4.0],
+                STATS_ENC_a_BY_count_y=[2, 2, 3, 3, 3],
+                STATS_ENC_a_BY_max_y=[2, 2, 8, 8, 8],
+            ),
+        )
+        assert_frame_equal(
+            other_df,
+            pd.DataFrame(
+                {
+                    "a": [2, 3],
+                    "STATS_ENC_a_BY_median_y": [4.0, np.nan],
+                    "STATS_ENC_a_BY_count_y": [3.0, np.nan],
+                    "STATS_ENC_a_BY_max_y": [8.0, np.nan],
+                }
+            ),
+        )
+
+    def test_partial_fit(self):
+        rng = np.random.RandomState(0)
+        df = pd.DataFrame({"a": rng.randint(0, 5, 50), "y": rng.rand(50)})
+        ops = ["count", "mean", "std", "min", "max"]
+
+        proc = pp.StatsEncoding(["a"], "y", ops)
+        proc.partial_fit([df.iloc[:20]])
+        proc.partial_fit([df.iloc[20:]])
+
+        (xdf,) = pp.StatsEncoding(["a"], "y", ops).fit([df]).transform([df])
+        (df,) = proc.transform([df])
+        assert_frame_equal(df, xdf, check_dtype=False)
+
+        # statistics fitted by `fit` are updated
+        proc = pp.StatsEncoding(["a"], "y", ops).fit([df.iloc[:20]])
+        (df,) = proc.partial_fit([df.iloc[20:]]).transform([df])
+        assert_frame_equal(df, xdf, check_dtype=False)
+
+        with pytest.raises(NotImplementedError):
+            pp.StatsEncoding(["a"], "y", ["median"]).partial_fit([df])
+
+    @pytest.mark.parametrize("dtype", ["float64", "int64", "int32"])
+    def test_process_append(self, dtype):
+        rng = np.random.RandomState(0)
+        df = pd.DataFrame(
+            {
+                "a": rng.randint(0, 5, 50),
+                "b": rng.choice(["x", "y"], 50),
+                "y": rng.randint(0, 100, 50).astype(dtype),
+            }
+        )
+        ops = ["count", "sum", "mean", "var", "min", "max"]
+
+        def build():
+            return pp.Pipeline(pp.StatsEncoding(["a", "b"], "y", ops))
+
+        proc = build()
+        proc.process([df.iloc[:30]])
+        proc.process_append([df.iloc[30:]])
+
+        (xdf,) = build().fit([df]).transform([df])
+        (df,) = proc.transform([df])
+        assert_frame_equal(df, xdf, check_dtype=False)
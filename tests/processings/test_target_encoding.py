@@ -85,3 +85,33 @@ class TestTargetEncoding:
             },
         )
         assert_frame_equal(other_df, xother_df)
+
+    def test_fit_transform(self):
+        ref_df = pd.DataFrame({"a": [1, 1, 2, 2], "y": [1, 2, 3, 4]})
+        other_df = pd.DataFrame({"a": [2, 1, 3]})
+
+        proc = pp.TargetEncoding(["a"], "y", prior_weight=0.0)
+
+        with pytest.raises(pp.NotFittedError):
+            proc.transform([other_df])
+
+        proc.fit([ref_df])
+        (df,) = proc.transform([other_df])
+
+        assert_frame_equal(
+            df,
+            pd.DataFrame({"a": [2, 1, 3], "TARGET_ENC_a_BY_y": [3.5, 1.5, 2.5]}),
+        )
+
+    def test_partial_fit(self):
+        rng = np.random.RandomState(0)
+        df = pd.DataFrame({"a": rng.randint(0, 5, 50), "y": rng.rand(50)})
+        df.loc[::7, "y"] = np.nan
+
+        proc = pp.TargetEncoding(["a"], "y")
+        proc.partial_fit([df.iloc[:20]])
+        proc.partial_fit([df.iloc[20:]])
+
+        (xdf,) = pp.TargetEncoding(["a"], "y").fit([df]).transform([df])
+        (df,) = proc.transform([df])
+        assert_frame_equal(df, xdf)
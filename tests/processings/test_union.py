@@ -0,0 +1,121 @@
+import pytest
+import numpy as np
+import pandas as pd
+from pandas.testing import assert_frame_equal
+
+import peperoncino as pp
+
+
+def _make_df():
+    rng = np.random.RandomState(0)
+    return pd.DataFrame(
+        {
+            "a": rng.randint(0, 5, 50),
+            "b": rng.randint(0, 3, 50),
+            "x": rng.rand(50),
+            "y": rng.rand(50),
+        },
+        index=np.arange(50) * 2,
+    )
+
+
+def _make_union():
+    return pp.Union(
+        pp.StatsEncoding(["a"], "y", ["mean", "max"]),
+        pp.Pipeline(pp.Assign(z="x * 2"), pp.TargetEncoding(["b"], "y")),
+        pp.Combinations(["x", "y"], ["*"], comb_type="combinations"),
+    )
+
+
+class TestUnion:
+    @pytest.mark.parametrize("backend", [None, "thread", "process"])
+    def test_process(self, backend):
+        df, other_df = _make_df(), _make_df().head(10)
+
+        xdf, xother_df = pp.Pipeline(
+            pp.StatsEncoding(["a"], "y", ["mean", "max"]),
+            pp.Assign(z="x * 2"),
+            pp.TargetEncoding(["b"], "y"),
+            pp.Combinations(["x", "y"], ["*"], comb_type="combinations"),
+        ).process([df, other_df])
+
+        proc = _make_union().parallel(n_jobs=2, backend=backend)
+        _df, _other_df = proc.process([df, other_df])
+
+        assert list(_df.columns) == list(xdf.columns)
+        assert_frame_equal(_df, xdf)
+        assert_frame_equal(_other_df, xother_df)
+        assert list(df.columns) == ["a", "b", "x", "y"]
+
+        # fitted states are kept even if branches run on worker processes
+        (_other_df,) = proc.transform([other_df])
+        assert_frame_equal(_other_df, xother_df)
+
+    def test_fit_transform(self):
+        df = _make_df()
+        (xdf,) = _make_union().process([df])
+
+        proc = _make_union().parallel(n_jobs=2)
+        with pytest.raises(pp.NotFittedError):
+            proc.transform([df])
+
+        (_df,) = proc.fit([df]).transform([df])
+        assert_frame_equal(_df, xdf)
+
+    def test_inplace(self):
+        df = _make_df()
+        (xdf,) = _make_union().process([df])
+
+        proc = pp.Pipeline(_make_union()).set_inplace(copy_inputs=True)
+        (_df,) = proc.parallel(n_jobs=2).process([df])
+        assert_frame_equal(_df, xdf)
+        assert list(df.columns) == ["a", "b", "x", "y"]
+        assert pd.get_option("mode.chained_assignment") == "warn"
+
+    def test_shares_columns(self):
+        df = _make_df()
+        seen = []
+
+        class Record(pp.SeparatedProcessing):
+            def __init__(self, name):
+                super().__init__(is_fixed_columns=False)
+                self._name = name
+
+            def sep_process(self, df):
+                seen.append(df["x"].to_numpy())
+                df[self._name] = df["x"] * 2
+                return df
+
+        proc = pp.Union(Record("x2"), Record("x3"))
+        (_df,) = proc.process([df])
+
+        assert list(_df.columns) == ["a", "b", "x", "y", "x2", "x3"]
+        assert list(df.columns) == ["a", "b", "x", "y"]
+        for x in seen:
+            assert np.shares_memory(x, df["x"].to_numpy())
+
+    def test_invalid_branches(self):
+        df = _make_df()
+
+        with pytest.raises(ValueError):
+            pp.Union(pp.Assign(z="x * 2"), pp.Assign(z="y * 2")).process([df])
+
+        with pytest.raises(pp.RowsChangedError):
+            pp.Union(pp.Query("x > 0.5")).process([df])
+
+        # changes of input columns would be dropped
+        with pytest.raises(pp.ColumnsChangedError):
+            pp.Union(pp.Assign(x="x * 2"), pp.Assign(z="y * 2")).process([df])
+        with pytest.raises(pp.ColumnsChangedError):
+            pp.Union(pp.AsType({"x": "float32"})).set_inplace().process([df])
+        # the same values are not changes
+        pp.Union(pp.Assign(x="x", z="y * 2")).process([df])
+
+    def test_profile(self):
+        df = _make_df()
+        with pp.profile() as report:
+            _make_union().parallel(n_jobs=2).process([df])
+
+        names = [step.name for step in report.steps]
+        assert names[0] == "Union"
+        assert "TargetEncoding" in names
@@ -0,0 +1,19 @@
+import pytest
+import pandas as pd
+from pandas.testing import assert_frame_equal
+import peperoncino as pp
+
+
+class TestWrite:
+    @pytest.mark.parametrize("format", ["parquet", "feather"])
+    def test_process(self, tmp_path, format):
+        df = pd.DataFrame({"a": [1, 2]}, index=pd.Index(["x", "y"], name="id"))
+        path = str(tmp_path / "df")
+
+        (_df,) = pp.Write(path, format=format).process([df])
+        assert _df is df
+        (_df,) = pp.Read(path, format=format).process([])
+        assert_frame_equal(_df, df)
+
+        with pytest.raises(ValueError):
+            pp.Write(path, format=format).process([df, df])
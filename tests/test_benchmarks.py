@@ -0,0 +1,53 @@
+import json
+import logging
+import pytest
+import peperoncino as pp
+from benchmarks.cases import CASES
+from benchmarks.data import make_frames
+from benchmarks.runner import compare, main, run
+
+
+class TestBenchmarks:
+    def test_make_frames(self):
+        train_df, test_df = make_frames(100, n_cols=3, cardinality=5)
+
+        assert len(train_df) == 100
+        assert len(test_df) == 25
+        assert "y" in train_df.columns and "y" not in test_df.columns
+        assert [c for c in test_df.columns if c.startswith("x")] == ["x0", "x1", "x2"]
+        assert train_df["k0"].nunique() <= 5
+
+    @pytest.mark.parametrize("case", list(CASES))
+    def test_cases(self, case):
+        dfs = make_frames(100, n_cols=3, cardinality=5)
+        CASES[case](dfs).process(list(dfs))
+
+    def test_run_compare(self):
+        results = run([100], cols=3, cases=["Query", "Assign"], repeat=1)
+
+        assert [r["case"] for r in results["results"]] == ["Query", "Assign"]
+        report = compare(results, results)
+        assert report["time_ratio"].tolist() == [1.0, 1.0]
+        assert not report["regressed"].any()
+
+        baseline = [dict(r, time=r["time"] / 10) for r in results["results"]]
+        assert compare(results, {"results": baseline}, threshold=1.2)["regressed"].all()
+
+    def test_main(self, tmp_path):
+        path = str(tmp_path / "baseline.json")
+        argv = ["--rows", "100", "--cases", "Query", "--repeat", "1"]
+
+        assert main(argv + ["--save", path]) == 0
+        with open(path) as f:
+            assert json.load(f)["results"][0]["case"] == "Query"
+        assert main(argv + ["--compare", path, "--threshold", "1e9"]) == 0
+
+    def test_main_restores_log_level(self):
+        logger = pp.get_logger()
+        level = logger.level
+        try:
+            logger.setLevel(logging.DEBUG)
+            main(["--rows", "100", "--cases", "Query", "--repeat", "1"])
+            assert logger.level == logging.DEBUG
+        finally:
+            logger.setLevel(level)
@@ -0,0 +1,171 @@
+import os
+import pytest
+import pandas as pd
+from pandas.testing import assert_frame_equal
+import peperoncino as pp
+from peperoncino.cache import StepCache, fingerprint_frames, fingerprint_step
+
+pytest.importorskip("pyarrow")
+
+
+class CountingProcessing(pp.SeparatedProcessing):
+    def __init__(self, col, value):
+        super().__init__(is_fixed_columns=False)
+        self._col = col
+        self._value = value
+        self.n_calls = 0
+
+    def _params(self):
+        return {"col": self._col, "value": self._value}
+
+    def sep_process(self, df):
+        self.n_calls += 1
+        return df.assign(**{self._col: df["a"] * self._value})
+
+
+_FACTOR = 2
+
+
+def _scale(x):
+    return x * _FACTOR
+
+
+def _dfs():
+    train_df = pd.DataFrame({"a": [1, 2, 3, 4], "y": [0, 1, 1, 0]})
+    test_df = pd.DataFrame({"a": [1, 2, 5]})
+    return [train_df, test_df]
+
+
+class TestStepCache:
+    def test_fingerprint(self):
+        key = fingerprint_frames(_dfs())
+        assert key == fingerprint_frames(_dfs())
+
+        dfs = _dfs()
+        dfs[1].loc[0, "a"] = 0
+        assert key != fingerprint_frames(dfs)
+        assert key != fingerprint_frames(_dfs()[:1])
+
+        proc = pp.Query("a > 1")
+        assert fingerprint_step(key, proc) == fingerprint_step(key, pp.Query("a > 1"))
+        assert fingerprint_step(key, proc) != fingerprint_step(key, pp.Query("a > 2"))
+        assert fingerprint_step(key, proc) != fingerprint_step(
+            key, pp.Query("a > 1").only(0)
+        )
+
+    def test_prefix_reuse(self, tmpdir):
+        first = CountingProcessing("b", 2)
+        encoding = pp.TargetEncoding(["a"], "y")
+        expected_train, expected_test = pp.Pipeline(
+            CountingProcessing("b", 2),
+            pp.TargetEncoding(["a"], "y"),
+            CountingProcessing("c", 4),
+        ).process(_dfs())
+
+        pipeline = pp.Pipeline(first, encoding, CountingProcessing("c", 3))
+        pipeline.use_cache(str(tmpdir))
+        pipeline.process(_dfs())
+        assert first.n_calls == 2
+
+        # only the last processing is changed
+        last = CountingProcessing("c", 4)
+        first = CountingProcessing("b", 2)
+        encoding = pp.TargetEncoding(["a"], "y")
+        pipeline = pp.Pipeline(first, encoding, last).use_cache(str(tmpdir))
+        train_df, test_df = pipeline.process(_dfs())
+
+        assert first.n_calls == 0
+        assert last.n_calls == 2
+        assert_frame_equal(train_df, expected_train)
+        assert_frame_equal(test_df, expected_test)
+
+        # the fitted state is restored
+        (test_df,) = encoding.transform([_dfs()[1].assign(b=[2, 4, 10])])
+        assert_frame_equal(test_df, expected_test.drop(columns="c"))
+
+    def test_changed_inputs(self, tmpdir):
+        proc = CountingProcessing("b", 2)
+        pipeline = pp.Pipeline(proc).use_cache(str(tmpdir))
+        pipeline.process(_dfs())
+        pipeline.process(_dfs())
+        assert proc.n_calls == 2
+
+        dfs = _dfs()
+        dfs[0].loc[0, "a"] = 10
+        df, _ = pipeline.process(dfs)
+        assert proc.n_calls == 4
+        assert df.loc[0, "b"] == 20
+
+    def test_uncacheable(self, tmpdir):
+        proc = CountingProcessing("b", 2)
+        pipeline = pp.Pipeline(proc).use_cache(str(tmpdir))
+
+        # non-string column names cannot be stored
+        dfs = [pd.DataFrame({"a": [1, 2], 0: [3, 4]})]
+        pipeline.process(dfs)
+        pipeline.process([pd.DataFrame({"a": [1, 2], 0: [3, 4]})])
+        assert proc.n_calls == 2
+
+        # objects of integers and None are read as floats
+        objects = pd.Series([1, None], dtype=object)
+        pipeline.process([pd.DataFrame({"a": [1, 2], "o": objects})])
+        (df,) = pipeline.process([pd.DataFrame({"a": [1, 2], "o": objects})])
+        assert proc.n_calls == 4
+        assert df["o"].dtype == object
+
+        # unhashable values cannot be fingerprinted
+        dfs = [pd.DataFrame({"a": [1, 2], "l": [[1], [2]]})]
+        (df,) = pipeline.process(dfs)
+        assert df["b"].tolist() == [2, 4]
+
+    def test_function_fingerprint(self, tmpdir, monkeypatch):
+        def run(fn):
+            pipeline = pp.Pipeline(pp.ApplyColumn("a", fn)).use_cache(str(tmpdir))
+            (df,) = pipeline.process([pd.DataFrame({"a": range(5)})])
+            return df["a"].tolist()
+
+        # default arguments
+        assert run(lambda x, k=2: x * k) == [0, 2, 4, 6, 8]
+        assert run(lambda x, k=3: x * k) == [0, 3, 6, 9, 12]
+        assert run(lambda x, *, k=2: x * k) == [0, 2, 4, 6, 8]
+        assert run(lambda x, *, k=3: x * k) == [0, 3, 6, 9, 12]
+
+        # global variables
+        assert run(_scale) == [0, 2, 4, 6, 8]
+        monkeypatch.setitem(globals(), "_FACTOR", 3)
+        assert run(_scale) == [0, 3, 6, 9, 12]
+
+    def test_rewritten_file(self, tmpdir):
+        path = os.path.join(str(tmpdir), "df.parquet")
+        pd.DataFrame({"a": [1, 2]}).to_parquet(path)
+        pipeline = pp.Pipeline(pp.Read(path), CountingProcessing("b", 2))
+        pipeline.use_cache(os.path.join(str(tmpdir), "cache"))
+        (df,) = pipeline.process([])
+        assert df["b"].tolist() == [2, 4]
+
+        pd.DataFrame({"a": [1, 2, 3]}).to_parquet(path)
+        (df,) = pipeline.process([])
+        assert df["b"].tolist() == [2, 4, 6]
+        assert "files" not in repr(pipeline)
+
+    def test_eviction(self, tmpdir):
+        cache = StepCache(str(tmpdir))
+        df = pd.DataFrame({"a": range(1000)})
+        cache.save("x", [df], {})
+        size = sum(
+            os.path.getsize(os.path.join(str(tmpdir), "x", f))
+            for f in os.listdir(os.path.join(str(tmpdir), "x"))
+        )
+
+        cache = StepCache(str(tmpdir), max_bytes=int(size * 2.5))
+        cache.save("y", [df], {})
+        os.utime(os.path.join(str(tmpdir), "x"), (0, 0))
+        os.utime(os.path.join(str(tmpdir), "y"), (1, 1))
+        # x is used recently
+        dfs, _ = cache.load("x")
+        assert_frame_equal(dfs[0], df)
+
+        cache.save("z", [df], {})
+        assert "x" in cache
+        assert "y" not in cache
+        assert "z" in cache
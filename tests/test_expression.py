@@ -0,0 +1,125 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import peperoncino.expression
+from peperoncino.expression import compile_expression, compile_record_fn
+from peperoncino.expression import is_elementwise, referenced_names
+
+
+def test_referenced_names():
+    assert referenced_names("a > 0 & (b == 'x' or c in [1, 2])") == {"a", "b", "c"}
+    assert referenced_names("a > @x") is None
+    assert referenced_names("`a b` > 0") is None
+    assert referenced_names("a >") is None
+
+
+def test_is_elementwise():
+    assert is_elementwise("a * b > 0")
+    assert not is_elementwise("a > a.mean()")
+    assert not is_elementwise("a > abs(b)")
+    assert not is_elementwise("a > @x")
+
+
+def test_compile_record_fn():
+    import numpy as np
+
+    record = {"a": 2, "b": 0, "s": "x", "n": None}
+
+    def evaluate(expr):
+        fn = compile_record_fn(expr)
+        with np.errstate(all="ignore"):
+            return fn(record)
+
+    # `&` and `|` have the precedence of `and` and `or`
+    assert evaluate("a > 1 & b < 2 | s == 'y'")
+    assert not evaluate("~(a > 1)")
+    assert evaluate("s == ['x', 'y']") and not evaluate("s not in ['x']")
+    assert evaluate("a / b") == np.inf
+    assert not evaluate("n > 0")
+    assert evaluate("(a * 2 + 1) ** 2") == 25
+
+    assert compile_record_fn("a in b") is None
+    assert compile_record_fn("a % 2") is None
+    assert compile_record_fn("a // b") is None
+    assert compile_record_fn("a > a.mean()") is None
+    assert compile_record_fn("a > @x") is None
+
+
+@pytest.mark.parametrize("numexpr_min_rows", [0, 1_000_000_000])
+@pytest.mark.parametrize(
+    "expr",
+    [
+        "a * b + x",
+        "a / b",
+        "a ** 2 - b",
+        "x > 0 & a < 2 | b == 1",
+        "a > 0 and x < 0 or f",
+        "not f",
+        "~(a > 0)",
+        "1 < a < 3",
+        "a in [1, 2]",
+        "a != [1]",
+        # fallback to pd.DataFrame.eval
+        "~a",
+        "a // b",
+        "s == 'u'",
+        "e + 1",
+        "u * 100",
+        "x > x.mean()",
+    ],
+)
+def test_compile_expression(monkeypatch, numexpr_min_rows, expr):
+    monkeypatch.setattr(peperoncino.expression, "NUMEXPR_MIN_ROWS", numexpr_min_rows)
+    rng = np.random.RandomState(0)
+    df = pd.DataFrame(
+        {
+            "a": rng.randint(-3, 4, 100),
+            "b": rng.randint(-3, 4, 100),
+            "x": rng.randn(100),
+            "f": rng.rand(100) > 0.5,
+            "s": rng.choice(["u", "v"], 100),
+            "e": pd.array(rng.randint(0, 3, 100), dtype="Int64"),
+            "u": rng.randint(0, 5, 100).astype("uint8"),
+        }
+    )
+    df.loc[::7, "x"] = np.nan
+
+    try:
+        expected = np.asarray(df.eval(expr))
+    except (NotImplementedError, TypeError) as e:
+        # e.g. `~` of integers by numexpr as pandas
+        with pytest.raises(type(e)):
+            compile_expression(expr).evaluate(df)
+        return
+    actual = compile_expression(expr).evaluate(df)
+    np.testing.assert_array_equal(np.asarray(actual), expected)
+    assert np.asarray(actual).dtype == expected.dtype
+    if expected.dtype == bool:
+        assert compile_expression(expr).query(df).equals(df.query(expr))
+
+
+def test_compile_expression_supported():
+    # evaluated without pandas on all python versions
+    for expr in ["a * b + 1.5 > 0", "not (a > 0 or b == [1, 2])", "1 < a < 3"]:
+        assert compile_expression(expr)._fn is not None
+    for expr in ["s == 'u'", "a % 2", "a > a.mean()", "a > @x"]:
+        assert compile_expression(expr)._fn is None
+
+
+def test_compile_expression_resolvers():
+    df = pd.DataFrame({"a": [1, 2, 3]})
+    expr = compile_expression("a + b")
+    # compiled expressions are shared
+    assert compile_expression("a + b") is expr
+
+    np.testing.assert_array_equal(
+        expr.evaluate(df, ({"b": np.array([1.0, 2.0, 3.0])},)), [2.0, 4.0, 6.0]
+    )
+    np.testing.assert_array_equal(expr.evaluate(df, ({"b": 1},)), [2, 3, 4])
+    # names of resolvers are looked up before columns
+    np.testing.assert_array_equal(
+        expr.evaluate(df, ({"a": pd.Series([0, 0, 0]), "b": 1},)), [1, 1, 1]
+    )
+    with pytest.raises(NameError):
+        expr.evaluate(df)
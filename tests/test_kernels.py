@@ -0,0 +1,63 @@
+import pytest
+import numpy as np
+import pandas as pd
+from pandas.testing import assert_index_equal
+from peperoncino.kernels import GROUP_STATS, factorize_keys, group_count_sum
+from peperoncino.kernels import group_stats, take_groups
+
+
+class TestKernels:
+    def test_factorize_keys(self):
+        df1 = pd.DataFrame({"a": [1, 2, 1, np.nan], "b": ["x", "y", "x", "x"]})
+        df2 = pd.DataFrame({"a": [2, 1, 3], "b": ["y", "y", "x"]})
+
+        (codes1, codes2), keys = factorize_keys([df1, df2], ["a", "b"])
+
+        np.testing.assert_array_equal(codes1, [0, 1, 0, -1])
+        np.testing.assert_array_equal(codes2, [1, 2, 3])
+        assert_index_equal(
+            keys,
+            pd.MultiIndex.from_arrays(
+                [[1.0, 2.0, 1.0, 3.0], ["x", "y", "y", "x"]], names=["a", "b"]
+            ),
+        )
+
+        (codes1,), keys = factorize_keys([df1], ["b"])
+        np.testing.assert_array_equal(codes1, [0, 1, 0, 0])
+        assert_index_equal(keys, pd.Index(["x", "y"], name="b"))
+
+    def test_group_count_sum(self):
+        codes = np.array([0, 1, 0, -1, 2])
+        values = np.array([1.0, 2.0, 3.0, 4.0, np.nan])
+
+        count, sums = group_count_sum(codes, values, 3)
+
+        np.testing.assert_array_equal(count, [2, 1, 0])
+        np.testing.assert_array_equal(sums, [4.0, 2.0, 0.0])
+
+    def test_take_groups(self):
+        values = take_groups(np.array([1, 2]), np.array([1, -1, 0]))
+        np.testing.assert_array_equal(values, [2.0, np.nan, 1.0])
+
+    @pytest.mark.parametrize("dtype", ["int64", "float64"])
+    def test_group_stats(self, dtype):
+        codes = np.array([0, 1, 0, -1, 2, 0, 1])
+        values = np.array([3, 2, 1, 4, 5, 2, 7], dtype=dtype)
+        if dtype == "float64":
+            values[4] = np.nan
+
+        stats = group_stats(codes, values, 3, list(GROUP_STATS))
+
+        valid = codes >= 0
+        expected = (
+            pd.Series(values[valid])
+            .groupby(codes[valid])
+            .agg(list(GROUP_STATS))
+            .reindex(range(3))
+        )
+        for op in GROUP_STATS:
+            np.testing.assert_allclose(
+                stats[op], expected[op].to_numpy(dtype=np.float64)
+            )
+            if dtype == "int64" and op in ("sum", "min", "max"):
+                assert stats[op].dtype == np.int64
@@ -0,0 +1,124 @@
+import numpy as np
+import pandas as pd
+from pandas.testing import assert_frame_equal
+import peperoncino as pp
+from peperoncino.optimizer import required_columns
+
+
+def make_dfs():
+    rng = np.random.RandomState(0)
+    return [
+        pd.DataFrame(
+            {
+                "a": rng.randint(-5, 5, n),
+                "b": rng.randint(0, 10, n),
+                "e": rng.rand(n),
+                "y": rng.rand(n),
+            }
+        )
+        for n in [50, 30]
+    ]
+
+
+def test_optimize():
+    pipeline = pp.Pipeline(
+        pp.Query("a > -3"),
+        pp.Query("b < 8"),
+        pp.Assign(a="a * 2", c="a + 1"),
+        pp.Assign(d="a + c"),
+        pp.TargetEncoding(["b"], "y"),
+        pp.DropColumns(["e"]),
+        pp.Select(["a", "c", "d", "TARGET_ENC_b_BY_y"]),
+    )
+    optimized = pipeline.optimize()
+
+    assert [type(p) for p in optimized.procs] == [
+        pp.DropColumns,
+        pp.Query,
+        pp.Assign,
+        pp.TargetEncoding,
+        pp.Select,
+    ]
+    assert optimized.procs[1]._query == "(a > -3) and (b < 8)"
+    assert "Assign(stages=[{'a': 'a * 2', 'c': 'a + 1'}, {'d': 'a + c'}])" in (
+        optimized.explain()
+    )
+
+    for df, xdf in zip(optimized.process(make_dfs()), pipeline.process(make_dfs())):
+        assert_frame_equal(df, xdf)
+
+
+def test_optimize_select():
+    pipeline = pp.Pipeline(
+        pp.Assign(c="a + b"),
+        pp.ApplyColumn("y", lambda x: x * 2),
+        pp.Query("a > 0"),
+        pp.AsType({"a": "float64"}),
+        pp.Select(["a", "c"]),
+    )
+    optimized = pipeline.optimize()
+
+    # ApplyColumn and Assign add or modify columns
+    assert [type(p) for p in optimized.procs] == [
+        pp.Assign,
+        pp.ApplyColumn,
+        pp.Select,
+        pp.Query,
+        pp.AsType,
+    ]
+    for df, xdf in zip(optimized.process(make_dfs()), pipeline.process(make_dfs())):
+        assert_frame_equal(df, xdf)
+
+
+def test_optimize_barrier():
+    pipeline = pp.Pipeline(
+        pp.Query("a > 0"),
+        pp.Query("b > b.mean()"),
+        pp.Assign(c="a + b").only(0),
+        pp.Assign(d="a + b"),
+        pp.Pipeline(pp.Query("a > 1"), pp.Query("a < 4")).only(1),
+        pp.DropDuplicates(),
+        pp.DropColumns(["e"]),
+    )
+    optimized = pipeline.optimize()
+
+    assert [type(p) for p in optimized.procs] == [
+        pp.Query,
+        pp.Query,
+        pp.Assign,
+        pp.Assign,
+        pp.Pipeline,
+        pp.DropDuplicates,
+        pp.DropColumns,
+    ]
+    assert optimized.procs[4]._indices == [1]
+    assert len(optimized.procs[4].procs) == 1
+    for df, xdf in zip(optimized.process(make_dfs()), pipeline.process(make_dfs())):
+        assert_frame_equal(df, xdf)
+
+
+def test_explain():
+    pipeline = pp.Pipeline(pp.Query("a > 0"), pp.Pipeline(pp.Select(["a"])).only(0))
+    assert pipeline.explain() == "\n".join(
+        [
+            "Pipeline",
+            "  Query(query='a > 0')",
+            "  Pipeline.only([0])",
+            "    Select(cols=['a'], lackable_cols=[])",
+        ]
+    )
+
+
+def test_required_columns():
+    procs = [
+        pp.Query("a > 0"),
+        pp.Assign(c="b * 2"),
+        pp.RenameColumns({"c": "d"}),
+        pp.Assign(x="z").only(1),
+        pp.Pipeline(pp.Select(["d", "x"])),
+    ]
+    assert required_columns(procs) == {"a", "b", "x", "z"}
+    assert required_columns(procs[:2]) is None
+    assert required_columns(procs[:2], {"c"}) == {"a", "b"}
+    assert required_columns([pp.ApplyColumn("a", abs), pp.Select(["b"])]) == {"a", "b"}
+    assert required_columns([pp.Query("a > 0"), pp.DropDuplicates()], {"b"}) is None
@@ -0,0 +1,30 @@
+import pytest
+from peperoncino.parallel import map_ordered
+
+
+def _square(x):
+    return x * x
+
+
+def _fail_odd(x):
+    if x % 2 == 1:
+        raise ValueError(f"odd: {x}")
+    return x
+
+
+@pytest.mark.parametrize("backend", [None, "thread", "process"])
+def test_map_ordered(backend):
+    assert map_ordered(_square, list(range(10)), backend, 3) == [
+        x * x for x in range(10)
+    ]
+
+
+@pytest.mark.parametrize("backend", [None, "thread"])
+def test_map_ordered_error(backend):
+    with pytest.raises(ValueError, match="odd: 1"):
+        map_ordered(_fail_odd, [0, 1, 2, 4], backend, 4)
+
+
+def test_map_ordered_invalid_backend():
+    with pytest.raises(ValueError):
+        map_ordered(_square, [1, 2], "xxx")
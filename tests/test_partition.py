@@ -0,0 +1,50 @@
+import pytest
+import numpy as np
+import pandas as pd
+from pandas.testing import assert_frame_equal
+
+pytest.importorskip("multiprocessing.shared_memory")
+from peperoncino.partition import read_frame, share_frame, slice_frame  # noqa: E402
+
+
+@pytest.mark.parametrize(
+    "index",
+    [
+        None,
+        pd.Index([10, 20, 30, 40], name="id"),
+        pd.Index(list("abcd")),
+        pd.MultiIndex.from_arrays([[1, 1, 2, 2], list("abab")]),
+    ],
+)
+def test_share_frame(index):
+    df = pd.DataFrame(
+        {
+            "i": np.array([1, 2, 3, 4], dtype=np.int8),
+            "f": [0.5, np.nan, 1.5, 2.5],
+            "b": [True, False, True, False],
+            "t": pd.date_range("2020-01-01", periods=4),
+            "s": ["a", None, "c", "d"],
+            "c": pd.Categorical(["x", "y", "x", "y"]),
+            "n": pd.array([1, None, 3, 4], dtype="Int64"),
+        },
+        index=index,
+    )
+    df.columns = ["i", "f", "b", "t", "s", "c", "c"]
+
+    shm, frame = share_frame(df)
+    try:
+        assert_frame_equal(read_frame(frame), df)
+        assert_frame_equal(read_frame(slice_frame(frame, 1, 3)), df.iloc[1:3])
+        assert_frame_equal(read_frame(slice_frame(frame, 2, 2)), df.iloc[2:2])
+    finally:
+        shm.close()
+        shm.unlink()
+
+
+def test_read_frame_unlink():
+    shm, frame = share_frame(pd.DataFrame({"a": [1, 2]}))
+    shm.close()
+
+    read_frame(frame, unlink=True)
+    with pytest.raises(FileNotFoundError):
+        read_frame(frame)
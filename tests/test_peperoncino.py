@@ -1,5 +1,41 @@
+import subprocess
+import sys
+import pytest
+import peperoncino as pp
 from peperoncino import __version__
 
 
 def test_version():
     assert __version__ == "0.0.5"
+
+
+def test_lazy_import():
+    code = (
+        "import sys\n"
+        "import peperoncino as pp\n"
+        "assert 'yaml' not in sys.modules\n"
+        "assert 'peperoncino.processings.query' not in sys.modules\n"
+        "assert pp.Query('a > 0') is not None\n"
+        "assert 'peperoncino.processings.query' in sys.modules\n"
+        "assert 'peperoncino.processings.select' not in sys.modules\n"
+        "pp.from_list([{'name': 'DropColumns', 'cols': ['a']}])\n"
+        "assert 'peperoncino.processings.drop_columns' in sys.modules\n"
+        "assert 'peperoncino.processings.select' not in sys.modules\n"
+        "assert 'yaml' not in sys.modules\n"
+    )
+    subprocess.run([sys.executable, "-c", code], check=True)
+
+
+def test_lazy_attrs():
+    assert "TargetEncoding" in dir(pp)
+    with pytest.raises(AttributeError):
+        pp.NoSuchProcessing
+
+    with pytest.raises(ValueError):
+        pp.from_list([{"name": "NoSuchProcessing"}])
+
+
+def test_get_logger():
+    n_handlers = len(pp.logger.handlers)
+    assert pp.get_logger() is pp.logger
+    assert len(pp.logger.handlers) == n_handlers
@@ -1,3 +1,4 @@
+import logging
 import pytest
 import numpy as np
 import pandas as pd
@@ -71,6 +72,45 @@ class TestBaseProcessing:
             (_df,) = proc.process([df])
             assert len(_df) == len(df) * 2
 
+    @pytest.mark.parametrize("level", ["full", "fast", "off"])
+    def test_validation_level(self, df, level):
+        class Processing(pp.BaseProcessing):
+            def _process(self, dfs):
+                return [df.iloc[::-1].rename(columns={"a": "A"}) for df in dfs]
+
+        pp.set_validation_level(level)
+        try:
+            if level == "off":
+                (_df,) = Processing().process([df])
+                assert _df.columns.tolist() == ["A", "b"]
+            else:
+                with pytest.raises(pp.ColumnsChangedError):
+                    Processing().process([df])
+
+            # reordered and non-unique rows are regarded as the same
+            (_df,) = Processing(is_fixed_columns=False).process(
+                [df.set_index(pd.Index([0, 0, 1]))]
+            )
+            assert _df.index.tolist() == [1, 0, 0]
+        finally:
+            pp.set_validation_level("full")
+
+        with pytest.raises(ValueError):
+            pp.set_validation_level("xxx")
+
+    def test_lazy_logging(self, df, caplog):
+        proc = pp.Assign(c="a + b")
+
+        with caplog.at_level(logging.INFO, logger="peperoncino"):
+            proc.process([df])
+        assert "#cols: 2 ---> 3" in caplog.text
+        assert "+cols" not in caplog.text
+
+        caplog.clear()
+        with caplog.at_level(logging.DEBUG, logger="peperoncino"):
+            proc.process([df])
+        assert "+cols: {'c'}" in caplog.text
+
     def test_only(self, df):
         class Processing(pp.BaseProcessing):
             def _process(self, dfs):
@@ -120,6 +160,29 @@ class TestSeparatedProcessing:
         }))
         # fmt: on
 
+    @pytest.mark.parametrize("backend", [None, "thread", "process"])
+    def test_process_parallel(self, df, backend):
+        proc = ExampleSeparatedProcessing().parallel(n_jobs=2, backend=backend)
+
+        dfs = proc.process([df * i for i in range(5)])
+
+        assert len(dfs) == 5
+        for i, _df in enumerate(dfs):
+            assert _df.equals(df * i + 1)
+
+    def test_process_parallel_error(self, df):
+        proc = FailingSeparatedProcessing().parallel(n_jobs=2)
+
+        with pytest.raises(ValueError, match="df with 1 row"):
+            proc.process([df, df.head(1), df.head(2)])
+
+
+class FailingSeparatedProcessing(pp.SeparatedProcessing):
+    def sep_process(self, df):
+        if len(df) == 1:
+            raise ValueError("df with 1 row")
+        return df
+
 
 class ExampleMergedProcessing(pp.MergedProcessing):
     def __init__(self, dtype):
@@ -162,3 +225,39 @@ class TestMergedProcessing:
             "d": [10, 11, 12],
         }).astype(dtype))
         # fmt: on
+
+    def test_process_keeps_index(self, df):
+        class Processing(pp.MergedProcessing):
+            def simul_process(self, df):
+                assert df.index.equals(pd.RangeIndex(6))
+                # no column is lacked, then no nullable conversion is needed
+                assert str(df.dtypes["a"]) == "int64"
+                return df.assign(c=df.a.cumsum())
+
+        dfs = Processing(is_fixed_columns=False).process(
+            [df.set_index(pd.Index([5, 3, 1])), df.set_index(pd.Index([0, 2, 1]))]
+        )
+
+        assert dfs[0].index.tolist() == [5, 3, 1]
+        assert dfs[0].c.tolist() == [1, 3, 6]
+        assert dfs[1].index.tolist() == [0, 2, 1]
+        assert dfs[1].c.tolist() == [7, 9, 12]
+
+    def test_process_uint(self, df):
+        proc = ExampleMergedProcessing("uint8")
+
+        dfs = proc.process(
+            [df.astype("uint8"), df.assign(c=np.array([7, 8, 9])).astype("uint8")]
+        )
+
+        assert dfs[0].dtypes.astype(str).tolist() == ["uint8", "uint8"]
+        assert dfs[1].dtypes.astype(str).tolist() == ["uint8", "uint8", "uint8"]
+        assert dfs[1].c.tolist() == [7, 8, 9]
+
+    def test_process_rows_changed(self, df):
+        class Processing(pp.MergedProcessing):
+            def simul_process(self, df):
+                return df.head(1)
+
+        with pytest.raises(pp.RowsChangedError):
+            Processing().process([df, df])
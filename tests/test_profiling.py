@@ -0,0 +1,86 @@
+import json
+import pytest
+import pandas as pd
+import peperoncino as pp
+
+
+class FailingProcessing(pp.SeparatedProcessing):
+    def sep_process(self, df):
+        raise ValueError("failed")
+
+
+def test_profile():
+    df = pd.DataFrame({"a": [1, 2, 3], "b": ["x", "y", "z"]})
+    proc = pp.Pipeline(
+        pp.Query("a > 1"), pp.Pipeline(pp.Assign(c="a * 2")), pp.Select(["c"])
+    )
+
+    with pp.profile() as report:
+        proc.process([df, df])
+
+    assert [(s.name, s.depth) for s in report.steps] == [
+        ("Pipeline", 0),
+        ("Query", 1),
+        ("Pipeline", 1),
+        ("Assign", 2),
+        ("Select", 1),
+    ]
+
+    query = report.steps[1]
+    assert query.rows_in == [3, 3]
+    assert query.rows_out == [2, 2]
+    assert query.cols_in == [2, 2]
+    assert query.memory_in[0] > query.memory_out[0] > 0
+    assert report.steps[0].wall_time >= query.wall_time >= 0
+    assert report.steps[0].peak_memory >= query.peak_memory >= 0
+
+    table = report.to_frame()
+    assert table.step.tolist()[3] == "    Assign"
+    assert table.rows_out.tolist() == [4, 4, 4, 4, 4]
+    assert "Assign" in str(report)
+
+    js = json.loads(report.to_json())
+    assert js["steps"][4]["cols_out"] == [1, 1]
+
+
+def test_profile_error():
+    df = pd.DataFrame({"a": [1, 2, 3]})
+
+    with pp.profile() as report:
+        with pytest.raises(ValueError):
+            pp.Pipeline(FailingProcessing()).process([df])
+        pp.Query("a > 1").process([df])
+
+    assert report.steps[-1].name == "Query"
+    assert report.steps[-1].depth == 0
+
+
+def test_profile_threads():
+    import threading
+    import tracemalloc
+
+    df = pd.DataFrame({"a": [1, 2, 3]})
+    started = threading.Barrier(2)
+    reports = {}
+
+    def run(name, proc):
+        with pp.profile() as report:
+            started.wait()
+            for _ in range(10):
+                proc.process([df])
+        reports[name] = report
+
+    threads = [
+        threading.Thread(target=run, args=("query", pp.Query("a > 1"))),
+        threading.Thread(target=run, args=("assign", pp.Assign(b="a * 2"))),
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    # steps of other threads are not recorded
+    assert {s.name for s in reports["query"].steps} == {"Query"}
+    assert {s.name for s in reports["assign"].steps} == {"Assign"}
+    assert all(s.depth == 0 for s in reports["query"].steps)
+    assert not tracemalloc.is_tracing()
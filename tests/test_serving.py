@@ -0,0 +1,123 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+import numpy as np
+import pandas as pd
+from pandas.testing import assert_frame_equal
+
+import peperoncino as pp
+
+
+def _make_pipeline():
+    rng = np.random.RandomState(0)
+    ref_df = pd.DataFrame({"a": rng.randint(0, 5, 100), "y": rng.rand(100)})
+    return pp.Pipeline(
+        pp.Query("a > 0"), pp.Assign(b="a * 2"), pp.TargetEncoding(["a"], "y")
+    ).fit([ref_df])
+
+
+def _make_requests():
+    rng = np.random.RandomState(1)
+    return [
+        pd.DataFrame(
+            {"a": rng.randint(0, 6, n)}, index=pd.Index(rng.permutation(n), name="id")
+        )
+        for n in [3, 1, 0, 5, 2]
+    ]
+
+
+def test_aprocess():
+    proc = _make_pipeline()
+    other_proc = pp.Pipeline(pp.Query("a > 0"), pp.Assign(b="a * 2"))
+    (df,) = _make_requests()[:1]
+    (xdf,) = proc.transform([df])
+    (xother_df,) = other_proc.process([df])
+
+    async def main():
+        with ThreadPoolExecutor(2) as executor:
+            return await asyncio.gather(
+                proc.atransform([df], executor), other_proc.aprocess([df])
+            )
+
+    (tdf,), (pdf,) = asyncio.run(main())
+    assert_frame_equal(tdf, xdf)
+    assert_frame_equal(pdf, xother_df)
+
+
+def test_coalescer():
+    proc = _make_pipeline()
+    dfs = _make_requests()
+    xdfs = [proc.transform([df])[0] for df in dfs]
+
+    calls = []
+    transform = proc.transform
+
+    def _transform(dfs):
+        calls.append(len(dfs[0]))
+        return transform(dfs)
+
+    proc.transform = _transform
+
+    async def main():
+        coalescer = pp.Coalescer(proc, max_delay=0.01)
+        return await asyncio.gather(*[coalescer.transform(df) for df in dfs])
+
+    for df, xdf in zip(asyncio.run(main()), xdfs):
+        assert_frame_equal(df, xdf)
+    assert calls == [sum(len(df) for df in dfs)]
+
+
+def test_coalescer_max_rows():
+    proc = _make_pipeline()
+    dfs = _make_requests()
+
+    async def main():
+        coalescer = pp.Coalescer(proc, max_rows=4, max_delay=10.0)
+        return await asyncio.wait_for(
+            asyncio.gather(*[coalescer.transform(df) for df in dfs[:2]]), 1.0
+        )
+
+    for df, xdf in zip(asyncio.run(main()), dfs):
+        assert_frame_equal(df, proc.transform([xdf])[0])
+
+
+def test_coalescer_error():
+    proc = pp.ApplyColumn("a", np.sqrt)
+    df = pd.DataFrame({"b": [1, 2]})
+
+    async def main():
+        coalescer = pp.Coalescer(proc)
+        return await asyncio.gather(coalescer.transform(df), coalescer.transform(df))
+
+    with pytest.raises(KeyError):
+        asyncio.run(main())
+
+    with pytest.raises(ValueError):
+        pp.Coalescer(pp.Pipeline(pp.Assign(b="a * 2"), pp.DropDuplicates()))
+
+
+def _checked_sqrt(x):
+    if x < 0:
+        raise ValueError("negative")
+    return np.sqrt(x)
+
+
+def test_coalescer_partial_error():
+    proc = pp.ApplyColumn("a", _checked_sqrt)
+    good_df = pd.DataFrame({"a": [1.0, 4.0]})
+    bad_df = pd.DataFrame({"a": [-1.0]})
+
+    async def main():
+        coalescer = pp.Coalescer(proc)
+        return await asyncio.gather(
+            coalescer.transform(good_df),
+            coalescer.transform(bad_df),
+            coalescer.transform(good_df),
+            return_exceptions=True,
+        )
+
+    first, error, last = asyncio.run(main())
+    # only the malformed request fails
+    assert isinstance(error, ValueError)
+    assert_frame_equal(first, pd.DataFrame({"a": [1.0, 2.0]}))
+    assert_frame_equal(last, pd.DataFrame({"a": [1.0, 2.0]}))
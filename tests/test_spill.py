@@ -0,0 +1,71 @@
+import os
+import numpy as np
+import pandas as pd
+from pandas.testing import assert_frame_equal
+
+from peperoncino.spill import Spiller
+
+
+def _make_df(n):
+    rng = np.random.RandomState(0)
+    return pd.DataFrame(
+        {
+            "a": rng.randint(0, 5, n),
+            "c": pd.Categorical(rng.choice(["x", "y"], n)),
+            "s": rng.choice(["foo", "bar", None], n),
+            "t": pd.date_range("2020-01-01", periods=n, freq="H"),
+        },
+        index=pd.Index(np.arange(n) * 2, name="id"),
+    )
+
+
+def test_spiller(tmp_path):
+    dfs = [_make_df(100), _make_df(300), _make_df(200)]
+    dfs[2].columns = [0, 1, 2, 3]
+    logs = []
+
+    with Spiller(1, str(tmp_path), lambda msg, level: logs.append(msg)) as spiller:
+        _dfs = spiller.prepare(dfs, [0])
+        # dataframes not needed are spilled until the budget
+        assert spiller.spilled == [1, 2]
+        assert _dfs[0] is dfs[0]
+        assert_frame_equal(_dfs[1], dfs[1].iloc[:0])
+        assert len(os.listdir(tmp_path)) == 1
+
+        _dfs = spiller.prepare(_dfs, [1])
+        assert spiller.spilled == [0, 2]
+        assert_frame_equal(_dfs[1], dfs[1])
+
+        _dfs = spiller.restore(_dfs)
+        assert spiller.spilled == []
+        for df, _df in zip(dfs, _dfs):
+            assert_frame_equal(_df, df)
+
+    assert len(logs) > 0
+    assert os.listdir(tmp_path) == []
+
+
+def test_spiller_budget(tmp_path):
+    dfs = [_make_df(100), _make_df(100)]
+
+    with Spiller(10**9, str(tmp_path)) as spiller:
+        _dfs = spiller.prepare(dfs, [0])
+        assert spiller.spilled == []
+        assert _dfs[1] is dfs[1]
+
+
+def test_spiller_unspillable(tmp_path):
+    dfs = [
+        _make_df(100),
+        # objects of integers and None are read as floats
+        pd.DataFrame({"o": pd.Series([1, None, 3], dtype=object)}),
+        # complex numbers are not supported by Feather files
+        pd.DataFrame({"z": np.array([1j, 2, 3])}),
+    ]
+
+    with Spiller(1, str(tmp_path)) as spiller:
+        _dfs = spiller.prepare(dfs, [0])
+        assert spiller.spilled == []
+        assert _dfs[1] is dfs[1]
+        assert _dfs[2] is dfs[2]
+        assert os.listdir(os.path.join(tmp_path, os.listdir(tmp_path)[0])) == []